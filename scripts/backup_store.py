@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Backups por Conteúdo (Snapshots Deduplicados)
+Projeto: Origem das Aves em Theropoda
+
+Guarda backups de images/ em images/backup/store/ sem duplicar bytes:
+
+- cada conteúdo é armazenado uma única vez, pelo SHA-256, em objects/;
+- o objeto é criado por reflink (cópia copy-on-write, Btrfs/XFS) ou, se
+  não for possível, por cópia comum;
+- cada snapshot é só um manifesto JSON (nome → hash), então um backup de
+  imagens que não mudaram custa O(arquivos), não O(bytes).
+
+Os objetos copiados ficam somente leitura (0444). Hardlinks só com
+--hardlink (fora do Windows): o objeto passa a ser o próprio arquivo de
+images/, cujas permissões não são tocadas, e uma gravação no lugar altera
+o backup (a restauração confere o hash e recusa o objeto). Os scripts que
+regravam imagens removem o arquivo antes de gravar (ver
+extract_pdf_images.py). A restauração nunca usa hardlink (só reflink ou
+cópia).
+
+Uso:
+    python backup_store.py list
+    python backup_store.py snapshot [--hardlink]
+    python backup_store.py restore [SNAPSHOT] [--name arquivo.jpg]
+    python backup_store.py prune --keep 5
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import stat
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import image_layout
+
+# ================== CONFIGURAÇÃO ==================
+
+PROJECT_ROOT = Path(__file__).parent.parent
+IMAGES_DIR = PROJECT_ROOT / "images"
+STORE_DIR = IMAGES_DIR / "backup" / "store"
+OBJECTS_DIR = STORE_DIR / "objects"
+SNAPSHOTS_DIR = STORE_DIR / "snapshots"
+
+# ioctl FICLONE do Linux (reflink)
+FICLONE = 0x40049409
+
+# ================== OBJETOS ==================
+
+def file_sha256(path):
+    """SHA-256 do conteúdo de um arquivo"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _reflink(src, dst):
+    """Cópia copy-on-write (só Linux, em sistemas de arquivos que suportam)"""
+    import fcntl
+    with open(src, "rb") as source, open(dst, "wb") as target:
+        fcntl.ioctl(target.fileno(), FICLONE, source.fileno())
+
+
+def materialize(src, dst, hardlink=False):
+    """
+    Cria dst com o conteúdo de src pelo meio mais barato disponível.
+
+    Args:
+        hardlink (bool): Aceitar hardlink (dst passa a ser o mesmo arquivo
+            que src); ignorado no Windows
+
+    Returns:
+        str: 'reflink', 'hardlink' ou 'copy'
+    """
+    try:
+        _reflink(src, dst)
+        return "reflink"
+    except (ImportError, OSError):
+        if os.path.exists(dst):
+            os.remove(dst)
+    if hardlink and os.name != "nt":
+        try:
+            os.link(src, dst)
+            return "hardlink"
+        except OSError:
+            pass
+    shutil.copy2(src, dst)
+    return "copy"
+
+
+def _make_read_only(path):
+    """Tira a permissão de escrita (0444); objetos não são alterados no lugar"""
+    os.chmod(path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+
+
+def object_path(sha256, suffix=""):
+    return OBJECTS_DIR / sha256[:2] / f"{sha256}{suffix.lower()}"
+
+
+def store_object(path, sha256, hardlink=False):
+    """
+    Guarda o conteúdo de um arquivo no repositório (se ainda não estiver lá).
+
+    Objetos próprios (reflink ou cópia) ficam somente leitura; um hardlink
+    é o arquivo de images/ e fica com as permissões que ele tem.
+
+    Args:
+        hardlink (bool): Aceitar hardlink com o arquivo de origem
+
+    Returns:
+        str: 'dedup' (já existia), 'reflink', 'hardlink' ou 'copy'
+    """
+    target = object_path(sha256, Path(path).suffix)
+    if target.exists():
+        target_stat = target.stat()
+        if target_stat.st_mode & 0o222 and target_stat.st_nlink == 1:
+            _make_read_only(target)  # objeto de antes dos objetos somente leitura
+        return "dedup"
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_name(f".{target.name}.{uuid.uuid4().hex[:6]}.tmp")
+    method = materialize(path, tmp_path, hardlink=hardlink)
+    if method != "hardlink":
+        _make_read_only(tmp_path)
+    os.replace(tmp_path, target)
+    return method
+
+
+# ================== SNAPSHOTS ==================
+
+def _known_hashes():
+    """Hashes do catálogo (válidos enquanto tamanho/mtime não mudarem)"""
+    try:
+        import image_catalog
+        return {record["file"].name: (record["size_bytes"], record["mtime_ns"], record["sha256"])
+                for record in image_catalog.list_catalog()}
+    except Exception:
+        return {}
+
+
+def snapshot(paths, label="", hardlink=False):
+    """
+    Registra um snapshot dos arquivos informados.
+
+    Args:
+        paths (list): Arquivos de images/
+        label (str): Descrição (ex.: "process:reveal_slide")
+        hardlink (bool): Guardar por hardlink quando não houver reflink (sem
+            cópia, mas o backup deixa de proteger contra gravações no lugar)
+
+    Returns:
+        dict: {'id', 'files', 'stats'} com contagem por método
+    """
+    known = _known_hashes()
+    snapshot_id = f"{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+    entries = {}
+    stats = {"dedup": 0, "reflink": 0, "hardlink": 0, "copy": 0, "bytes_copied": 0}
+
+    for path in paths:
+        path = Path(path)
+        file_stat = path.stat()
+        cached = known.get(path.name)
+        if cached and cached[0] == file_stat.st_size and cached[1] == file_stat.st_mtime_ns and cached[2]:
+            sha256 = cached[2]
+        else:
+            sha256 = file_sha256(path)
+
+        method = store_object(path, sha256, hardlink=hardlink)
+        stats[method] += 1
+        if method == "copy":
+            stats["bytes_copied"] += file_stat.st_size
+        entries[path.name] = {"sha256": sha256, "size": file_stat.st_size, "mtime_ns": file_stat.st_mtime_ns}
+
+    SNAPSHOTS_DIR.mkdir(parents=True, exist_ok=True)
+    manifest = {"id": snapshot_id, "label": label, "created_at": time.time(), "files": entries}
+    tmp_path = SNAPSHOTS_DIR / f".{snapshot_id}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    tmp_path.replace(SNAPSHOTS_DIR / f"{snapshot_id}.json")
+
+    return {"id": snapshot_id, "files": len(entries), "stats": stats}
+
+
+def list_snapshots():
+    """Manifestos dos snapshots, do mais antigo para o mais recente"""
+    if not SNAPSHOTS_DIR.exists():
+        return []
+    manifests = []
+    for manifest_path in SNAPSHOTS_DIR.glob("*.json"):
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifests.append(json.load(f))
+    return sorted(manifests, key=lambda manifest: manifest["created_at"])
+
+
+def restore(snapshot_id=None, names=None, images_dir=IMAGES_DIR):
+    """
+    Restaura arquivos de um snapshot (o mais recente, por padrão).
+
+    Arquivos que já têm o conteúdo do snapshot não são tocados; os demais
+    são trocados de forma atômica (os.replace) por um reflink ou uma cópia
+    gravável do objeto. Um hardlink voltaria a expor o objeto a gravações
+    feitas em images/.
+
+    Args:
+        snapshot_id (str): Snapshot a restaurar
+        names (list): Restringir a estes nomes
+        images_dir (Path): Pasta de destino
+
+    Returns:
+        int: Número de arquivos restaurados
+    """
+    manifests = list_snapshots()
+    if snapshot_id:
+        manifests = [m for m in manifests if m["id"] == snapshot_id]
+    if not manifests:
+        print("⚠️  Nenhum snapshot encontrado.")
+        return 0
+    manifest = manifests[-1]
+
+    restored = 0
+    for name, entry in manifest["files"].items():
+        if names and name not in names:
+            continue
+        target = image_layout.path_for(name, images_dir=images_dir)
+        if target.exists():
+            if target.stat().st_size == entry["size"] and file_sha256(target) == entry["sha256"]:
+                continue
+
+        source = object_path(entry["sha256"], Path(name).suffix)
+        if not source.exists() or file_sha256(source) != entry["sha256"]:
+            print(f"❌ Objeto ausente ou alterado para {name}; não restaurado")
+            continue
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(f".{name}.restore.tmp")
+        materialize(source, tmp_path)
+        os.chmod(tmp_path, os.stat(tmp_path).st_mode | stat.S_IWUSR)  # a cópia herda o 0444
+        os.replace(tmp_path, target)
+        image_layout.register(target, images_dir=images_dir)
+        restored += 1
+        print(f"↩️  Restaurado: {name}")
+
+    print(f"✅ {restored} arquivo(s) restaurado(s) do snapshot {manifest['id']}")
+    return restored
+
+
+def prune(keep=5):
+    """
+    Mantém só os `keep` snapshots mais recentes e apaga objetos órfãos.
+
+    Returns:
+        dict: Snapshots e objetos removidos, bytes liberados no repositório
+    """
+    manifests = list_snapshots()
+    removed = manifests[:-keep] if keep else manifests
+    for manifest in removed:
+        (SNAPSHOTS_DIR / f"{manifest['id']}.json").unlink()
+
+    referenced = {(entry["sha256"], Path(name).suffix.lower())
+                  for manifest in manifests[len(removed):]
+                  for name, entry in manifest["files"].items()}
+
+    objects_removed = 0
+    bytes_freed = 0
+    if OBJECTS_DIR.exists():
+        for object_file in OBJECTS_DIR.glob("*/*"):
+            if object_file.name.startswith("."):
+                continue
+            key = (object_file.name.split(".")[0], object_file.suffix.lower())
+            if key not in referenced:
+                object_stat = object_file.stat()
+                # Hardlink ainda compartilhado com images/ não libera espaço
+                if object_stat.st_nlink == 1:
+                    bytes_freed += object_stat.st_size
+                if os.name == "nt":
+                    os.chmod(object_file, stat.S_IWRITE)  # Windows não apaga somente leitura
+                object_file.unlink()
+                objects_removed += 1
+        for bucket in OBJECTS_DIR.iterdir():
+            if bucket.is_dir() and not any(bucket.iterdir()):
+                bucket.rmdir()
+
+    print(f"🧹 {len(removed)} snapshot(s) e {objects_removed} objeto(s) removidos "
+          f"({bytes_freed / 1024 / 1024:.1f} MB liberados)")
+    return {"snapshots": len(removed), "objects": objects_removed, "bytes_freed": bytes_freed}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backups deduplicados de images/")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="Listar snapshots")
+    snapshot_parser = sub.add_parser("snapshot", help="Criar snapshot de images/")
+    snapshot_parser.add_argument("--hardlink", action="store_true",
+                                 help="Hardlink em vez de cópia quando não houver reflink")
+    restore_parser = sub.add_parser("restore", help="Restaurar um snapshot")
+    restore_parser.add_argument("snapshot", nargs="?", help="Id do snapshot (padrão: o mais recente)")
+    restore_parser.add_argument("--name", action="append", help="Restaurar só este arquivo (repetível)")
+    prune_parser = sub.add_parser("prune", help="Apagar snapshots antigos e objetos órfãos")
+    prune_parser.add_argument("--keep", type=int, default=5, help="Snapshots mantidos")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(Path(__file__).parent))
+
+    if args.command == "list":
+        for manifest in list_snapshots():
+            created = time.strftime("%d/%m/%Y %H:%M:%S", time.localtime(manifest["created_at"]))
+            print(f"{manifest['id']}  {created}  {len(manifest['files']):5d} arquivos  {manifest['label']}")
+    elif args.command == "snapshot":
+        from project_status import list_images
+        result = snapshot(list_images(), label="manual", hardlink=args.hardlink)
+        print(f"💾 Snapshot {result['id']}: {result['files']} arquivos {result['stats']}")
+    elif args.command == "restore":
+        restore(args.snapshot, args.name)
+    elif args.command == "prune":
+        prune(args.keep)
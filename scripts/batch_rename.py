@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Renomeação em Lote com Diário (Journal)
+Projeto: Origem das Aves em Theropoda
+
+Planeja um mapeamento completo (nome atual → novo nome) antes de mover
+qualquer arquivo:
+
+- detecta conflitos (origem ausente, origem ou destino repetidos, destino
+  já existente) e os reporta sem perguntar nada;
+- ordena os movimentos para que cadeias (a→b, b→c) e ciclos (a→b, b→a)
+  funcionem, usando um nome temporário só para quebrar ciclos;
+- aplica tudo com `os.rename` na mesma pasta (sem cópias), gravando cada
+  passo num diário em images/backup/renames/<lote>/journal.jsonl;
+- se algo falhar no meio, desfaz os passos já feitos; um lote concluído
+  também pode ser desfeito depois (rollback_batch).
+
+Destinos existentes só são substituídos com overwrite=True; nesse caso o
+arquivo antigo é movido (não copiado) para a pasta do lote.
+"""
+
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+
+import image_catalog
+import image_layout
+import pipeline_metrics
+import profiling
+
+# ================== CONFIGURAÇÃO ==================
+
+PROJECT_ROOT = Path(__file__).parent.parent
+IMAGES_DIR = PROJECT_ROOT / "images"
+# Pasta (relativa a images/) dos diários e dos destinos substituídos
+RENAME_BACKUP_SUBDIR = "backup/renames"
+JOURNAL_NAME = "journal.jsonl"
+
+# ================== PLANEJAMENTO ==================
+
+@profiling.traced(category="rename")
+def plan_renames(mapping, images_dir=IMAGES_DIR, overwrite=False):
+    """
+    Planeja um lote de renomeações sem tocar nos arquivos.
+
+    Args:
+        mapping (dict|list): {nome_atual: novo_nome} ou lista de pares
+        images_dir (Path): Pasta das imagens
+        overwrite (bool): Substituir destinos existentes que não fazem
+            parte do lote (o arquivo antigo vai para a pasta do lote)
+
+    Returns:
+        dict: Plano com 'batch_id', 'renames' aceitos, 'skipped'
+              [(origem, destino, motivo)], 'displaced' e 'ops' ordenadas
+    """
+    images_dir = Path(images_dir)
+    pairs = mapping.items() if isinstance(mapping, dict) else mapping
+    existing = {path.name for path in image_layout.list_paths(extensions=image_layout.IMAGE_EXTENSIONS,
+                                                              images_dir=images_dir)}
+
+    renames = {}
+    targets = {}
+    skipped = []
+
+    for old_name, new_name in pairs:
+        old_name, new_name = str(old_name).strip(), str(new_name).strip()
+        if not new_name or old_name == new_name:
+            continue
+        if os.path.basename(new_name) != new_name:
+            skipped.append((old_name, new_name, "destino inválido"))
+        elif old_name not in existing:
+            skipped.append((old_name, new_name, "origem não encontrada"))
+        elif old_name in renames:
+            skipped.append((old_name, new_name, f"origem já mapeada para {renames[old_name]}"))
+        elif new_name in targets:
+            skipped.append((old_name, new_name, f"destino já usado por {targets[new_name]}"))
+        else:
+            renames[old_name] = new_name
+            targets[new_name] = old_name
+
+    # Destinos ocupados por arquivos que não saem do lugar
+    displaced = []
+    for old_name, new_name in list(renames.items()):
+        if new_name in existing and new_name not in renames:
+            if overwrite:
+                displaced.append(new_name)
+            else:
+                skipped.append((old_name, new_name, "destino já existe"))
+                del renames[old_name]
+                del targets[new_name]
+
+    batch_id = f"{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+    return {
+        "batch_id": batch_id,
+        "renames": renames,
+        "skipped": skipped,
+        "displaced": displaced,
+        "ops": order_moves(renames, displaced, batch_id),
+    }
+
+
+def order_moves(renames, displaced, batch_id):
+    """
+    Ordena os movimentos de um mapeamento sem destinos repetidos.
+
+    Cada arquivo tem no máximo um destino e cada destino no máximo uma
+    origem, então o grafo é formado por cadeias e ciclos: um movimento
+    fica pronto quando seu destino está livre; o que sobra são ciclos,
+    quebrados movendo um arquivo para um nome temporário.
+
+    Returns:
+        list: Pares (origem, destino) relativos a images/, na ordem de execução
+    """
+    backup_prefix = f"{RENAME_BACKUP_SUBDIR}/{batch_id}/"
+    ops = [(name, backup_prefix + name) for name in displaced]
+
+    pending = dict(renames)
+    waiting_on = {new: old for old, new in pending.items()}  # destino → quem espera por ele
+    ready = [old for old, new in pending.items() if new not in pending]
+
+    while pending:
+        while ready:
+            old_name = ready.pop()
+            new_name = pending.pop(old_name)
+            ops.append((old_name, new_name))
+            # A origem ficou livre: quem queria esse nome pode andar
+            if old_name in waiting_on and waiting_on[old_name] in pending:
+                ready.append(waiting_on[old_name])
+
+        if pending:
+            # Só restam ciclos: tirar um arquivo do caminho
+            old_name = next(iter(pending))
+            temp_name = f".{old_name}.{batch_id}.tmp"
+            ops.append((old_name, temp_name))
+            pending[temp_name] = pending.pop(old_name)
+            waiting_on[pending[temp_name]] = temp_name
+            if old_name in waiting_on and waiting_on[old_name] in pending:
+                ready.append(waiting_on[old_name])
+
+    return ops
+
+
+# ================== EXECUÇÃO ==================
+
+def _append(journal, entry):
+    journal.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    journal.flush()
+
+
+def _location(name, images_dir):
+    """Caminho de um passo do diário: nome de imagem ou caminho na pasta do lote"""
+    if "/" in name:
+        return images_dir / name
+    return image_layout.path_for(name, images_dir=images_dir)
+
+
+def _move(src, dst, images_dir):
+    """
+    Um passo do lote, mantendo o índice de image_layout em dia.
+
+    Returns:
+        tuple: (caminho antigo, caminho novo)
+    """
+    if "/" not in src and "/" not in dst:
+        old_path = image_layout.path_for(src, images_dir=images_dir)
+        return old_path, image_layout.move(src, dst, images_dir=images_dir)
+    old_path = _location(src, images_dir)
+    new_path = images_dir / dst if "/" in dst else image_layout.prepare(dst, images_dir=images_dir)
+    os.rename(old_path, new_path)
+    if "/" in dst:
+        image_layout.unregister(src, images_dir=images_dir)  # guardado na pasta do lote
+    else:
+        image_layout.register(new_path, images_dir=images_dir)
+    return old_path, new_path
+
+
+def _undo(ops, done, images_dir, journal, moved):
+    """
+    Desfaz, do último para o primeiro, os movimentos já feitos, registrando
+    cada um no diário ({'undone': i}) para que uma nova tentativa continue
+    de onde esta parou.
+
+    Args:
+        moved (list): Recebe os pares (caminho antigo, caminho novo) de cada
+            movimento desfeito, mesmo que um passo posterior falhe
+    """
+    for index in reversed(done):
+        src, dst = ops[index]
+        if _location(src, images_dir).exists():
+            # os.rename sobrescreveria em silêncio (POSIX)
+            raise FileExistsError(f"{src} já existe; desfaça manualmente a partir do diário")
+        moved.append(_move(dst, src, images_dir))
+        _append(journal, {"undone": index})
+
+
+def _undo_or_mark(ops, done, images_dir, journal, moved):
+    """
+    _undo que, se falhar, deixa o lote marcado como 'rollback_failed' no
+    diário antes de repassar o erro (o lote fica pela metade, e o diário
+    precisa dizer isso).
+    """
+    try:
+        _undo(ops, done, images_dir, journal, moved)
+    except OSError as e:
+        _append(journal, {"status": "rollback_failed", "error": str(e), "at": time.time()})
+        os.fsync(journal.fileno())
+        raise
+
+
+@pipeline_metrics.stage("rename")
+@profiling.traced(category="rename")
+def apply_plan(plan, images_dir=IMAGES_DIR, verbose=True):
+    """
+    Executa um plano de plan_renames com diário; desfaz tudo em caso de erro.
+
+    Returns:
+        dict: {'batch_id', 'renamed', 'journal'}; 'renamed' é 0 se o lote
+              foi desfeito
+    """
+    images_dir = Path(images_dir)
+    ops = plan["ops"]
+    metrics = pipeline_metrics.current()
+    metrics.count("skipped", len(plan["skipped"]))
+    if not ops:
+        return {"batch_id": plan["batch_id"], "renamed": 0, "journal": None}
+
+    batch_dir = images_dir / RENAME_BACKUP_SUBDIR / plan["batch_id"]
+    batch_dir.mkdir(parents=True, exist_ok=True)
+    journal_path = batch_dir / JOURNAL_NAME
+    done = []
+    moved = []
+
+    with open(journal_path, "w", encoding="utf-8") as journal:
+        _append(journal, {"batch": plan["batch_id"], "created_at": time.time(), "ops": ops})
+        os.fsync(journal.fileno())
+
+        try:
+            for index, (src, dst) in enumerate(ops):
+                moved.append(_move(src, dst, images_dir))
+                done.append(index)
+                _append(journal, {"done": index})
+        except OSError as e:
+            print(f"❌ Erro ao renomear {src} → {dst}: {e}")
+            print("   Desfazendo o lote...")
+            _undo_or_mark(ops, done, images_dir, journal, [])
+            _append(journal, {"status": "rolled_back"})
+            metrics.count("failed", len(plan["renames"]))
+            return {"batch_id": plan["batch_id"], "renamed": 0, "journal": journal_path}
+
+        _append(journal, {"status": "committed"})
+        os.fsync(journal.fileno())
+    metrics.count("processed", len(plan["renames"]))
+
+    # Catálogo: uma transação para o lote inteiro
+    with image_catalog.catalog_session() as catalog:
+        for old_path, new_path in moved:
+            image_catalog.rename_image(old_path, new_path, conn=catalog)
+
+    if verbose:
+        for name in plan["displaced"]:
+            print(f"   💾 Substituído (guardado no lote): {name}")
+        for old_name, new_name in plan["renames"].items():
+            print(f"✅ Renomeado: {old_name} → {new_name}")
+
+    return {"batch_id": plan["batch_id"], "renamed": len(plan["renames"]), "journal": journal_path}
+
+
+def _read_journal(journal_path):
+    with open(journal_path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _journal_status(entries):
+    """Último status registrado no diário (None se o lote foi interrompido)"""
+    return next((entry["status"] for entry in reversed(entries) if "status" in entry), None)
+
+
+def rollback_batch(batch_id=None, images_dir=IMAGES_DIR):
+    """
+    Desfaz um lote (o mais recente, se batch_id não for informado).
+
+    Serve tanto para lotes concluídos quanto para lotes interrompidos
+    (queda do processo no meio): só os passos registrados são revertidos.
+
+    Returns:
+        int: Número de movimentos desfeitos
+    """
+    images_dir = Path(images_dir)
+    renames_dir = images_dir / RENAME_BACKUP_SUBDIR
+    if batch_id is None:
+        # Lote mais recente ainda não desfeito (desfazer de novo volta mais um)
+        active = [(entries[0]["created_at"], entries[0]["batch"])
+                  for entries in map(_read_journal, renames_dir.glob(f"*/{JOURNAL_NAME}"))
+                  if _journal_status(entries) not in ("rolled_back", "undone")]
+        if not active:
+            print("⚠️  Nenhum lote de renomeação para desfazer.")
+            return 0
+        batch_id = max(active)[1]
+
+    journal_path = renames_dir / batch_id / JOURNAL_NAME
+    entries = _read_journal(journal_path)
+
+    status = _journal_status(entries)
+    if status in ("rolled_back", "undone"):
+        print(f"⚠️  O lote {batch_id} já foi desfeito.")
+        return 0
+
+    ops = [tuple(op) for op in entries[0]["ops"]]
+    # Passos já desfeitos por uma tentativa anterior (rollback_failed) ficam de fora
+    undone = {e["undone"] for e in entries if "undone" in e}
+    done = [e["done"] for e in entries if "done" in e and e["done"] not in undone]
+    moved = []
+    with open(journal_path, "a", encoding="utf-8") as journal:
+        try:
+            _undo_or_mark(ops, done, images_dir, journal, moved)
+        finally:
+            # O catálogo acompanha os movimentos desfeitos, mesmo numa falha no meio
+            with image_catalog.catalog_session() as catalog:
+                for old_path, new_path in moved:
+                    image_catalog.rename_image(old_path, new_path, conn=catalog)
+
+        _append(journal, {"status": "undone", "at": time.time()})
+
+    print(f"↩️  Lote {batch_id} desfeito ({len(done)} movimentos)")
+    return len(done)
+
+
+def print_plan(plan):
+    """Resumo do plano (aceitos, conflitos e substituições)"""
+    print(f"\n📋 Plano do lote {plan['batch_id']}: {len(plan['renames'])} renomeações")
+    if plan["displaced"]:
+        print(f"   💾 {len(plan['displaced'])} destino(s) existente(s) serão guardados no lote")
+    cycles = sum(1 for _, dst in plan["ops"] if dst.endswith(".tmp"))
+    if cycles:
+        print(f"   🔁 {cycles} ciclo(s) resolvido(s) com nome temporário")
+    for old_name, new_name, reason in plan["skipped"]:
+        print(f"   ⚠️  Ignorado: {old_name} → {new_name} ({reason})")
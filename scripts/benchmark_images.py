@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmarks de Latência do Processamento de Imagens
+Projeto: Origem das Aves em Theropoda
+
+Mede o custo das etapas de processamento com imagens (e PDFs)
+sintéticos, sem depender dos PDFs ou da pasta images/, e o tempo de
+abertura do run_workflow.py (status e menu).
+
+Requisitos:
+    pip install Pillow numpy
+
+Uso:
+    python benchmark_images.py crop
+    python benchmark_images.py modes
+    python benchmark_images.py startup
+    python benchmark_images.py render
+"""
+
+import argparse
+import io
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Adicionar pasta scripts ao path
+SCRIPT_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+import process_images
+
+# ================== CONFIGURAÇÃO ==================
+
+# Orçamento de abertura do run_workflow.py (ms, processo completo,
+# incluindo o próprio interpretador) para os caminhos sem etapas
+STARTUP_BUDGET_MS = {"status": 150, "menu": 150}
+
+# Módulos que o status e o menu não devem carregar
+HEAVY_MODULES = ["fitz", "pymupdf", "PIL", "numpy"]
+
+# Tamanhos típicos de figuras extraídas (largura, altura)
+BENCHMARK_SIZES = [(1600, 1200), (2480, 3508), (4000, 1500)]
+BENCHMARK_REPEATS = 7
+
+# PDF sintético da renderização: páginas A4 com muitos traços vetoriais
+# curtos (gráficos, cladogramas desenhados) e linhas de texto
+RENDER_PAGES = 4
+RENDER_STROKES = 20000
+RENDER_TEXT_LINES = 40
+RENDER_FIGURE_RECT = (72, 500, 372, 725)
+
+# ================== FUNÇÕES AUXILIARES ==================
+
+def make_synthetic_figure(width, height, seed=0):
+    """
+    Gera uma "figura" sintética: fundo claro com ruído de digitalização
+    e um bloco texturizado fora do centro (o fóssil).
+    """
+    rng = np.random.default_rng(seed)
+    pixels = np.full((height, width, 3), 235, dtype=np.uint8)
+    pixels += rng.integers(0, 8, size=pixels.shape, dtype=np.uint8)
+
+    block_w, block_h = width // 4, height // 4
+    left, top = width // 10, height // 10
+    pixels[top:top + block_h, left:left + block_w] = rng.integers(
+        0, 255, size=(block_h, block_w, 3), dtype=np.uint8
+    )
+    return Image.fromarray(pixels, "RGB")
+
+
+def make_synthetic_pdf(pages=RENDER_PAGES, strokes=RENDER_STROKES, seed=0):
+    """
+    Gera um PDF sintético: cada página com muitos traços vetoriais curtos
+    (o caso caro de interpretar, como um cladograma desenhado), texto e uma
+    figura raster.
+    
+    Returns:
+        bytes: O PDF
+    """
+    import fitz
+
+    rng = np.random.default_rng(seed)
+    figure = io.BytesIO()
+    make_synthetic_figure(800, 600, seed).save(figure, "PNG")
+
+    document = fitz.open()
+    for _ in range(pages):
+        page = document.new_page(width=595, height=842)
+        shape = page.new_shape()
+        starts = rng.uniform(0, 1, size=(strokes, 2)) * [595, 842]
+        for (x, y), (dx, dy) in zip(starts, rng.uniform(-4, 4, size=(strokes, 2))):
+            shape.draw_line((x, y), (x + dx, y + dy))
+        shape.finish(width=0.3, color=(0, 0, 0))
+        shape.commit()
+        for line in range(RENDER_TEXT_LINES):
+            page.insert_text((40, 30 + line * 20), "Fig. 1. Cladograma sintético de Theropoda " * 3, fontsize=8)
+        page.insert_image(fitz.Rect(RENDER_FIGURE_RECT), stream=figure.getvalue())
+    return document.tobytes()
+
+
+def time_call(func, repeats=BENCHMARK_REPEATS):
+    """Mediana do tempo de execução (ms) de func()"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+# ================== BENCHMARKS ==================
+
+def benchmark_smart_crop(preset="reveal_slide", repeats=BENCHMARK_REPEATS):
+    """
+    Compara smart_crop no centro com os modos por saliência.
+
+    O custo extra de cada modo é medido diretamente na escolha da janela
+    (find_salient_crop_box), pois o recorte e o LANCZOS final são comuns
+    a todos os modos e dominam a variação entre execuções.
+
+    Returns:
+        list: Uma linha por tamanho com os tempos (ms) de cada modo
+    """
+    config = process_images.PROCESSING_PRESETS[preset]
+    target = (config["max_width"], config["max_height"])
+    rows = []
+
+    print("=" * 70)
+    print(f"⏱️  BENCHMARK smart_crop (preset {preset}: {target[0]}x{target[1]})")
+    print("=" * 70)
+    print(f"{'Tamanho':<12} {'center':>10} {'entropy':>10} {'edges':>10} {'+entropy':>10} {'+edges':>10}")
+
+    for width, height in BENCHMARK_SIZES:
+        image = make_synthetic_figure(width, height)
+        row = {"size": (width, height)}
+        for mode in process_images.CROP_MODES:
+            row[mode] = time_call(lambda: process_images.smart_crop(image, *target, mode=mode), repeats)
+        for mode in ("entropy", "edges"):
+            row[f"{mode}_overhead"] = time_call(
+                lambda: process_images.find_salient_crop_box(image, *target, mode=mode), repeats
+            )
+        rows.append(row)
+
+        print(f"{width}x{height:<7} {row['center']:>8.1f}ms {row['entropy']:>8.1f}ms {row['edges']:>8.1f}ms "
+              f"{row['entropy_overhead']:>8.2f}ms {row['edges_overhead']:>8.2f}ms")
+
+    print("=" * 70)
+    return rows
+
+
+def legacy_to_rgb(image):
+    """Conversão anterior de process_image (referência para comparação)"""
+    if image.mode in ('RGBA', 'LA', 'P'):
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        if image.mode == 'P':
+            image = image.convert('RGBA')
+        background.paste(image, mask=image.split()[-1] if image.mode == 'RGBA' else None)
+        return background
+    elif image.mode != 'RGB':
+        return image.convert('RGB')
+    return image
+
+
+def make_mode_samples(width=2480, height=3508):
+    """Uma imagem por modo de cor típico de figuras extraídas de PDFs"""
+    from PIL import ImageCms
+
+    rgb = make_synthetic_figure(width, height)
+    samples = {"RGB": rgb}
+
+    rgba = rgb.convert("RGBA")
+    rgba.putalpha(rgb.convert("L"))
+    samples["RGBA"] = rgba
+    samples["LA"] = rgba.convert("LA")
+    samples["L"] = rgb.convert("L")
+    samples["1"] = rgb.convert("1")
+    samples["P"] = rgb.convert("P")
+
+    transparent = rgb.convert("P")
+    transparent.info["transparency"] = 0
+    samples["P+transparency"] = transparent
+
+    samples["CMYK"] = rgb.convert("CMYK")
+    samples["I;16"] = Image.fromarray(np.asarray(samples["L"]).astype(np.uint16) * 257)
+
+    srgb_icc = rgb.copy()
+    srgb_icc.info["icc_profile"] = ImageCms.ImageCmsProfile(ImageCms.createProfile("sRGB")).tobytes()
+    samples["RGB+ICC sRGB"] = srgb_icc
+
+    to_lab = ImageCms.buildTransform(ImageCms.createProfile("sRGB"), ImageCms.createProfile("LAB"), "RGB", "LAB")
+    samples["LAB"] = to_lab.apply(rgb)
+    return samples
+
+
+def benchmark_color_modes(repeats=BENCHMARK_REPEATS):
+    """
+    Compara normalize_color_mode com a conversão anterior, modo a modo,
+    e o custo de construir a transformação ICC versus usar o cache.
+
+    Returns:
+        list: Uma linha por modo com os tempos (ms)
+    """
+    rows = []
+    samples = make_mode_samples()
+
+    print("=" * 70)
+    print("⏱️  BENCHMARK normalização de modo de cor (2480x3508)")
+    print("=" * 70)
+    print(f"{'Modo':<16} {'anterior':>10} {'novo':>10} {'saída':>8}")
+
+    for mode, image in samples.items():
+        # Cópias: a normalização pode alterar paleta/info da imagem de entrada
+        legacy = time_call(lambda: legacy_to_rgb(image.copy()), repeats)
+        current = time_call(lambda: process_images.normalize_color_mode(image.copy()), repeats)
+        output_mode = process_images.normalize_color_mode(image.copy()).mode
+        rows.append({"mode": mode, "legacy_ms": legacy, "normalized_ms": current, "output_mode": output_mode})
+        print(f"{mode:<16} {legacy:>8.1f}ms {current:>8.1f}ms {output_mode:>8}")
+
+    def uncached_lab():
+        process_images._ICC_TRANSFORM_CACHE.clear()
+        process_images.normalize_color_mode(samples["LAB"].copy())
+
+    uncached = time_call(uncached_lab, repeats)
+    cached = time_call(lambda: process_images.normalize_color_mode(samples["LAB"].copy()), repeats)
+    print("-" * 70)
+    print(f"Transformação ICC LAB→sRGB: sem cache {uncached:.1f}ms, com cache {cached:.1f}ms")
+    print("=" * 70)
+    rows.append({"mode": "LAB (sem cache ICC)", "normalized_ms": uncached})
+    return rows
+
+
+def benchmark_startup(repeats=BENCHMARK_REPEATS):
+    """
+    Mede a abertura do run_workflow.py nos caminhos de status e menu
+    e confere o orçamento STARTUP_BUDGET_MS.
+
+    Returns:
+        list: Uma linha por caminho com tempo (ms) e módulos pesados carregados
+    """
+    script = str(SCRIPT_DIR / "run_workflow.py")
+    paths = {
+        "status": ([sys.executable, script, "--status"], ""),
+        # Opção inválida: o menu é exibido e o script encerra
+        "menu": ([sys.executable, script], "X\n"),
+    }
+    probe = (
+        "import sys; sys.argv = ['run_workflow.py']; sys.path.insert(0, {!r}); "
+        "import run_workflow; run_workflow.show_project_status(); "
+        "print('HEAVY=' + ','.join(m for m in {!r} if m in sys.modules))"
+    ).format(str(SCRIPT_DIR), HEAVY_MODULES)
+    rows = []
+
+    print("=" * 70)
+    print("⏱️  BENCHMARK abertura do run_workflow.py")
+    print("=" * 70)
+
+    for name, (command, stdin) in paths.items():
+        elapsed = time_call(
+            lambda: subprocess.run(command, input=stdin, capture_output=True, text=True, check=False),
+            repeats,
+        )
+        budget = STARTUP_BUDGET_MS[name]
+        verdict = "✅ dentro do orçamento" if elapsed <= budget else "❌ acima do orçamento"
+        rows.append({"path": name, "ms": elapsed, "budget_ms": budget})
+        print(f"{name:<8} {elapsed:>8.1f}ms (orçamento {budget}ms) {verdict}")
+
+    loaded = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=False)
+    heavy = next((line[len("HEAVY="):] for line in loaded.stdout.splitlines() if line.startswith("HEAVY=")), "")
+    print(f"Módulos pesados após o status: {heavy or 'nenhum'}")
+    print("=" * 70)
+    return rows
+
+
+def benchmark_multi_resolution(repeats=BENCHMARK_REPEATS):
+    """
+    Compara a renderização de cada página em várias resoluções com uma
+    chamada por DPI (reabrindo o PDF e reinterpretando cada página, como
+    em chamadas repetidas de extract_images_high_resolution) e com a
+    display list compartilhada de render_page_renditions.
+
+    Só a rasterização é medida: gravar o PNG e catalogar custam o mesmo
+    nos dois casos.
+
+    Returns:
+        list: Uma linha por conjunto de rendições com os tempos (ms)
+    """
+    import fitz
+    import extract_pdf_images
+
+    pdf_bytes = make_synthetic_pdf()
+    scenarios = {
+        "thumb+proof+master": extract_pdf_images.RENDITIONS,
+        "+ recorte da figura": extract_pdf_images.RENDITIONS + (
+            {"name": "figure", "dpi": 300, "clip": RENDER_FIGURE_RECT},
+        ),
+    }
+    rows = []
+
+    print("=" * 70)
+    print(f"⏱️  BENCHMARK renderização em várias resoluções ({RENDER_PAGES} páginas, "
+          f"{RENDER_STROKES} traços cada)")
+    print("=" * 70)
+    print(f"{'Rendições':<22} {'repetida':>10} {'display list':>13} {'ganho':>7}")
+
+    for name, renditions in scenarios.items():
+        def repeated():
+            for rendition in renditions:
+                document = fitz.open("pdf", pdf_bytes)
+                for page in document:
+                    page.get_pixmap(dpi=rendition["dpi"], clip=rendition.get("clip"))
+                document.close()
+
+        def shared():
+            document = fitz.open("pdf", pdf_bytes)
+            for page in document:
+                for _ in extract_pdf_images.render_page_renditions(page, renditions):
+                    pass
+            document.close()
+
+        row = {"renditions": name, "repeated_ms": time_call(repeated, repeats),
+               "display_list_ms": time_call(shared, repeats)}
+        rows.append(row)
+        print(f"{name:<22} {row['repeated_ms']:>8.1f}ms {row['display_list_ms']:>11.1f}ms "
+              f"{row['repeated_ms'] / row['display_list_ms']:>6.2f}x")
+
+    print("=" * 70)
+    return rows
+
+
+# ================== EXECUÇÃO ==================
+
+BENCHMARKS = {
+    "crop": benchmark_smart_crop,
+    "modes": benchmark_color_modes,
+    "startup": benchmark_startup,
+    "render": benchmark_multi_resolution,
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks de processamento de imagens")
+    parser.add_argument("benchmark", nargs="?", default="all", choices=["all"] + list(BENCHMARKS))
+    parser.add_argument("--repeats", type=int, default=BENCHMARK_REPEATS)
+    args = parser.parse_args()
+
+    selected = BENCHMARKS.values() if args.benchmark == "all" else [BENCHMARKS[args.benchmark]]
+    for benchmark in selected:
+        benchmark(repeats=args.repeats)
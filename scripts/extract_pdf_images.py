@@ -12,6 +12,12 @@ Requisitos:
 
 Uso:
     python extract_pdf_images.py
+    python extract_pdf_images.py --resume   # continuar uma extração interrompida
+    python extract_pdf_images.py --profile  # medir cada passo (ver profiling.py)
+    python extract_pdf_images.py --shard 2/4  # só a parte 2 de 4 (ver sharding.py)
+    python extract_pdf_images.py --workers 4  # 4 processos (ver extraction_scheduler.py)
+    python extract_pdf_images.py --supervised --page-timeout 60  # páginas com prazo (ver page_watchdog.py)
+    python extract_pdf_images.py --render-pages reveal_slide  # + páginas inteiras no DPI que o preset usa
     
 Autor: Sistema de Extração Automática
 Data: Dezembro 2025
@@ -21,10 +27,26 @@ import fitz  # PyMuPDF
 from PIL import Image
 import io
 import os
+import re
 import sys
+import time
 from pathlib import Path
 import json
 
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import extraction_scheduler
+import image_catalog
+import image_layout
+import page_watchdog
+import pipeline_metrics
+import profiling
+import run_journal
+import sharding
+from process_images import (
+    PROCESSING_PRESETS, process_loaded_image, trim_margins, write_processing_report
+)
+
 # ================== CONFIGURAÇÃO ==================
 
 # Diretórios do projeto
@@ -33,10 +55,6 @@ PDF_DIR = PROJECT_ROOT
 IMAGES_OUTPUT_DIR = PROJECT_ROOT / "images"
 ASSETS_DIR = PROJECT_ROOT / "assets"
 
-# Criar diretórios se não existirem
-IMAGES_OUTPUT_DIR.mkdir(exist_ok=True)
-ASSETS_DIR.mkdir(exist_ok=True)
-
 # Mapeamento de PDFs para categorias de imagens
 PDF_MAPPING = {
     "Origin of the propatagium in non-avian dinosaurs.pdf": {
@@ -76,27 +94,238 @@ MIN_WIDTH = 400
 MIN_HEIGHT = 400
 MIN_DPI = 150
 
+# Início de legenda de figura ("Fig. 2", "Figure 3", "FIG 1A"...)
+CAPTION_PATTERN = re.compile(r"^\s*(fig\.?|figure|figura)\s*\d", re.IGNORECASE)
+CAPTION_MAX_CHARS = 300
+
+# Execução supervisionada: opções de cada nova tentativa de uma página que
+# travou, estourou a memória ou teve figuras com erro (ver page_watchdog.py)
+SUPERVISED_ATTEMPTS = (
+    {},
+    {"render_dpi": 150},
+    {"render_dpi": 72, "trim": False},
+)
+
+# Rendições padrão da renderização de páginas em várias resoluções
+RENDITIONS = (
+    {"name": "thumb", "dpi": 36},
+    {"name": "proof", "dpi": 150},
+    {"name": "master", "dpi": 300},
+)
+
+# Renderização adaptativa: DPI máximo (o fixo de antes), folga sobre o DPI
+# mínimo que atende ao maior preset pedido e piso do DPI calculado
+RENDER_MAX_DPI = 300
+ADAPTIVE_OVERSAMPLE = 1.1
+ADAPTIVE_MIN_DPI = 36
+
 # ================== FUNÇÕES PRINCIPAIS ==================
 
-def extract_images_from_pdf(pdf_path, output_prefix="image", min_width=MIN_WIDTH, min_height=MIN_HEIGHT):
+def ensure_output_dirs():
+    """Cria as pastas de saída (na execução, não na importação do módulo)"""
+    IMAGES_OUTPUT_DIR.mkdir(exist_ok=True)
+    ASSETS_DIR.mkdir(exist_ok=True)
+
+
+def record_trim(trim_stats, trim_info, original_bytes, saved_bytes):
+    """
+    Acumula no relatório o que a remoção de margens economizou.
+    
+    Args:
+        trim_stats (dict): Acumulador (ignorado se None)
+        trim_info (dict): Resultado de trim_margins
+        original_bytes (int): Bytes do stream original no PDF (None se renderizado)
+        saved_bytes (int): Bytes do arquivo salvo (None se o original não foi gravado)
+    """
+    if trim_stats is None:
+        return
+    trim_stats["images_trimmed"] = trim_stats.get("images_trimmed", 0) + 1
+    trim_stats["pixels_removed"] = trim_stats.get("pixels_removed", 0) + trim_info["pixels_removed"]
+    trim_stats["decoded_bytes_removed"] = (
+        trim_stats.get("decoded_bytes_removed", 0) + trim_info["decoded_bytes_removed"]
+    )
+    if original_bytes is not None and saved_bytes is not None:
+        trim_stats["file_bytes_removed"] = (
+            trim_stats.get("file_bytes_removed", 0) + max(original_bytes - saved_bytes, 0)
+        )
+
+
+def merge_trim(trim_stats, page_trim):
+    """Soma as estatísticas de margens de uma página ao acumulador do PDF"""
+    if trim_stats is None:
+        return
+    for key, value in page_trim.items():
+        trim_stats[key] = trim_stats.get(key, 0) + value
+
+
+def resumed_page(journal, page_key, pdf_fingerprint):
+    """
+    Resultado de uma página já concluída (no diário e com os arquivos no
+    disco), ou None.
+
+    Páginas com figuras que falharam ou em quarentena são refeitas: a falha
+    pode ter sido passageira (MemoryError, decodificação instável).
+    """
+    done = journal.lookup(page_key, pdf_fingerprint) if journal else None
+    if done is None or done.get("failed"):
+        return None
+    if done.get("supervision", {}).get("status") == "quarantined":
+        return None
+    if all(os.path.exists(path) for path in done["files"]):
+        return done
+    return None
+
+
+def source_label(pdf_path):
+    """Referência do artigo (ex.: "Foth & Rauhut (2017)") a partir do PDF_MAPPING"""
+    description = PDF_MAPPING.get(os.path.basename(pdf_path), {}).get("description")
+    return description.split(" - ")[0] if description else None
+
+
+def find_caption(page, xref, text_blocks):
+    """
+    Legenda mais próxima da imagem na página (de preferência logo abaixo).
+    
+    Args:
+        page (fitz.Page): Página do PDF
+        xref (int): xref da imagem
+        text_blocks (list): Blocos de page.get_text("blocks") (lidos uma vez por página)
+    
+    Returns:
+        str: Texto da legenda (encurtado) ou None
+    """
+    captions = [block for block in text_blocks if block[6] == 0 and CAPTION_PATTERN.match(block[4])]
+    if not captions:
+        return None
+    
+    try:
+        rects = page.get_image_rects(xref)
+    except Exception:
+        rects = []
+    if not rects:
+        return None
+    rect = rects[0]
+    
+    def distance(block):
+        if block[1] >= rect.y1 - 5:
+            return block[1] - rect.y1          # abaixo da imagem
+        return rect.y0 - block[3] + page.rect.height  # acima: só se não houver abaixo
+    
+    text = " ".join(min(captions, key=distance)[4].split())
+    return text[:CAPTION_MAX_CHARS]
+
+
+def decode_figure(document, page, img_info, render_dpi=None):
+    """
+    Decodifica uma imagem de uma página, sem gravar nada.
+    
+    Args:
+        document (fitz.Document): PDF aberto
+        page (fitz.Page): Página da imagem
+        img_info (tuple): Entrada de page.get_images(full=True)
+        render_dpi (int): Renderizar a área da figura neste DPI em vez de
+            decodificar o stream embutido (modo degradado)
+    
+    Returns:
+        tuple: (imagem PIL, bytes do stream ou None, extensão,
+                (largura, altura) nativas, para o filtro de tamanho)
+    """
+    xref = img_info[0]
+    if render_dpi:
+        # Modo degradado: renderizar a área da figura em DPI reduzido
+        # em vez de decodificar o stream em resolução total
+        rects = page.get_image_rects(xref)
+        if not rects:
+            raise ValueError("imagem sem posição na página")
+        with profiling.span("get_pixmap", "extract", page=page.number + 1, dpi=render_dpi):
+            pix = page.get_pixmap(clip=rects[0], dpi=render_dpi)
+        pil_image = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+        return pil_image, None, "png", (img_info[2], img_info[3])
+    
+    # Extrair imagem base
+    with profiling.span("extract_image", "extract", page=page.number + 1, xref=xref):
+        base_image = document.extract_image(xref)
+    image_bytes = base_image["image"]
+    
+    # Carregar com Pillow para verificar dimensões
+    with profiling.span("Image.open", "extract"):
+        pil_image = Image.open(io.BytesIO(image_bytes))
+    return pil_image, image_bytes, base_image["ext"], pil_image.size
+
+
+def trim_figure(pil_image, image_ext):
+    """
+    Remove as margens brancas de uma figura (formatos exóticos passam a PNG).
+    
+    Returns:
+        tuple: (imagem, extensão de saída, dict do recorte)
+    """
+    pil_image, trim_info = trim_margins(pil_image)
+    if trim_info["pixels_removed"] and image_ext.lower() not in ['png', 'jpg', 'jpeg']:
+        image_ext = "png"
+    return pil_image, image_ext, trim_info
+
+
+def encode_figure(pil_image, image_bytes, image_ext):
+    """
+    Bytes do arquivo de uma figura: PNG/JPEG regravados (q95 otimizado);
+    outros formatos, o stream original do PDF.
+    """
+    if image_ext.lower() not in ['png', 'jpg', 'jpeg']:
+        return image_bytes
+    buffer = io.BytesIO()
+    pil_image.save(buffer, format="PNG" if image_ext.lower() == "png" else "JPEG", quality=95, optimize=True)
+    return buffer.getvalue()
+
+
+def extract_images_from_pdf(pdf_path, output_prefix="image", min_width=MIN_WIDTH, min_height=MIN_HEIGHT,
+                            trim=False, trim_stats=None, process_preset=None, process_options=None,
+                            write_original=True, processing_results=None, journal=None,
+                            shard=None, units=None, pages=None, render_dpi=None, xrefs=None):
     """
     Extrai todas as imagens de um PDF e salva com qualidade alta.
     
+    Com `process_preset`, cada imagem decodificada segue direto (em memória)
+    para o processamento do preset, sem regravar e reler o original.
+    
     Args:
         pdf_path (str): Caminho para o arquivo PDF
         output_prefix (str): Prefixo para nomear as imagens extraídas
         min_width (int): Largura mínima para considerar a imagem
         min_height (int): Altura mínima para considerar a imagem
+        trim (bool): Remover margens brancas antes de salvar
+        trim_stats (dict): Acumulador opcional de pixels/bytes removidos
+        process_preset (str): Preset de process_images aplicado em memória
+        process_options (dict): Opções extras (enhance, crop, crop_mode, trim)
+        write_original (bool): Gravar também o original em images/
+        processing_results (list): Acumulador dos resultados do processamento
+        journal (RunJournal): Diário de checkpoints; cada página concluída é
+            registrada, e páginas já registradas (mesmo PDF) são puladas
+        shard (tuple): (i, N) para extrair só as páginas desta parte
+        units (dict): Acumulador da execução por partes: 'universe' (todas
+            as páginas vistas) e 'completed' ({página: resultado})
+        pages (list): Extrair só estas páginas (0-based; faixas do pool)
+        render_dpi (int): Modo degradado da execução supervisionada:
+            renderizar a área de cada figura neste DPI em vez de decodificar
+            o stream embutido
+        xrefs (set): Extrair só as figuras com estes xrefs (nova tentativa
+            das que falharam; as demais já estão em images/)
     
     Returns:
-        list: Lista de caminhos das imagens extraídas
+        list: Caminhos das imagens extraídas (ou das processadas, se o
+              original não for gravado)
     """
     if not os.path.exists(pdf_path):
         print(f"❌ PDF não encontrado: {pdf_path}")
         return []
     
     print(f"\n📄 Processando: {os.path.basename(pdf_path)}")
+    ensure_output_dirs()
     extracted_images = []
+    catalog = image_catalog.connect()
+    pdf_fingerprint = run_journal.file_fingerprint(pdf_path)
+    resumed_pages = 0
+    metrics = pipeline_metrics.current()
     
     try:
         # Abrir o PDF
@@ -104,116 +333,680 @@ def extract_images_from_pdf(pdf_path, output_prefix="image", min_width=MIN_WIDTH
         print(f"   Total de páginas: {pdf_document.page_count}")
         
         # Iterar por cada página
-        for page_num in range(pdf_document.page_count):
+        for page_num in range(pdf_document.page_count) if pages is None else pages:
+            page_key = sharding.page_key(os.path.basename(pdf_path), page_num + 1)
+            if units is not None:
+                units["universe"].append(page_key)
+            if not sharding.in_shard(page_key, shard):
+                continue
+            
+            # Página já concluída numa execução interrompida
+            done = resumed_page(journal, page_key, pdf_fingerprint)
+            if done is not None:
+                if units is not None:
+                    units["completed"][page_key] = done
+                extracted_images.extend(done["files"])
+                metrics.count("skipped", len(done["files"]))
+                merge_trim(trim_stats, done["trim"])
+                if processing_results is not None:
+                    processing_results.extend(done["processed"])
+                resumed_pages += 1
+                continue
+            
+            page_files = []
+            page_results = []
+            page_trim = {}
+            page_failed = []
             page = pdf_document[page_num]
             image_list = page.get_images(full=True)
             
             if image_list:
                 print(f"   📑 Página {page_num + 1}: {len(image_list)} imagem(ns) encontrada(s)")
+                with profiling.span("get_text", "extract", page=page_num + 1):
+                    text_blocks = page.get_text("blocks")
             
             # Extrair cada imagem da página
             for img_index, img_info in enumerate(image_list):
                 xref = img_info[0]  # Referência da imagem
+                if xrefs is not None and xref not in xrefs:
+                    continue
+                started = time.perf_counter()
+                decoded = False
                 
                 try:
-                    # Extrair imagem base
-                    base_image = pdf_document.extract_image(xref)
-                    image_bytes = base_image["image"]
-                    image_ext = base_image["ext"]
-                    
-                    # Carregar com Pillow para verificar dimensões
-                    pil_image = Image.open(io.BytesIO(image_bytes))
-                    width, height = pil_image.size
+                    pil_image, image_bytes, image_ext, (width, height) = decode_figure(
+                        pdf_document, page, img_info, render_dpi
+                    )
+                    source_bytes = len(image_bytes) if image_bytes is not None else None
+                    decoded = True
                     
                     # Filtrar imagens muito pequenas (logos, ícones)
                     if width < min_width or height < min_height:
                         print(f"      ⚠️  Imagem {img_index + 1} ignorada (muito pequena: {width}x{height})")
+                        metrics.count("skipped")
                         continue
                     
+                    # Remover margens brancas (formatos exóticos passam a PNG)
+                    trim_info = None
+                    if trim:
+                        pil_image, image_ext, trim_info = trim_figure(pil_image, image_ext)
+                    
                     # Nome do arquivo de saída
                     output_filename = f"{output_prefix}_p{page_num + 1}_img{img_index + 1}.{image_ext}"
-                    output_path = IMAGES_OUTPUT_DIR / output_filename
+                    output_path = image_layout.prepare(output_filename)
                     
-                    # Salvar imagem
-                    if image_ext.lower() in ['png', 'jpg', 'jpeg']:
-                        pil_image.save(output_path, quality=95, optimize=True)
-                    else:
-                        with open(output_path, "wb") as img_file:
-                            img_file.write(image_bytes)
+                    # Salvar imagem (opcional no pipeline fundido); remover antes de
+                    # regravar para não alterar um hardlink do backup_store
+                    if write_original:
+                        output_path.unlink(missing_ok=True)
+                        with profiling.span("save", "extract", format=image_ext):
+                            output_path.write_bytes(encode_figure(pil_image, image_bytes, image_ext))
+                        image_layout.register(output_path)
+                        
+                        # Registrar no catálogo com a origem exata no PDF
+                        saved_format = {"jpg": "JPEG", "jpeg": "JPEG", "png": "PNG"}.get(
+                            image_ext.lower(), pil_image.format
+                        )
+                        with profiling.span("find_caption", "extract"):
+                            caption = find_caption(page, xref, text_blocks)
+                        with profiling.span("record_image", "catalog"):
+                            image_catalog.record_image(
+                                output_path, size=pil_image.size, image_format=saved_format, mode=pil_image.mode,
+                                source_pdf=os.path.basename(pdf_path), source_label=source_label(pdf_path),
+                                source_page=page_num + 1, source_xref=xref,
+                                source_kind="rendered" if render_dpi else "embedded",
+                                caption=caption, conn=catalog
+                            )
+                    
+                    if trim_info and trim_info["pixels_removed"]:
+                        saved_bytes = output_path.stat().st_size if write_original else None
+                        record_trim(page_trim, trim_info, source_bytes, saved_bytes)
+                        print(f"      ✂️  Margens removidas: {trim_info['pixels_removed']} px")
                     
-                    print(f"      ✅ Extraída: {output_filename} ({width}x{height})")
-                    extracted_images.append(str(output_path))
+                    print(f"      ✅ Extraída: {output_filename} ({pil_image.size[0]}x{pil_image.size[1]})")
+                    metrics.add_bytes("in", source_bytes)
+                    if write_original:
+                        page_files.append(str(output_path))
+                        metrics.add_bytes("out", output_path.stat().st_size)
+                    
+                    # Pipeline fundido: processar a imagem já decodificada
+                    if process_preset:
+                        with profiling.span("process_loaded_image", "process", file=output_filename):
+                            result = process_loaded_image(
+                                pil_image, output_filename, image_layout.path_for(output_filename, "processed"), process_preset,
+                                original_file_size=source_bytes and source_bytes / 1024, catalog=catalog,
+                                **(process_options or {})
+                            )
+                        page_results.append(result)
+                        if not write_original and result["status"] == "success":
+                            page_files.append(str(image_layout.path_for(result["output"], "processed")))
+                    
+                    # No pipeline fundido, a figura só conta como processada se o preset também deu certo
+                    if process_preset and result["status"] != "success":
+                        metrics.count("failed")
+                    else:
+                        metrics.count("processed")
+                    metrics.observe(time.perf_counter() - started)
                     
                 except Exception as img_error:
                     print(f"      ❌ Erro ao extrair imagem {img_index + 1}: {img_error}")
+                    page_failed.append({
+                        "image": img_index + 1, "xref": xref,
+                        "error": f"{type(img_error).__name__}: {img_error}",
+                    })
+                    metrics.count("failed")
+                    if not decoded:
+                        metrics.decode_failure()
                     continue
+            
+            extracted_images.extend(page_files)
+            merge_trim(trim_stats, page_trim)
+            if processing_results is not None:
+                processing_results.extend(page_results)
+            page_entry = {"files": page_files, "trim": page_trim, "processed": page_results, "failed": page_failed}
+            if units is not None:
+                units["completed"][page_key] = page_entry
+            # Catálogo antes do diário: página registrada = página completa
+            # (e transações curtas com vários processos gravando)
+            catalog.commit()
+            if journal:
+                journal.record(page_key, pdf_fingerprint, page_entry)
         
         pdf_document.close()
+        if resumed_pages:
+            print(f"   ⏩ {resumed_pages} página(s) já extraída(s) (diário de checkpoints)")
         print(f"   ✨ Total extraído deste PDF: {len(extracted_images)} imagens\n")
         
     except Exception as e:
         print(f"   ❌ Erro ao processar PDF: {e}\n")
         return []
+    finally:
+        catalog.commit()
+        catalog.close()
     
     return extracted_images
 
 
-def extract_images_high_resolution(pdf_path, output_prefix="highres", target_dpi=300):
+def record_render(render_stats, dpi, pixels, fixed_dpi_pixels):
     """
-    Extrai imagens em alta resolução renderizando páginas como imagens.
-    Útil para capturar figuras compostas ou gráficos complexos.
+    Acumula no relatório os pixels que a renderização adaptativa evitou.
+    
+    Args:
+        render_stats (dict): Acumulador (ignorado se None)
+        dpi (int): DPI usado
+        pixels (int): Pixels renderizados
+        fixed_dpi_pixels (int): Pixels que o DPI fixo teria renderizado
+    """
+    if render_stats is None:
+        return
+    render_stats["images_rendered"] = render_stats.get("images_rendered", 0) + 1
+    render_stats["pixels_rendered"] = render_stats.get("pixels_rendered", 0) + pixels
+    render_stats["pixels_at_fixed_dpi"] = render_stats.get("pixels_at_fixed_dpi", 0) + fixed_dpi_pixels
+    render_stats["pixels_saved"] = render_stats["pixels_at_fixed_dpi"] - render_stats["pixels_rendered"]
+    render_stats["min_dpi"] = min(render_stats.get("min_dpi", dpi), dpi)
+    render_stats["max_dpi"] = max(render_stats.get("max_dpi", dpi), dpi)
+
+
+def adaptive_render_dpi(width_pt, height_pt, presets, crop=False, oversample=ADAPTIVE_OVERSAMPLE,
+                        max_dpi=RENDER_MAX_DPI):
+    """
+    Menor DPI cuja renderização de uma área ainda atende ao maior preset.
+    
+    Sem recorte, o preset encaixa a imagem na caixa (basta o lado que limita);
+    com recorte, ela cobre a caixa (os dois lados precisam de resolução).
+    
+    Args:
+        width_pt (float): Largura da área (pontos, 1/72")
+        height_pt (float): Altura da área
+        presets (list): Nomes de PROCESSING_PRESETS que vão usar a imagem
+        crop (bool): Os presets recortam para a proporção da caixa
+        oversample (float): Folga sobre o mínimo (1.1 = 10% a mais)
+        max_dpi (int): Nunca passar deste DPI (o fixo de antes)
+    
+    Returns:
+        int: DPI a renderizar
+    """
+    fit = max if crop else min
+    scale = max(
+        fit(PROCESSING_PRESETS[name]["max_width"] / width_pt, PROCESSING_PRESETS[name]["max_height"] / height_pt)
+        for name in presets
+    )
+    dpi = int(-(-scale * 72 * oversample // 1))  # arredondar para cima
+    return max(ADAPTIVE_MIN_DPI, min(dpi, max_dpi))
+
+
+def content_rect(page, area):
+    """Área ocupada pelo conteúdo desenhado dentro de `area` (para o trim)"""
+    content = fitz.Rect()
+    for _, bbox in page.get_bboxlog():
+        content |= fitz.Rect(bbox) & area
+    return content if not content.is_empty else area
+
+
+def resolve_rendition(page, rendition, trim=False):
+    """
+    DPI de uma rendição nesta página: o fixo ('dpi') ou, com 'presets', o
+    adaptativo (limitado por 'dpi', padrão RENDER_MAX_DPI).
+    
+    Returns:
+        tuple: (rendição com 'dpi' definido, pixels que o DPI fixo teria dado
+                ou None se a rendição não for adaptativa)
+    """
+    if not rendition.get("presets"):
+        return rendition, None
+    max_dpi = rendition.get("dpi", RENDER_MAX_DPI)
+    area = fitz.Rect(rendition["clip"]) if rendition.get("clip") else page.rect
+    # Com trim, o preset recebe só o conteúdo: a resolução precisa bastar para ele
+    target = content_rect(page, area) if trim else area
+    dpi = adaptive_render_dpi(
+        target.width, target.height, rendition["presets"], crop=rendition.get("crop", False),
+        oversample=rendition.get("oversample", ADAPTIVE_OVERSAMPLE), max_dpi=max_dpi
+    )
+    fixed_pixels = round(area.width * max_dpi / 72) * round(area.height * max_dpi / 72)
+    return dict(rendition, dpi=dpi), fixed_pixels
+
+
+def render_page_renditions(page, renditions):
+    """
+    Rasteriza uma página em várias resoluções/recortes interpretando o
+    conteúdo uma única vez: a página vira uma display list do MuPDF, que é
+    rasterizada para cada rendição sem reler o stream de conteúdo.
+    
+    Args:
+        page (fitz.Page): Página do PDF
+        renditions (list): dicts com 'dpi' e, opcional, 'clip' (x0, y0, x1, y1
+            em pontos da página)
+    
+    Yields:
+        tuple: (rendição, fitz.Pixmap)
+    """
+    with profiling.span("get_displaylist", "extract", page=page.number + 1):
+        display_list = page.get_displaylist()
+    for rendition in renditions:
+        zoom = rendition["dpi"] / 72  # Fator de zoom (72 DPI é o padrão)
+        clip = fitz.Rect(rendition["clip"]) if rendition.get("clip") else None
+        with profiling.span("get_pixmap", "extract", page=page.number + 1, dpi=rendition["dpi"]):
+            pix = display_list.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=clip)
+        yield rendition, pix
+
+
+def extract_images_multi_resolution(pdf_path, renditions=RENDITIONS, output_prefix="multires",
+                                    trim=False, trim_stats=None, render_stats=None):
+    """
+    Renderiza cada página em várias resoluções (miniatura, prova, matriz...)
+    numa só passada: o PDF é aberto uma vez e cada página é interpretada uma
+    vez (ver render_page_renditions).
     
     Args:
         pdf_path (str): Caminho para o arquivo PDF
+        renditions (list): dicts com 'name' (sufixo do arquivo; None = sem
+            sufixo), 'dpi' e, opcional, 'clip' (x0, y0, x1, y1 em pontos).
+            Com 'presets' (e opcionais 'crop' e 'oversample'), o DPI de cada
+            página é o mínimo que atende ao maior preset (ver
+            adaptive_render_dpi) e 'dpi' passa a ser o teto
         output_prefix (str): Prefixo para nomear as imagens
-        target_dpi (int): DPI para renderização (padrão: 300)
+        trim (bool): Remover as margens brancas das páginas renderizadas
+        trim_stats (dict): Acumulador opcional de pixels/bytes removidos
+        render_stats (dict): Acumulador opcional dos pixels evitados pelas
+            rendições adaptativas
     
     Returns:
-        list: Lista de caminhos das imagens geradas
+        dict: {nome da rendição: caminhos das imagens geradas}
     """
     if not os.path.exists(pdf_path):
         print(f"❌ PDF não encontrado: {pdf_path}")
-        return []
+        return {}
     
-    print(f"\n📸 Renderização em alta resolução: {os.path.basename(pdf_path)}")
-    rendered_images = []
+    dpis = ", ".join(
+        "adaptativo" if rendition.get("presets") else str(rendition["dpi"]) for rendition in renditions
+    )
+    print(f"\n📸 Renderização ({dpis} DPI): {os.path.basename(pdf_path)}")
+    ensure_output_dirs()
+    rendered_images = {rendition["name"]: [] for rendition in renditions}
+    catalog = image_catalog.connect()
     
     try:
         pdf_document = fitz.open(pdf_path)
-        zoom = target_dpi / 72  # Fator de zoom (72 DPI é o padrão)
-        matrix = fitz.Matrix(zoom, zoom)
         
         for page_num in range(pdf_document.page_count):
             page = pdf_document[page_num]
+            resolved = [resolve_rendition(page, rendition, trim) for rendition in renditions]
+            fixed_pixels = [pixels for _, pixels in resolved]
             
-            # Renderizar página como imagem
-            pix = page.get_pixmap(matrix=matrix)
-            
-            # Salvar imagem
-            output_filename = f"{output_prefix}_page{page_num + 1}.png"
-            output_path = IMAGES_OUTPUT_DIR / output_filename
-            pix.save(output_path)
-            
-            print(f"   ✅ Página {page_num + 1} renderizada: {output_filename} ({pix.width}x{pix.height})")
-            rendered_images.append(str(output_path))
+            for index, (rendition, pix) in enumerate(
+                render_page_renditions(page, [rendition for rendition, _ in resolved])
+            ):
+                if fixed_pixels[index] is not None:
+                    record_render(render_stats, rendition["dpi"], pix.width * pix.height, fixed_pixels[index])
+                # Salvar imagem
+                suffix = f"_{rendition['name']}" if rendition["name"] else ""
+                output_filename = f"{output_prefix}_page{page_num + 1}{suffix}.png"
+                output_path = image_layout.prepare(output_filename)
+                width, height = pix.width, pix.height
+                output_path.unlink(missing_ok=True)  # não regravar hardlinks do backup_store
+                
+                if trim:
+                    page_image = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+                    page_image, trim_info = trim_margins(page_image)
+                    with profiling.span("save", "extract", format="png"):
+                        page_image.save(output_path)
+                    width, height = page_image.size
+                    if trim_info["pixels_removed"]:
+                        record_trim(trim_stats, trim_info, None, output_path.stat().st_size)
+                else:
+                    with profiling.span("save", "extract", format="png"):
+                        pix.save(output_path)
+                image_layout.register(output_path)
+                
+                with profiling.span("record_image", "catalog"):
+                    image_catalog.record_image(
+                        output_path, size=(width, height), image_format="PNG", mode="RGB",
+                        source_pdf=os.path.basename(pdf_path), source_label=source_label(pdf_path),
+                        source_page=page_num + 1, source_kind="rendered", conn=catalog
+                    )
+                
+                print(f"   ✅ Página {page_num + 1} renderizada: {output_filename} ({width}x{height})")
+                rendered_images[rendition["name"]].append(str(output_path))
         
+        page_count = pdf_document.page_count
         pdf_document.close()
-        print(f"   ✨ Total renderizado: {len(rendered_images)} páginas\n")
+        total = sum(len(paths) for paths in rendered_images.values())
+        print(f"   ✨ Total renderizado: {total} imagens de {page_count} páginas\n")
         
     except Exception as e:
         print(f"   ❌ Erro na renderização: {e}\n")
-        return []
+        return {}
+    finally:
+        catalog.commit()
+        catalog.close()
     
     return rendered_images
 
 
-def process_all_pdfs():
+def extract_images_high_resolution(pdf_path, output_prefix="highres", target_dpi=RENDER_MAX_DPI,
+                                   trim=False, trim_stats=None, presets=None, oversample=ADAPTIVE_OVERSAMPLE,
+                                   render_stats=None):
+    """
+    Extrai imagens em alta resolução renderizando páginas como imagens.
+    Útil para capturar figuras compostas ou gráficos complexos.
+    
+    Para várias resoluções da mesma página, use extract_images_multi_resolution
+    (uma passada só, em vez de uma chamada por DPI).
+    
+    Args:
+        pdf_path (str): Caminho para o arquivo PDF
+        output_prefix (str): Prefixo para nomear as imagens
+        target_dpi (int): DPI para renderização (padrão: 300); com presets,
+            o teto do DPI adaptativo
+        trim (bool): Remover as margens brancas da página renderizada
+        trim_stats (dict): Acumulador opcional de pixels/bytes removidos
+        presets (list): Presets de process_images que vão usar as páginas:
+            cada página sai no menor DPI que atende ao maior deles, em vez
+            de pixels que o processamento jogaria fora
+        oversample (float): Folga sobre o DPI mínimo (com presets)
+        render_stats (dict): Acumulador opcional dos pixels evitados
+    
+    Returns:
+        list: Lista de caminhos das imagens geradas
+    """
+    rendition = {"name": None, "dpi": target_dpi}
+    if presets:
+        rendition.update(presets=list(presets), oversample=oversample)
+    rendered = extract_images_multi_resolution(
+        pdf_path, [rendition], output_prefix=output_prefix,
+        trim=trim, trim_stats=trim_stats, render_stats=render_stats
+    )
+    return rendered.get(None, [])
+
+
+# ================== EXTRAÇÃO PARALELA ==================
+
+def extract_page_range(job, options, profile=None):
+    """
+    Tarefa do pool: extrai uma faixa de páginas de um PDF.
+    
+    Args:
+        job (dict): Faixa de extraction_scheduler.plan_jobs ('pdf', 'pages')
+        options (dict): Argumentos de extract_images_from_pdf (prefixo, trim...)
+        profile (dict): profiling.worker_settings() do processo principal
+    
+    Returns:
+        dict: 'pages' ({chave: resultado}), 'metrics' (StageMetrics),
+              'traces' (coletas do profiling, para profiling.merge) e 'actual_s'
+    """
+    started = time.perf_counter()
+    units = {"universe": [], "completed": {}}
+    with pipeline_metrics.collecting("extract") as metrics, \
+            profiling.collecting(profile, "extract_page_range") as trace:
+        extract_images_from_pdf(str(PDF_DIR / job["pdf"]), pages=job["pages"], units=units, **options)
+    return {"pages": units["completed"], "metrics": metrics, "traces": [trace],
+            "actual_s": time.perf_counter() - started}
+
+
+def extract_supervised_page(job, options, profile, degraded):
+    """
+    Tarefa supervisionada (page_watchdog): uma página com as opções do PDF
+    e as da tentativa atual.
+    
+    Depois de um resultado parcial ('previous'), a tentativa refaz só as
+    figuras que falharam e junta o resultado ao anterior: as figuras já
+    extraídas não são regravadas com as opções degradadas, e os erros
+    anteriores ficam em 'retried'.
+    
+    Returns:
+        tuple: ('ok' ou 'partial', resultado de extract_page_range)
+    """
+    degraded = dict(degraded)
+    previous = degraded.pop("previous", None)
+    if previous is not None:
+        previous_entry = next(iter(previous["pages"].values()))
+        degraded["xrefs"] = {failed["xref"] for failed in previous_entry["failed"]}
+    outcome = extract_page_range(job, dict(options, **degraded), profile)
+    if not outcome["pages"]:
+        raise RuntimeError("página não concluída")
+    page_key, page_entry = next(iter(outcome["pages"].items()))
+    if previous is not None:
+        trim = dict(previous_entry["trim"])
+        merge_trim(trim, page_entry["trim"])
+        page_entry = {
+            "files": previous_entry["files"] + page_entry["files"],
+            "trim": trim,
+            "processed": previous_entry["processed"] + page_entry["processed"],
+            "failed": page_entry["failed"],
+            "retried": previous_entry.get("retried", []) + previous_entry["failed"],
+        }
+        outcome["pages"] = {page_key: page_entry}
+        # As figuras refeitas contam uma vez só, pelo desfecho desta tentativa
+        previous["metrics"].count("failed", -len(degraded["xrefs"]))
+        previous["metrics"].merge(outcome["metrics"])
+        outcome["metrics"] = previous["metrics"]
+        outcome["traces"] = previous["traces"] + outcome["traces"]
+    return ("partial" if page_entry["failed"] else "ok"), outcome
+
+
+def supervision_summary(entries):
+    """
+    Páginas que só saíram com opções degradadas e páginas em quarentena.
+    
+    Args:
+        entries (dict): {chave da página: resultado}
+    
+    Returns:
+        dict: 'degraded' e 'quarantine' (página, tentativas, figuras com
+              erro e erros das figuras refeitas em outra tentativa)
+    """
+    summary = {"degraded": [], "quarantine": []}
+    for page_key, page_entry in entries.items():
+        supervision = page_entry.get("supervision")
+        if not supervision:
+            continue
+        section = "degraded" if supervision["status"] == "degraded" else "quarantine"
+        summary[section].append({
+            "page": page_key,
+            "attempts": supervision["attempts"],
+            "failed": page_entry.get("failed", []),
+            "retried": page_entry.get("retried", []),
+        })
+    return summary
+
+
+def run_scheduled_extraction(options, workers, journal, shard=None, units=None, limits=None):
+    """
+    Extrai os PDFs num pool de processos, em faixas de páginas entregues da
+    mais cara para a mais barata (ver extraction_scheduler.py).
+    
+    Páginas já concluídas (diário) ou de outra parte (shard) ficam fora das
+    faixas; as concluídas pelo pool são registradas no diário aqui, no
+    processo principal.
+    
+    Com `limits`, cada página roda num processo supervisionado, que é morto
+    ao passar do prazo ou da memória e refeito com SUPERVISED_ATTEMPTS;
+    páginas que esgotam as tentativas ficam em quarentena (o melhor
+    resultado parcial é mantido; sem nenhum, --resume tenta de novo).
+    
+    Args:
+        options (dict): {PDF: argumentos de extract_images_from_pdf}
+        workers (int): Processos do pool
+        journal (RunJournal): Diário de checkpoints
+        shard (tuple): (i, N) para extrair só as páginas desta parte
+        units (dict): Acumulador da execução por partes
+        limits (dict): 'timeout' (s) e 'memory_mb' por página (supervisão)
+    
+    Returns:
+        tuple: ({PDF: resultados das páginas, em ordem}, seções do relatório:
+                'schedule' e, com supervisão, 'supervision')
+    """
+    metrics = pipeline_metrics.current()
+    fingerprints = {}
+    page_keys = {}
+    entries = {}
+    pending = {}
+    analyses = []
+    
+    # Análise prévia e páginas que ainda faltam
+    for pdf_filename in options:
+        pdf_path = PDF_DIR / pdf_filename
+        try:
+            with profiling.span("analyze_pdf", "extract", pdf=pdf_filename):
+                analysis = extraction_scheduler.analyze_pdf(pdf_path, MIN_WIDTH, MIN_HEIGHT)
+        except Exception as e:
+            print(f"   ❌ Erro ao analisar {pdf_filename}: {e}")
+            page_keys[pdf_filename] = []
+            continue
+        analyses.append(analysis)
+        fingerprints[pdf_filename] = run_journal.file_fingerprint(pdf_path)
+        page_keys[pdf_filename] = []
+        pending[pdf_filename] = []
+        for page_num in range(len(analysis["page_costs"])):
+            page_key = sharding.page_key(pdf_filename, page_num + 1)
+            if units is not None:
+                units["universe"].append(page_key)
+            if not sharding.in_shard(page_key, shard):
+                continue
+            page_keys[pdf_filename].append(page_key)
+            done = resumed_page(journal, page_key, fingerprints[pdf_filename])
+            if done is not None:
+                entries[page_key] = done
+                metrics.count("skipped", len(done["files"]))
+            else:
+                pending[pdf_filename].append(page_num)
+    
+    jobs = extraction_scheduler.plan_jobs(analyses, workers, pending, max_pages=1 if limits else None)
+    for job in jobs:
+        job["actual_s"] = None
+    if len(entries):
+        print(f"⏩ {len(entries)} página(s) já extraída(s) (diário de checkpoints)")
+    print(f"⚙️  {len(jobs)} faixa(s) de páginas em {workers} processos (maior primeiro)")
+    
+    def record(job, outcome):
+        for page_key, page_entry in outcome["pages"].items():
+            journal.record(page_key, fingerprints[job["pdf"]], page_entry)
+            entries[page_key] = page_entry
+        metrics.merge(outcome["metrics"])
+        for trace in outcome["traces"]:
+            profiling.merge(trace)
+        job["actual_s"] = outcome["actual_s"]
+    
+    def record_supervised(index, outcome, report):
+        if report["status"] != "ok":
+            page_entry = next(iter(outcome["pages"].values()))
+            page_entry["supervision"] = {"status": report["status"], "attempts": report["attempts"]}
+        record(jobs[index], outcome)
+    
+    # Spans, cProfile e tracemalloc das tarefas voltam com o resultado (profiling.merge)
+    profile = profiling.worker_settings()
+    started = time.perf_counter()
+    with profiling.span("run_scheduled_extraction", "extract", jobs=len(jobs), workers=workers):
+        if limits is None:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(extract_page_range, job, options[job["pdf"]], profile): job
+                           for job in jobs}
+                for future in as_completed(futures):
+                    job = futures[future]
+                    try:
+                        record(job, future.result())
+                    except Exception as e:
+                        print(f"   ❌ Erro na faixa {job['pdf']} "
+                              f"p{job['pages'][0] + 1}-{job['pages'][-1] + 1}: {e}")
+        else:
+            reports = page_watchdog.supervise(
+                [(index, (job, options[job["pdf"]], profile)) for index, job in enumerate(jobs)],
+                extract_supervised_page, SUPERVISED_ATTEMPTS, workers=workers,
+                timeout=limits["timeout"], memory_mb=limits["memory_mb"], on_done=record_supervised
+            )
+            for index, report in reports.items():
+                if report["result"] is not None:
+                    continue
+                # Nenhuma tentativa concluiu a página: só o registro da quarentena
+                # (fora do diário, para que --resume tente de novo)
+                job = jobs[index]
+                page_key = sharding.page_key(job["pdf"], job["pages"][0] + 1)
+                print(f"   🚫 Quarentena: {page_key} ({report['attempts'][-1]['outcome']})")
+                entries[page_key] = {
+                    "files": [], "trim": {}, "processed": [], "failed": [],
+                    "supervision": {"status": report["status"], "attempts": report["attempts"]},
+                }
+    wall_s = time.perf_counter() - started
+    
+    if units is not None:
+        units["completed"].update(entries)
+    
+    # Estimado x real, para recalibrar o modelo de custo
+    finished = [job for job in jobs if job["actual_s"] is not None]
+    estimated_total = sum(job["estimated_s"] for job in finished)
+    actual_total = sum(job["actual_s"] for job in finished)
+    pending_costs = [
+        sum(analysis["page_costs"][page] for page in pending[analysis["pdf"]]) for analysis in analyses
+    ]
+    schedule = {
+        "workers": workers,
+        "estimated_makespan_s": round(extraction_scheduler.simulate_makespan(
+            [job["estimated_s"] for job in jobs], workers), 3),
+        "per_pdf_makespan_s": round(extraction_scheduler.simulate_makespan(
+            sorted(pending_costs, reverse=True), workers), 3),
+        "wall_s": round(wall_s, 3),
+        "actual_over_estimated": round(actual_total / estimated_total, 2) if estimated_total else None,
+        "jobs": [
+            {
+                "pdf": job["pdf"],
+                "pages": [page + 1 for page in job["pages"]],
+                "estimated_s": round(job["estimated_s"], 3),
+                "actual_s": None if job["actual_s"] is None else round(job["actual_s"], 3),
+            }
+            for job in jobs
+        ],
+    }
+    print(f"⏱️  Agendamento: {wall_s:.2f}s reais, {schedule['estimated_makespan_s']:.2f}s previstos "
+          f"(um PDF por processo: {schedule['per_pdf_makespan_s']:.2f}s)")
+    
+    results = {
+        pdf_filename: [entries[key] for key in keys if key in entries]
+        for pdf_filename, keys in page_keys.items()
+    }
+    sections = {"schedule": schedule}
+    if limits is not None:
+        sections["supervision"] = dict(limits=limits, **supervision_summary(entries))
+    return results, sections
+
+
+@pipeline_metrics.stage("extract")
+def process_all_pdfs(trim=False, process_preset=None, process_options=None, write_originals=True,
+                     resume=False, shard=None, workers=1, supervised=False,
+                     page_timeout=page_watchdog.TASK_TIMEOUT_S, page_memory_mb=page_watchdog.TASK_MEMORY_MB,
+                     render_presets=None, render_oversample=ADAPTIVE_OVERSAMPLE):
     """
     Processa todos os PDFs mapeados e gera relatório.
+    
+    Cada página concluída é gravada no diário .cache/checkpoints/extraction.jsonl;
+    os relatórios finais são montados a partir dele.
+    
+    Args:
+        trim (bool): Remover margens brancas das figuras extraídas
+        process_preset (str): Processar cada figura em memória com este
+            preset (pipeline fundido; gera também processing_report.json)
+        process_options (dict): Opções extras do processamento
+        write_originals (bool): Gravar os originais em images/
+        resume (bool): Retomar uma extração interrompida com os mesmos
+            parâmetros, pulando as páginas já concluídas
+        shard (tuple): (i, N) para extrair só as páginas desta parte; grava
+            um relatório parcial em shard_reports/ (ver sharding.py)
+        workers (int): Com mais de 1, extrair em paralelo por faixas de
+            páginas agendadas pelo custo estimado (ver extraction_scheduler.py)
+        supervised (bool): Rodar cada página num processo que é morto ao
+            passar de page_timeout segundos ou page_memory_mb MB, com novas
+            tentativas degradadas e quarentena (ver page_watchdog.py)
+        page_timeout (float): Prazo por página na execução supervisionada
+        page_memory_mb (int): Memória por página na execução supervisionada
+        render_presets (list): Renderizar também as páginas inteiras, cada uma
+            no menor DPI (até 300) que atende ao maior destes presets; o
+            relatório mostra os pixels evitados (não entra no diário)
+        render_oversample (float): Folga sobre o DPI mínimo das páginas
     """
     print("=" * 70)
     print("🔬 EXTRAÇÃO DE IMAGENS DE PDFs CIENTÍFICOS")
     print("   Projeto: Origem das Aves em Theropoda")
+    if shard:
+        print(f"   Parte {shard[0]}/{shard[1]}")
     print("=" * 70)
     
     extraction_report = {
@@ -221,6 +1014,29 @@ def process_all_pdfs():
         "total_images_extracted": 0,
         "pdfs_details": {}
     }
+    processing_results = []
+    params = {"trim": trim, "process_preset": process_preset, "process_options": process_options or {},
+              "write_originals": write_originals}
+    journal = run_journal.RunJournal(f"extraction{sharding.shard_suffix(shard)}", params, resume=resume)
+    units = {"universe": [], "completed": {}} if shard else None
+    
+    render_totals = {}
+    
+    # Extração paralela ou supervisionada: todas as páginas de uma vez
+    scheduled = None
+    sections = {}
+    if workers > 1 or supervised:
+        options = {
+            pdf_filename: {
+                "output_prefix": metadata["output_prefix"], "trim": trim, "process_preset": process_preset,
+                "process_options": process_options, "write_original": write_originals,
+            }
+            for pdf_filename, metadata in PDF_MAPPING.items() if (PDF_DIR / pdf_filename).exists()
+        }
+        limits = {"timeout": page_timeout, "memory_mb": page_memory_mb} if supervised else None
+        scheduled, sections = run_scheduled_extraction(
+            options, workers, journal, shard=shard, units=units, limits=limits
+        )
     
     # Processar cada PDF mapeado
     for pdf_filename, metadata in PDF_MAPPING.items():
@@ -237,21 +1053,48 @@ def process_all_pdfs():
         
         # Extração método 1: Imagens embutidas
         output_prefix = metadata["output_prefix"]
-        extracted_images = extract_images_from_pdf(
-            str(pdf_path), 
-            output_prefix=output_prefix
-        )
+        trim_stats = {}
+        if scheduled is not None:
+            extracted_images = []
+            for page_entry in scheduled[pdf_filename]:
+                extracted_images.extend(page_entry["files"])
+                merge_trim(trim_stats, page_entry["trim"])
+                processing_results.extend(page_entry["processed"])
+        else:
+            with profiling.span("extract_images_from_pdf", "extract", pdf=pdf_filename):
+                extracted_images = extract_images_from_pdf(
+                    str(pdf_path), 
+                    output_prefix=output_prefix,
+                    trim=trim,
+                    trim_stats=trim_stats,
+                    process_preset=process_preset,
+                    process_options=process_options,
+                    write_original=write_originals,
+                    processing_results=processing_results,
+                    journal=journal,
+                    shard=shard,
+                    units=units
+                )
         
-        # Extração método 2: Renderização em alta resolução (opcional)
-        # Descomente se quiser também páginas completas renderizadas
-        # rendered_images = extract_images_high_resolution(
-        #     str(pdf_path),
-        #     output_prefix=f"{output_prefix}_fullpage",
-        #     target_dpi=300
-        # )
-        # all_images = extracted_images + rendered_images
+        # Extração método 2: Páginas completas renderizadas (opcional), no
+        # menor DPI que atende aos presets que vão usá-las
+        rendered_images = []
+        render_stats = {}
+        if render_presets:
+            with profiling.span("extract_images_high_resolution", "extract", pdf=pdf_filename):
+                rendered_images = extract_images_high_resolution(
+                    str(pdf_path),
+                    output_prefix=f"{output_prefix}_fullpage",
+                    trim=trim,
+                    trim_stats=trim_stats,
+                    presets=render_presets,
+                    oversample=render_oversample,
+                    render_stats=render_stats
+                )
+            for stat in ("images_rendered", "pixels_rendered", "pixels_at_fixed_dpi", "pixels_saved"):
+                render_totals[stat] = render_totals.get(stat, 0) + render_stats.get(stat, 0)
         
-        all_images = extracted_images
+        all_images = extracted_images + rendered_images
         
         # Atualizar relatório
         extraction_report["total_pdfs_processed"] += 1
@@ -262,11 +1105,30 @@ def process_all_pdfs():
             "images_extracted": len(all_images),
             "files": [os.path.basename(img) for img in all_images]
         }
+        if trim:
+            extraction_report["pdfs_details"][pdf_filename]["trim"] = trim_stats
+        if render_presets:
+            extraction_report["pdfs_details"][pdf_filename]["render"] = render_stats
     
-    # Salvar relatório JSON
-    report_path = PROJECT_ROOT / "extraction_report.json"
-    with open(report_path, "w", encoding="utf-8") as f:
-        json.dump(extraction_report, f, indent=2, ensure_ascii=False)
+    journal.close()
+    extraction_report.update(sections)
+    if render_presets:
+        extraction_report["render"] = dict(presets=list(render_presets), **render_totals)
+    
+    # Salvar relatório JSON (por partes: só o parcial; `sharding.py merge` junta)
+    if shard:
+        report_path = sharding.write_partial(
+            "extraction", shard, params, units["universe"], units["completed"]
+        )
+        processing_report_path = report_path
+    else:
+        report_path = PROJECT_ROOT / "extraction_report.json"
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(extraction_report, f, indent=2, ensure_ascii=False)
+        
+        # Relatório do processamento fundido (mesmo formato de process_images.py)
+        if process_preset:
+            processing_report_path = write_processing_report(process_preset, processing_results)
     
     # Exibir resumo
     print("=" * 70)
@@ -276,6 +1138,20 @@ def process_all_pdfs():
     print(f"🖼️  Total de imagens extraídas: {extraction_report['total_images_extracted']}")
     print(f"📁 Pasta de saída: {IMAGES_OUTPUT_DIR}")
     print(f"📄 Relatório salvo em: {report_path}")
+    if process_preset:
+        successful = sum(1 for r in processing_results if r["status"] == "success")
+        print(f"🎨 Processadas em memória ({process_preset}): {successful}/{len(processing_results)}")
+        print(f"📄 Relatório de processamento: {processing_report_path}")
+    if render_presets and render_totals.get("pixels_at_fixed_dpi"):
+        saved = render_totals["pixels_saved"]
+        print(f"🖨️  Páginas renderizadas: {render_totals['images_rendered']} | pixels evitados: "
+              f"{saved / 1e6:.1f} MP ({saved / render_totals['pixels_at_fixed_dpi']:.0%} do DPI fixo)")
+    if "supervision" in sections:
+        supervision = sections["supervision"]
+        print(f"🛡️  Páginas degradadas: {len(supervision['degraded'])} | "
+              f"em quarentena: {len(supervision['quarantine'])}")
+        for item in supervision["quarantine"]:
+            print(f"   🚫 {item['page']}: " + ", ".join(attempt["outcome"] for attempt in item["attempts"]))
     print("=" * 70)
     
     return extraction_report
@@ -284,12 +1160,62 @@ def process_all_pdfs():
 # ================== EXECUÇÃO PRINCIPAL ==================
 
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Extração de imagens dos PDFs científicos")
+    parser.add_argument("--trim", action="store_true", help="Remover margens brancas das figuras")
+    parser.add_argument("--process", metavar="PRESET", choices=list(PROCESSING_PRESETS),
+                        help="Processar cada figura em memória com o preset (pipeline fundido)")
+    parser.add_argument("--enhance", action="store_true", help="Aplicar melhorias no processamento")
+    parser.add_argument("--no-originals", action="store_true",
+                        help="Não gravar os originais em images/ (requer --process)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Retomar uma extração interrompida, pulando as páginas já concluídas")
+    parser.add_argument("--shard", metavar="I/N", type=sharding.parse_shard,
+                        help="Extrair só a parte I de N das páginas (ver sharding.py)")
+    parser.add_argument("--workers", type=int, default=1, metavar="N",
+                        help="Extrair em N processos, por faixas de páginas (ver extraction_scheduler.py)")
+    parser.add_argument("--supervised", action="store_true",
+                        help="Cada página num processo com limite de tempo/memória (ver page_watchdog.py)")
+    parser.add_argument("--page-timeout", type=float, default=page_watchdog.TASK_TIMEOUT_S, metavar="S",
+                        help="Com --supervised: prazo por página em segundos")
+    parser.add_argument("--page-memory", type=int, default=page_watchdog.TASK_MEMORY_MB, metavar="MB",
+                        help="Com --supervised: memória por página em MB")
+    parser.add_argument("--render-pages", nargs="+", metavar="PRESET", choices=list(PROCESSING_PRESETS),
+                        help="Renderizar também as páginas inteiras no menor DPI que atende a estes presets")
+    parser.add_argument("--render-oversample", type=float, default=ADAPTIVE_OVERSAMPLE, metavar="X",
+                        help="Com --render-pages: folga sobre o DPI mínimo (padrão: %(default)s)")
+    profiling.add_arguments(parser)
+    args = parser.parse_args()
+    
+    if args.no_originals and not args.process:
+        parser.error("--no-originals requer --process")
+    if args.render_pages and args.shard:
+        parser.error("--render-pages renderiza PDFs inteiros e não combina com --shard")
+    
     print("\n🚀 Iniciando extração de imagens...")
     
     try:
-        report = process_all_pdfs()
+        with profiling.from_arguments(args, "extract"):
+            report = process_all_pdfs(
+                trim=args.trim,
+                process_preset=args.process,
+                process_options={"enhance": args.enhance},
+                write_originals=not args.no_originals,
+                resume=args.resume,
+                shard=args.shard,
+                workers=args.workers,
+                supervised=args.supervised,
+                page_timeout=args.page_timeout,
+                page_memory_mb=args.page_memory,
+                render_presets=args.render_pages,
+                render_oversample=args.render_oversample
+            )
         
-        if report["total_images_extracted"] > 0:
+        if args.shard:
+            print("\n✨ Parte concluída. Com todas as partes em shard_reports/, execute:")
+            print("   python sharding.py merge")
+        elif report["total_images_extracted"] > 0:
             print("\n✨ Extração concluída com sucesso!")
             print("\n📋 PRÓXIMOS PASSOS:")
             print("   1. Revise as imagens na pasta 'images/'")
@@ -0,0 +1,642 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fila Local de Extração (Serviço com Limite de Concorrência)
+Projeto: Origem das Aves em Theropoda
+
+Em vez de cada pessoa rodar o extract_pdf_images.py no PDF_MAPPING
+inteiro a cada artigo novo, os PDFs entram numa fila local:
+
+- a fila é um SQLite (.cache/extraction_queue/queue.sqlite, modo WAL) e os
+  PDFs ficam guardados pelo hash (pdfs/<sha256>/<nome original>);
+- um mesmo PDF (mesmo SHA-256) com as mesmas opções vira um único job:
+  enviar de novo devolve o job existente (um job que falhou volta à fila);
+- o serviço (`serve`) executa os jobs num pool de N processos; jobs que
+  estavam rodando quando o serviço caiu voltam à fila ao reiniciar (até
+  MAX_ATTEMPTS tentativas);
+- uma API HTTP local mostra a fila, o estado e o resultado de cada job;
+- `bench` mede vazão e latência de fila numa fila temporária, com PDFs
+  sintéticos e jobs sem gravação (mesmo núcleo de extração, via
+  pipeline_api), sem tocar em images/.
+
+Cada job grava as figuras em images/ (como o extract_pdf_images.py), e a
+saída do job fica em logs/<id>.log. Com write=0, o job só extrai em
+memória e conta as figuras (pré-visualização).
+
+API (127.0.0.1:8766):
+    POST /jobs?name=artigo.pdf[&trim=1&preset=reveal_slide&write=0]   (corpo: o PDF)
+    GET  /jobs[?status=queued]      GET /jobs/<id>      GET /stats
+
+Uso:
+    python extraction_queue.py serve [--workers 2] [--port 8766]
+    python extraction_queue.py submit artigo.pdf [--trim] [--preset reveal_slide]
+    python extraction_queue.py status [ID]
+    python extraction_queue.py bench [--jobs 24] [--duplicates 8] [--workers 1 2 4]
+"""
+
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+# ================== CONFIGURAÇÃO ==================
+
+PROJECT_ROOT = Path(__file__).parent.parent
+QUEUE_DIR = PROJECT_ROOT / ".cache" / "extraction_queue"
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8766
+DEFAULT_WORKERS = 2
+
+# Jobs na fila aceitos antes de recusar envios (HTTP 429)
+MAX_QUEUED = 200
+# Tentativas de um job interrompido (queda do serviço ou do processo)
+MAX_ATTEMPTS = 3
+# Intervalo para notar jobs enviados por outros processos (submit)
+POLL_INTERVAL_S = 0.5
+# Maior PDF aceito pela API
+MAX_UPLOAD_MB = 512
+
+# Opções de um job e seus valores padrão
+JOB_OPTIONS = {"trim": False, "preset": None, "write": True}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    sha256        TEXT NOT NULL,
+    options_key   TEXT NOT NULL,
+    pdf_name      TEXT NOT NULL,
+    pdf_path      TEXT NOT NULL,
+    options       TEXT NOT NULL,
+    status        TEXT NOT NULL,
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    submitted_at  REAL,
+    started_at    REAL,
+    finished_at   REAL,
+    worker        TEXT,
+    result        TEXT,
+    error         TEXT,
+    UNIQUE (sha256, options_key)
+);
+CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (status, id);
+"""
+
+# ================== FILA ==================
+
+def connect(queue_dir=QUEUE_DIR):
+    """
+    Abre (e cria, se preciso) a fila.
+
+    Returns:
+        sqlite3.Connection: Conexão com linhas acessíveis por nome
+    """
+    Path(queue_dir).mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(Path(queue_dir) / "queue.sqlite"), timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+@contextlib.contextmanager
+def transaction(conn):
+    """Transação com lock de escrita desde o início (BEGIN IMMEDIATE)"""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def job_to_dict(row):
+    """Registro da fila como dict (opções e resultado decodificados)"""
+    if row is None:
+        return None
+    job = dict(row)
+    job["options"] = json.loads(job["options"])
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    return job
+
+
+def normalize_options(options):
+    """Opções completas (padrões preenchidos) e a chave de deduplicação"""
+    unknown = set(options or {}) - set(JOB_OPTIONS)
+    if unknown:
+        raise ValueError(f"Opções desconhecidas: {', '.join(sorted(unknown))}")
+    options = {**JOB_OPTIONS, **(options or {})}
+    return options, json.dumps(options, sort_keys=True)
+
+
+def safe_pdf_name(name):
+    """Nome de arquivo aceitável para o PDF enviado"""
+    name = os.path.basename(str(name or "")).strip() or "documento.pdf"
+    return name if name.lower().endswith(".pdf") else name + ".pdf"
+
+
+def submit(data, name, options=None, queue_dir=QUEUE_DIR, conn=None):
+    """
+    Põe um PDF na fila, ou devolve o job que já existe para ele.
+
+    Args:
+        data (bytes): O PDF
+        name (str): Nome original (define o prefixo e a origem no catálogo)
+        options (dict): trim, preset e write (ver JOB_OPTIONS)
+        queue_dir (Path): Pasta da fila
+        conn (sqlite3.Connection): Conexão já aberta
+
+    Returns:
+        tuple: (job, deduplicado)
+
+    Raises:
+        ValueError: Não é um PDF, opções inválidas ou fila cheia
+    """
+    if not data.startswith(b"%PDF"):
+        raise ValueError("o conteúdo não é um PDF")
+    options, options_key = normalize_options(options)
+    if options["preset"] is not None:
+        from process_images import PROCESSING_PRESETS
+        if options["preset"] not in PROCESSING_PRESETS:
+            raise ValueError(f"Preset inválido: {options['preset']}")
+    sha256 = hashlib.sha256(data).hexdigest()
+    name = safe_pdf_name(name)
+    conn = conn or connect(queue_dir)
+
+    with transaction(conn):
+        existing = conn.execute("SELECT * FROM jobs WHERE sha256 = ? AND options_key = ?",
+                                (sha256, options_key)).fetchone()
+        if existing is not None and existing["status"] != "failed":
+            return job_to_dict(existing), True
+
+        queued = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+        if queued >= MAX_QUEUED:
+            raise ValueError(f"fila cheia ({queued} jobs aguardando)")
+
+        # PDF guardado pelo hash, com o nome original (PDF_MAPPING e catálogo usam o nome)
+        pdf_path = Path(queue_dir) / "pdfs" / sha256 / name
+        if existing is not None:
+            pdf_path = Path(existing["pdf_path"])
+        if not pdf_path.exists():
+            pdf_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = pdf_path.with_name(f".{name}.{os.getpid()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, pdf_path)
+
+        now = time.time()
+        if existing is not None:
+            # Reenvio de um job que falhou: volta à fila com as tentativas zeradas
+            conn.execute("UPDATE jobs SET status = 'queued', attempts = 0, submitted_at = ?, started_at = NULL, "
+                         "finished_at = NULL, worker = NULL, result = NULL, error = NULL WHERE id = ?",
+                         (now, existing["id"]))
+            job_id = existing["id"]
+        else:
+            job_id = conn.execute(
+                "INSERT INTO jobs (sha256, options_key, pdf_name, pdf_path, options, status, submitted_at) "
+                "VALUES (?, ?, ?, ?, ?, 'queued', ?)",
+                (sha256, options_key, name, str(pdf_path), json.dumps(options), now)
+            ).lastrowid
+        job = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    return job_to_dict(job), False
+
+
+def claim_next(conn, worker):
+    """Passa o job mais antigo da fila para 'running' (atômico entre processos)"""
+    with transaction(conn):
+        row = conn.execute("SELECT id FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1").fetchone()
+        if row is None:
+            return None
+        conn.execute("UPDATE jobs SET status = 'running', attempts = attempts + 1, started_at = ?, worker = ? "
+                     "WHERE id = ?", (time.time(), worker, row["id"]))
+        return job_to_dict(conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone())
+
+
+def finish(conn, job, result=None, error=None, retry=False):
+    """
+    Registra o fim de um job.
+
+    Args:
+        retry (bool): Erro do ambiente (processo do pool morto), não do PDF:
+            o job volta à fila enquanto tiver tentativas
+    """
+    with transaction(conn):
+        if retry and job["attempts"] < MAX_ATTEMPTS:
+            conn.execute("UPDATE jobs SET status = 'queued', worker = NULL, error = ? WHERE id = ?",
+                         (error, job["id"]))
+            return
+        conn.execute("UPDATE jobs SET status = ?, finished_at = ?, result = ?, error = ? WHERE id = ?",
+                     ("failed" if error is not None else "done", time.time(),
+                      json.dumps(result) if result is not None else None, error, job["id"]))
+
+
+def release(conn, job, error):
+    """
+    Devolve à fila um job interrompido sem culpa dele (o pool quebrou por
+    causa de outro job), sem gastar a tentativa que claim_next contou.
+    """
+    with transaction(conn):
+        conn.execute("UPDATE jobs SET status = 'queued', attempts = MAX(attempts - 1, 0), worker = NULL, "
+                     "error = ? WHERE id = ?", (error, job["id"]))
+
+
+def recover_interrupted(conn):
+    """
+    Jobs 'running' de um serviço que caiu voltam à fila (ou falham, se já
+    esgotaram as tentativas).
+
+    Returns:
+        int: Jobs devolvidos à fila
+    """
+    with transaction(conn):
+        conn.execute("UPDATE jobs SET status = 'failed', finished_at = ?, error = 'tentativas esgotadas' "
+                     "WHERE status = 'running' AND attempts >= ?", (time.time(), MAX_ATTEMPTS))
+        return conn.execute("UPDATE jobs SET status = 'queued', worker = NULL "
+                            "WHERE status = 'running'").rowcount
+
+
+def get_job(conn, job_id):
+    return job_to_dict(conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+
+def list_jobs(conn, status=None, limit=100):
+    """Jobs mais recentes primeiro (opcionalmente só de um status)"""
+    if status:
+        rows = conn.execute("SELECT * FROM jobs WHERE status = ? ORDER BY id DESC LIMIT ?", (status, limit))
+    else:
+        rows = conn.execute("SELECT * FROM jobs ORDER BY id DESC LIMIT ?", (limit,))
+    return [job_to_dict(row) for row in rows]
+
+
+def _percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(int(fraction * len(values)), len(values) - 1)], 3)
+
+
+def queue_stats(conn):
+    """
+    Contagens por status, latência de fila (envio → início), duração dos
+    jobs e vazão (jobs concluídos por segundo entre o primeiro início e o
+    último fim).
+    """
+    counts = {row["status"]: row["n"] for row in
+              conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status")}
+    rows = conn.execute("SELECT submitted_at, started_at, finished_at FROM jobs "
+                        "WHERE status = 'done' AND started_at IS NOT NULL").fetchall()
+    waits = [row["started_at"] - row["submitted_at"] for row in rows]
+    runs = [row["finished_at"] - row["started_at"] for row in rows]
+    span = (max(row["finished_at"] for row in rows) - min(row["started_at"] for row in rows)) if rows else 0
+    return {
+        "counts": {status: counts.get(status, 0) for status in ("queued", "running", "done", "failed")},
+        "queue_latency_s": {"p50": _percentile(waits, 0.5), "p95": _percentile(waits, 0.95)},
+        "run_s": {"p50": _percentile(runs, 0.5), "p95": _percentile(runs, 0.95)},
+        "throughput_jobs_per_s": round(len(rows) / span, 3) if span > 0 else None,
+    }
+
+
+# ================== EXECUÇÃO DOS JOBS ==================
+
+def output_prefix_for(pdf_name, sha256):
+    """
+    Prefixo das imagens: o do PDF_MAPPING, ou derivado do nome do arquivo.
+
+    Fora do PDF_MAPPING, o prefixo leva o início do SHA-256: nomes que
+    começam igual ("Smith et al 2020" e "Smith et al 2021") não gravam
+    por cima das figuras um do outro em images/.
+    """
+    from extract_pdf_images import PDF_MAPPING
+    if pdf_name in PDF_MAPPING:
+        return PDF_MAPPING[pdf_name]["output_prefix"]
+    words = re.findall(r"[a-z0-9]+", Path(pdf_name).stem.lower())
+    return f"{'_'.join(words[:3]) or 'pdf'}_{sha256[:8]}"
+
+
+def run_job(job, log_dir):
+    """
+    Tarefa do pool: extrai um PDF da fila.
+
+    Args:
+        job (dict): Job de claim_next
+        log_dir (str): Pasta da saída dos jobs (logs/<id>.log)
+
+    Returns:
+        dict: 'images', 'processed', 'failed', 'files' (só com write) e
+              'elapsed_s'
+    """
+    options = job["options"]
+    started = time.perf_counter()
+    if not options["write"]:
+        import pipeline_api
+        result = pipeline_api.extract_pdf_bytes(
+            Path(job["pdf_path"]).read_bytes(), trim=options["trim"], preset=options["preset"],
+            output_prefix=output_prefix_for(job["pdf_name"], job["sha256"])
+        )
+        return {"images": len(result["figures"]), "processed": sum(1 for f in result["figures"] if f["rendition"]),
+                "failed": len(result["failed"]), "files": [f["file"] for f in result["figures"]],
+                "elapsed_s": round(time.perf_counter() - started, 3)}
+
+    import pipeline_metrics
+    from extract_pdf_images import extract_images_from_pdf
+    Path(log_dir).mkdir(parents=True, exist_ok=True)
+    processing_results = []
+    with open(Path(log_dir) / f"{job['id']}.log", "w", encoding="utf-8") as log, \
+            contextlib.redirect_stdout(log), pipeline_metrics.collecting("extract") as metrics:
+        files = extract_images_from_pdf(
+            job["pdf_path"], output_prefix_for(job["pdf_name"], job["sha256"]), trim=options["trim"],
+            process_preset=options["preset"], processing_results=processing_results
+        )
+    return {"images": len(files), "failed": metrics.images.get("failed", 0),
+            "processed": sum(1 for r in processing_results if r["status"] == "success"),
+            "files": [Path(path).name for path in files], "elapsed_s": round(time.perf_counter() - started, 3)}
+
+
+def run_dispatcher(workers=DEFAULT_WORKERS, queue_dir=QUEUE_DIR, stop=None, wake=None, until_empty=False,
+                   verbose=True):
+    """
+    Executa os jobs da fila com no máximo `workers` ao mesmo tempo.
+
+    Args:
+        workers (int): Processos do pool
+        queue_dir (Path): Pasta da fila
+        stop (threading.Event): Encerra quando sinalizado
+        wake (threading.Event): Sinalizado pela API a cada envio (sem
+            esperar o próximo POLL_INTERVAL_S)
+        until_empty (bool): Encerrar quando não houver mais jobs (bench)
+        verbose (bool): Imprimir início e fim de cada job
+    """
+    conn = connect(queue_dir)
+    stop = stop or threading.Event()
+    wake = wake or threading.Event()
+    recovered = recover_interrupted(conn)
+    if recovered and verbose:
+        print(f"↩️  {recovered} job(s) interrompido(s) de volta à fila")
+    log_dir = str(Path(queue_dir) / "logs")
+    worker_name = f"{os.uname().nodename if hasattr(os, 'uname') else 'local'}:{os.getpid()}"
+    pool = ProcessPoolExecutor(max_workers=workers)
+    running = {}
+    suspects = set()  # jobs em voo quando o pool quebrou, sem saber qual quebrou
+
+    try:
+        while not stop.is_set():
+            # Com suspeitos, um job por vez: se o pool quebrar, o culpado é conhecido
+            while len(running) < (1 if suspects else workers):
+                job = claim_next(conn, worker_name)
+                if job is None:
+                    break
+                if verbose:
+                    print(f"▶️  Job {job['id']}: {job['pdf_name']} (tentativa {job['attempts']})")
+                running[pool.submit(run_job, job, log_dir)] = job
+
+            if not running:
+                if until_empty:
+                    break
+                wake.wait(POLL_INTERVAL_S)
+                wake.clear()
+                continue
+
+            done, _ = wait(running, timeout=POLL_INTERVAL_S, return_when=FIRST_COMPLETED)
+            broken = []
+            for future in done:
+                job = running.pop(future)
+                try:
+                    result = future.result()
+                except BrokenProcessPool:
+                    broken.append(job)
+                    continue
+                except Exception as e:
+                    finish(conn, job, error=f"{type(e).__name__}: {e}")
+                    if verbose:
+                        print(f"❌ Job {job['id']}: {type(e).__name__}: {e}")
+                else:
+                    finish(conn, job, result=result)
+                    if verbose:
+                        print(f"✅ Job {job['id']}: {result['images']} imagem(ns) em {result['elapsed_s']:.1f}s")
+                suspects.discard(job["id"])
+
+            if broken:
+                # Processo morto (ex.: OOM killer). O pool falha todos os jobs em
+                # voo, então só um job sozinho na falha gasta tentativa; os demais
+                # voltam à fila sem gastar (o resultado dos concluídos já foi lido)
+                pool.shutdown(wait=False, cancel_futures=True)
+                innocent = list(running.values())
+                if len(broken) == 1:
+                    finish(conn, broken[0], error="processo do pool encerrado", retry=True)
+                    suspects.discard(broken[0]["id"])
+                else:
+                    innocent.extend(broken)
+                    suspects.update(job["id"] for job in broken)
+                for job in innocent:
+                    release(conn, job, error="processo do pool encerrado")
+                running.clear()
+                pool = ProcessPoolExecutor(max_workers=workers)
+                if verbose:
+                    print(f"💥 Pool refeito ({len(broken)} job(s) na falha, {len(innocent)} de volta à fila)")
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        conn.close()
+
+
+# ================== API LOCAL ==================
+
+def make_handler(queue_dir, wake, verbose=True):
+    """Handler HTTP da API (uma conexão com a fila por requisição)"""
+
+    class QueueHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status, body):
+            data = json.dumps(body, ensure_ascii=False, indent=2).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            parts = url.path.strip("/").split("/")
+            query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+            with contextlib.closing(connect(queue_dir)) as conn:
+                if parts == ["stats"]:
+                    return self._send_json(200, queue_stats(conn))
+                if parts == ["jobs"]:
+                    return self._send_json(200, list_jobs(conn, query.get("status"),
+                                                          int(query.get("limit", 100))))
+                if len(parts) == 2 and parts[0] == "jobs" and parts[1].isdigit():
+                    job = get_job(conn, int(parts[1]))
+                    if job is not None:
+                        return self._send_json(200, job)
+            self._send_json(404, {"error": "não encontrado"})
+
+        def do_POST(self):
+            url = urlsplit(self.path)
+            if url.path.rstrip("/") != "/jobs":
+                return self._send_json(404, {"error": "não encontrado"})
+            length = int(self.headers.get("Content-Length") or 0)
+            if not length or length > MAX_UPLOAD_MB * 1024 * 1024:
+                return self._send_json(400, {"error": f"envie o PDF no corpo (até {MAX_UPLOAD_MB} MB)"})
+            query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+
+            def flag(name, default):
+                return query.get(name, "1" if default else "0").lower() in ("1", "true", "sim")
+
+            options = {"trim": flag("trim", False), "write": flag("write", True), "preset": query.get("preset")}
+            data = self.rfile.read(length)
+            try:
+                with contextlib.closing(connect(queue_dir)) as conn:
+                    job, deduplicated = submit(data, query.get("name"), options, queue_dir, conn)
+            except ValueError as e:
+                status = 429 if str(e).startswith("fila cheia") else 400
+                return self._send_json(status, {"error": str(e)})
+            wake.set()
+            self._send_json(200 if deduplicated else 201, {**job, "deduplicated": deduplicated})
+
+        def log_message(self, format, *args):
+            if verbose:
+                print(f"   {self.command} {self.path} → {args[1] if len(args) > 1 else ''}")
+
+    return QueueHandler
+
+
+def serve(workers=DEFAULT_WORKERS, host=DEFAULT_HOST, port=DEFAULT_PORT, queue_dir=QUEUE_DIR, verbose=True):
+    """Sobe a API e o executor da fila até Ctrl+C"""
+    wake, stop = threading.Event(), threading.Event()
+    server = ThreadingHTTPServer((host, port), make_handler(queue_dir, wake, verbose))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print("=" * 70)
+    print("📥 FILA DE EXTRAÇÃO")
+    print("=" * 70)
+    print(f"   API:      http://{host}:{port}/jobs  (/stats)")
+    print(f"   Fila:     {Path(queue_dir) / 'queue.sqlite'}")
+    print(f"   Processos: {workers}")
+    print("=" * 70)
+    try:
+        run_dispatcher(workers, queue_dir, stop=stop, wake=wake, verbose=verbose)
+    except KeyboardInterrupt:
+        print("\n👋 Fila encerrada (jobs em andamento voltam à fila no próximo início).")
+    finally:
+        stop.set()
+        server.shutdown()
+
+
+# ================== MEDIÇÃO ==================
+
+def bench(jobs=24, duplicates=8, workers_list=(1, 2, 4), pages=4, strokes=2000):
+    """
+    Vazão e latência da fila com PDFs sintéticos, numa fila temporária.
+
+    Todos os jobs são enviados de uma vez (mais `duplicates` reenvios de
+    PDFs já enviados, que devem virar o mesmo job) e executados sem
+    gravação (write=False).
+
+    Returns:
+        list: Estatísticas (queue_stats) por número de processos
+    """
+    from benchmark_images import make_synthetic_pdf
+
+    pdfs = [make_synthetic_pdf(pages=pages, strokes=strokes, seed=seed) for seed in range(jobs)]
+    results = []
+    print("=" * 70)
+    print(f"⏱️  FILA DE EXTRAÇÃO: {jobs} PDFs × {pages} páginas (+{duplicates} reenvios)")
+    print("=" * 70)
+    print(f"{'processos':>10}{'jobs/s':>10}{'fila p50':>10}{'fila p95':>10}{'job p50':>10}{'dedup':>8}")
+    for workers in workers_list:
+        queue_dir = Path(tempfile.mkdtemp(prefix="extraction_queue_"))
+        try:
+            with contextlib.closing(connect(queue_dir)) as conn:
+                deduplicated = 0
+                for index, data in enumerate(pdfs + pdfs[:duplicates]):
+                    _, dup = submit(data, f"sintetico_{index % jobs}.pdf", {"write": False}, queue_dir, conn)
+                    deduplicated += dup
+            run_dispatcher(workers, queue_dir, until_empty=True, verbose=False)
+            with contextlib.closing(connect(queue_dir)) as conn:
+                stats = queue_stats(conn)
+        finally:
+            shutil.rmtree(queue_dir, ignore_errors=True)
+        stats.update(workers=workers, deduplicated=deduplicated)
+        results.append(stats)
+        print(f"{workers:>10}{stats['throughput_jobs_per_s'] or 0:>10.2f}"
+              f"{stats['queue_latency_s']['p50']:>9.2f}s{stats['queue_latency_s']['p95']:>9.2f}s"
+              f"{stats['run_s']['p50']:>9.2f}s{deduplicated:>8}")
+    print("=" * 70)
+    return results
+
+
+def print_job(job):
+    """Resumo legível de um job"""
+    icon = {"queued": "⏳", "running": "▶️ ", "done": "✅", "failed": "❌"}[job["status"]]
+    line = f"{icon} #{job['id']} {job['pdf_name']} [{job['status']}]"
+    if job["result"]:
+        line += f" {job['result']['images']} imagem(ns) em {job['result']['elapsed_s']:.1f}s"
+    if job["error"]:
+        line += f" — {job['error']}"
+    print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fila local de extração de PDFs")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="API e execução dos jobs")
+    serve_parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Processos simultâneos")
+    serve_parser.add_argument("--host", default=DEFAULT_HOST)
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument("--quiet", action="store_true", help="Não listar requisições e jobs")
+
+    submit_parser = commands.add_parser("submit", help="Enviar PDFs para a fila (sem passar pela API)")
+    submit_parser.add_argument("pdfs", nargs="+", type=Path)
+    submit_parser.add_argument("--trim", action="store_true", help="Remover margens brancas das figuras")
+    submit_parser.add_argument("--preset", help="Processar também cada figura com o preset")
+    submit_parser.add_argument("--dry-run", action="store_true", help="Só contar as figuras (sem gravar)")
+
+    status_parser = commands.add_parser("status", help="Estado da fila ou de um job")
+    status_parser.add_argument("job_id", nargs="?", type=int)
+
+    bench_parser = commands.add_parser("bench", help="Medir vazão e latência com PDFs sintéticos")
+    bench_parser.add_argument("--jobs", type=int, default=24)
+    bench_parser.add_argument("--duplicates", type=int, default=8)
+    bench_parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    bench_parser.add_argument("--pages", type=int, default=4)
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        serve(args.workers, args.host, args.port, verbose=not args.quiet)
+    elif args.command == "submit":
+        with contextlib.closing(connect()) as conn:
+            for pdf in args.pdfs:
+                try:
+                    job, deduplicated = submit(pdf.read_bytes(), pdf.name,
+                                               {"trim": args.trim, "preset": args.preset,
+                                                "write": not args.dry_run}, conn=conn)
+                except (OSError, ValueError) as e:
+                    print(f"❌ {pdf.name}: {e}")
+                    continue
+                print(f"{'♻️  Já na fila' if deduplicated else '📥 Enviado'}: #{job['id']} {job['pdf_name']} "
+                      f"[{job['status']}]")
+    elif args.command == "status":
+        with contextlib.closing(connect()) as conn:
+            if args.job_id is not None:
+                job = get_job(conn, args.job_id)
+                if job is None:
+                    print(f"⚠️  Job {args.job_id} não encontrado.")
+                    sys.exit(1)
+                print(json.dumps(job, indent=2, ensure_ascii=False))
+            else:
+                for job in list_jobs(conn, limit=20):
+                    print_job(job)
+                print(json.dumps(queue_stats(conn), indent=2))
+    else:
+        bench(args.jobs, args.duplicates, args.workers, args.pages)
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Agendamento da Extração Paralela por Custo Estimado
+Projeto: Origem das Aves em Theropoda
+
+Os PDFs variam muito (8 a 60+ páginas, só texto ou cheios de figuras):
+dividir por arquivo deixa um processo preso no artigo maior enquanto os
+outros ficam parados. Aqui:
+
+1. uma análise prévia barata (sem decodificar nada) lê de cada página o
+   número e o tamanho (pixels) das imagens e o tamanho do conteúdo
+   (texto/vetores) e estima o custo em segundos;
+2. os PDFs são cortados em faixas de páginas de custo parecido (cerca de
+   JOBS_PER_WORKER faixas por processo);
+3. as faixas são entregues ao pool da maior para a menor (longest job
+   first), o que mantém todos os processos ocupados até o fim.
+
+O relatório da extração guarda o custo estimado e o tempo real de cada
+faixa, para recalibrar as constantes abaixo.
+
+Uso:
+    python extraction_scheduler.py [--workers 4]   # análise e plano, sem extrair
+"""
+
+import heapq
+import os
+import sys
+from pathlib import Path
+
+import fitz  # PyMuPDF
+
+# ================== CONFIGURAÇÃO ==================
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Modelo de custo (segundos), medido com as figuras dos artigos do projeto:
+# abrir a página e listar imagens; extrair o stream e achar a legenda;
+# decodificar e regravar (PNG/JPEG q95 otimizado); ler texto/vetores
+COST_PER_PAGE = 0.003
+COST_PER_IMAGE = 0.01
+COST_PER_MEGAPIXEL = 0.3
+COST_PER_CONTENT_MB = 0.5
+
+# Página com conteúdo acima disto (bytes comprimidos) é "vetorial pesada"
+VECTOR_HEAVY_BYTES = 256 * 1024
+
+# Faixas por processo: mais faixas equilibram melhor, menos abrem menos PDFs
+JOBS_PER_WORKER = 4
+
+# ================== ANÁLISE PRÉVIA ==================
+
+def _content_bytes(document, page):
+    """Tamanho (comprimido) dos streams de conteúdo da página"""
+    total = 0
+    for xref in page.get_contents():
+        kind, value = document.xref_get_key(xref, "Length")
+        if kind == "int":
+            total += int(value)
+        else:  # comprimento indireto: ler o stream bruto (sem descomprimir)
+            total += len(document.xref_stream_raw(xref) or b"")
+    return total
+
+
+def analyze_pdf(pdf_path, min_width=0, min_height=0):
+    """
+    Estima o custo de extração de cada página de um PDF.
+
+    Imagens abaixo do tamanho mínimo contam só o custo fixo (são descartadas
+    antes de decodificar).
+
+    Returns:
+        dict: 'pdf', 'page_costs' (segundos por página), 'images',
+              'megapixels', 'vector_heavy_pages' e 'estimated_s'
+    """
+    page_costs = []
+    images = 0
+    megapixels = 0.0
+    vector_heavy = 0
+
+    with fitz.open(pdf_path) as document:
+        for page in document:
+            cost = COST_PER_PAGE
+            for info in page.get_images(full=True):
+                width, height = info[2], info[3]
+                images += 1
+                cost += COST_PER_IMAGE
+                if width >= min_width and height >= min_height:
+                    pixels = width * height / 1e6
+                    megapixels += pixels
+                    cost += pixels * COST_PER_MEGAPIXEL
+            content = _content_bytes(document, page)
+            if content > VECTOR_HEAVY_BYTES:
+                vector_heavy += 1
+            cost += content / 1e6 * COST_PER_CONTENT_MB
+            page_costs.append(cost)
+
+    return {
+        "pdf": os.path.basename(pdf_path),
+        "page_costs": page_costs,
+        "images": images,
+        "megapixels": round(megapixels, 2),
+        "vector_heavy_pages": vector_heavy,
+        "estimated_s": round(sum(page_costs), 3),
+    }
+
+
+# ================== PLANO ==================
+
+def plan_jobs(analyses, workers, pending=None, max_pages=None):
+    """
+    Corta os PDFs em faixas de páginas e as ordena da mais cara para a mais barata.
+
+    Args:
+        analyses (list): Resultados de analyze_pdf
+        workers (int): Processos do pool
+        pending (dict): {pdf: páginas (0-based) a extrair}; padrão: todas
+        max_pages (int): Limite de páginas por faixa (1 = uma tarefa por página)
+
+    Returns:
+        list: Faixas {'pdf', 'pages', 'estimated_s'} em ordem de envio
+    """
+    def pages_of(analysis):
+        if pending is None:
+            return range(len(analysis["page_costs"]))
+        return sorted(pending.get(analysis["pdf"], ()))
+
+    total = sum(analysis["page_costs"][page] for analysis in analyses for page in pages_of(analysis))
+    target = total / max(workers * JOBS_PER_WORKER, 1)
+
+    jobs = []
+    for analysis in analyses:
+        current, cost = [], 0.0
+        for page in pages_of(analysis):
+            current.append(page)
+            cost += analysis["page_costs"][page]
+            if cost >= target or len(current) == max_pages:
+                jobs.append({"pdf": analysis["pdf"], "pages": current, "estimated_s": cost})
+                current, cost = [], 0.0
+        if current:
+            jobs.append({"pdf": analysis["pdf"], "pages": current, "estimated_s": cost})
+
+    jobs.sort(key=lambda job: -job["estimated_s"])
+    return jobs
+
+
+def simulate_makespan(costs, workers):
+    """
+    Duração prevista entregando as tarefas, nesta ordem, ao primeiro
+    processo livre (como faz o pool).
+    """
+    finish = [0.0] * max(workers, 1)
+    for cost in costs:
+        heapq.heappush(finish, heapq.heappop(finish) + cost)
+    return max(finish)
+
+
+def print_plan(analyses, jobs, workers):
+    """Tabela da análise prévia e previsão do plano contra a divisão por PDF"""
+    print("=" * 70)
+    print("🧮 ANÁLISE PRÉVIA DA EXTRAÇÃO")
+    print("=" * 70)
+    print(f"{'PDF':<42}{'págs':>5}{'imgs':>6}{'MP':>8}{'vet.':>5}{'custo s':>9}")
+    for analysis in sorted(analyses, key=lambda a: -a["estimated_s"]):
+        print(f"{analysis['pdf'][:41]:<42}{len(analysis['page_costs']):>5}{analysis['images']:>6}"
+              f"{analysis['megapixels']:>8.1f}{analysis['vector_heavy_pages']:>5}{analysis['estimated_s']:>9.2f}")
+    per_pdf = simulate_makespan([a["estimated_s"] for a in analyses], workers)
+    planned = simulate_makespan([job["estimated_s"] for job in jobs], workers)
+    print(f"\n⚙️  {len(jobs)} faixas para {workers} processos")
+    print(f"   Previsão: {planned:.2f}s (faixas, maior primeiro) vs {per_pdf:.2f}s (um PDF por processo)")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Análise prévia e plano da extração paralela")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processos do pool")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(Path(__file__).parent))
+    from extract_pdf_images import MIN_HEIGHT, MIN_WIDTH, PDF_DIR, PDF_MAPPING
+
+    found = [PDF_DIR / name for name in PDF_MAPPING if (PDF_DIR / name).exists()]
+    if not found:
+        print("⚠️  Nenhum PDF encontrado.")
+        sys.exit(1)
+    analyses = [analyze_pdf(path, MIN_WIDTH, MIN_HEIGHT) for path in found]
+    print_plan(analyses, plan_jobs(analyses, args.workers), args.workers)
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Grafo de Referências do Site (HTML → imagens)
+Projeto: Origem das Aves em Theropoda
+
+Lê as páginas HTML do site (raiz do projeto e docs/) e monta um grafo
+página → slide/aba → imagens usadas, a partir de `src`/`href`/`data-src`,
+`srcset` e `url(...)` em estilos inline. É a fonte única da lista de
+imagens que o site precisa (antes repetida à mão em três scripts).
+
+Cada referência é resolvida em relação à página; caminhos que saem do
+projeto (ex.: "../images/x.jpg" numa página da raiz) ainda contam pela
+parte após "images/", mas são marcados como caminho quebrado.
+
+O grafo fica em cache (.cache/html_references.json), invalidado quando
+alguma página muda de tamanho/mtime ou quando páginas entram ou saem.
+
+Uso:
+    python html_references.py          # resumo por página
+    python html_references.py --json   # grafo completo
+"""
+
+import json
+import os
+import posixpath
+import re
+import sys
+from html.parser import HTMLParser
+from pathlib import Path
+from urllib.parse import unquote
+
+import image_layout
+
+# ================== CONFIGURAÇÃO ==================
+
+PROJECT_ROOT = Path(__file__).parent.parent
+IMAGES_DIR = PROJECT_ROOT / "images"
+CACHE_FILE = PROJECT_ROOT / ".cache" / "html_references.json"
+
+# Pastas (relativas à raiz) com páginas do site
+SITE_DIRS = ["", "docs"]
+
+# Páginas geradas pelos scripts (não fazem parte do site)
+GENERATED_PAGES = {"image_mapping_guide.html"}
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp', '.svg')
+URL_ATTRIBUTES = ("src", "href", "data-src", "data-background", "data-background-image", "poster")
+CSS_URL_PATTERN = re.compile(r"url\(\s*['\"]?([^'\")]+)['\"]?\s*\)")
+
+# Grafo carregado neste processo
+_GRAPH = None
+
+# ================== PARSER ==================
+
+class ReferenceParser(HTMLParser):
+    """
+    Coleta as imagens de uma página com o slide/aba em que aparecem.
+
+    O "slide" é a aba (`div.tab-content`) ou seção (`<section>`, slides do
+    Reveal.js) mais próxima; sem id, as seções são numeradas (section-1, ...).
+    """
+
+    VOID_ELEMENTS = {"img", "br", "hr", "meta", "link", "input", "source", "area", "col", "embed", "wbr"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack = []          # (tag, id do slide ou None)
+        self.sections = 0
+        self.references = []     # (slide, url, alt)
+
+    def current_slide(self):
+        for _, slide in reversed(self.stack):
+            if slide:
+                return slide
+        return "page"
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        slide = None
+        if tag == "div" and "tab-content" in (attrs.get("class") or "").split():
+            slide = attrs.get("id")
+        elif tag == "section":
+            self.sections += 1
+            slide = attrs.get("id") or f"section-{self.sections}"
+
+        urls = [attrs[name] for name in URL_ATTRIBUTES if attrs.get(name)]
+        if attrs.get("srcset"):
+            urls += [candidate.strip().split()[0] for candidate in attrs["srcset"].split(",") if candidate.strip()]
+        if attrs.get("style"):
+            urls += CSS_URL_PATTERN.findall(attrs["style"])
+
+        context = slide or self.current_slide()
+        for url in urls:
+            if url.split("?")[0].split("#")[0].lower().endswith(IMAGE_EXTENSIONS):
+                self.references.append((context, url, attrs.get("alt") or attrs.get("title")))
+
+        if tag not in self.VOID_ELEMENTS:
+            self.stack.append((tag, slide))
+
+    def handle_endtag(self, tag):
+        # Fechar até a tag correspondente (HTML real nem sempre é bem formado)
+        for index in range(len(self.stack) - 1, -1, -1):
+            if self.stack[index][0] == tag:
+                del self.stack[index:]
+                break
+
+
+def _resolve(page_key, url):
+    """
+    Nome da imagem (relativo a images/) e se o caminho é válido.
+
+    Returns:
+        tuple: (nome ou None, caminho_ok)
+    """
+    if re.match(r"^[a-z][a-z0-9+.-]*:", url, re.IGNORECASE) or url.startswith("//"):
+        return None, True  # URL externa (http:, data:...)
+
+    path = unquote(url.split("?")[0].split("#")[0])
+    resolved = posixpath.normpath(posixpath.join(posixpath.dirname(page_key), path))
+
+    if resolved.startswith("images/"):
+        return resolved[len("images/"):], True
+    if "images/" in resolved:
+        return resolved.rsplit("images/", 1)[1], False
+    return None, True
+
+
+def parse_page(page_key, html_text):
+    """
+    Referências de imagens de uma página.
+
+    Args:
+        page_key (str): Caminho da página relativo à raiz ('/' como separador)
+        html_text (str): Conteúdo HTML
+
+    Returns:
+        list: dicts com 'slide', 'image', 'url', 'alt' e 'path_ok'
+    """
+    parser = ReferenceParser()
+    parser.feed(html_text)
+    parser.close()
+
+    references = []
+    for slide, url, alt in parser.references:
+        image, path_ok = _resolve(page_key, url)
+        if image:
+            references.append({"slide": slide, "image": image, "url": url, "alt": alt, "path_ok": path_ok})
+    return references
+
+
+# ================== GRAFO ==================
+
+def site_pages():
+    """Páginas do site com tamanho/mtime (chave do cache)"""
+    pages = {}
+    for site_dir in SITE_DIRS:
+        directory = PROJECT_ROOT / site_dir
+        if not directory.is_dir():
+            continue
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.lower().endswith(".html") and entry.name not in GENERATED_PAGES:
+                    stat = entry.stat()
+                    key = posixpath.join(site_dir, entry.name) if site_dir else entry.name
+                    pages[key] = [stat.st_size, stat.st_mtime_ns]
+    return pages
+
+
+def build_graph(pages):
+    """
+    Monta o grafo a partir das páginas.
+
+    Returns:
+        dict: 'pages' {página: {slide: [imagens]}}, 'images' {imagem: [usos]}
+              e 'alt' {imagem: texto alternativo}
+    """
+    graph = {"key": pages, "pages": {}, "images": {}, "alt": {}}
+
+    for page_key in sorted(pages):
+        with open(PROJECT_ROOT / page_key, "r", encoding="utf-8", errors="replace") as f:
+            references = parse_page(page_key, f.read())
+
+        slides = graph["pages"].setdefault(page_key, {})
+        for ref in references:
+            slide_images = slides.setdefault(ref["slide"], [])
+            if ref["image"] not in slide_images:
+                slide_images.append(ref["image"])
+            graph["images"].setdefault(ref["image"], []).append(
+                {"page": page_key, "slide": ref["slide"], "path_ok": ref["path_ok"]}
+            )
+            if ref["alt"] and ref["image"] not in graph["alt"]:
+                graph["alt"][ref["image"]] = ref["alt"]
+
+    return graph
+
+
+def load_reference_graph(use_cache=True):
+    """
+    Grafo de referências, reaproveitado enquanto as páginas não mudarem.
+
+    Returns:
+        dict: Grafo (ver build_graph)
+    """
+    global _GRAPH
+    pages = site_pages()
+
+    if use_cache and _GRAPH is not None and _GRAPH["key"] == pages:
+        return _GRAPH
+
+    if use_cache:
+        try:
+            with open(CACHE_FILE, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("key") == pages:
+                _GRAPH = cached
+                return _GRAPH
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+
+    _GRAPH = build_graph(pages)
+    try:
+        CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = CACHE_FILE.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(_GRAPH, f, ensure_ascii=False)
+        tmp_path.replace(CACHE_FILE)
+    except OSError:
+        pass
+
+    return _GRAPH
+
+
+def referenced_images(use_cache=True):
+    """
+    Imagens usadas pelo site (nomes relativos a images/), na ordem em que
+    aparecem nas páginas.
+    """
+    return list(load_reference_graph(use_cache)["images"])
+
+
+def print_summary(graph):
+    """Resumo legível do grafo"""
+    print("=" * 70)
+    print("🕸️  REFERÊNCIAS DE IMAGENS NO SITE")
+    print("=" * 70)
+    for page_key, slides in graph["pages"].items():
+        total = len({image for images in slides.values() for image in images})
+        print(f"\n📄 {page_key}: {total} imagem(ns)")
+        for slide, images in slides.items():
+            print(f"   {slide}: {', '.join(images)}")
+
+    existing = {path.name for path in image_layout.list_paths(images_dir=IMAGES_DIR)}
+    missing = [image for image in graph["images"] if image not in existing]
+    broken = sorted({image for image, uses in graph["images"].items() if not all(u["path_ok"] for u in uses)})
+    print(f"\n🖼️  Imagens referenciadas: {len(graph['images'])}")
+    if missing:
+        print(f"   ⚠️  Ausentes em images/ ({len(missing)}): {', '.join(missing)}")
+    if broken:
+        print(f"   ⚠️  Caminho relativo fora do projeto ({len(broken)}): {', '.join(broken)}")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    graph = load_reference_graph()
+    if "--json" in sys.argv[1:]:
+        print(json.dumps(graph, indent=2, ensure_ascii=False))
+    else:
+        print_summary(graph)
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Catálogo de Imagens Compartilhado (SQLite)
+Projeto: Origem das Aves em Theropoda
+
+Guarda num único arquivo SQLite (.cache/image_catalog.sqlite) os fatos
+sobre cada imagem de images/: hash, dimensões, formato, origem no PDF
+(arquivo, página, xref) e versões processadas geradas a partir dela.
+
+- A extração registra cada imagem gravada com a origem exata no PDF;
+- o processamento registra as versões processadas (por preset);
+- a renomeação atualiza o caminho mantendo a origem;
+- o guia e a renomeação consultam o catálogo em vez de abrir os arquivos.
+
+`refresh()` sincroniza o catálogo com images/ de forma incremental: só
+arquivos novos ou com tamanho/mtime diferentes são relidos (cabeçalho e
+hash); arquivos removidos saem do catálogo.
+
+Uso:
+    python image_catalog.py            # sincroniza e exibe um resumo
+    python image_catalog.py --json     # lista o catálogo em JSON
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import image_layout
+
+# ================== CONFIGURAÇÃO ==================
+
+PROJECT_ROOT = Path(__file__).parent.parent
+IMAGES_DIR = PROJECT_ROOT / "images"
+CATALOG_FILE = PROJECT_ROOT / ".cache" / "image_catalog.sqlite"
+
+IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    path         TEXT PRIMARY KEY,
+    sha256       TEXT,
+    size_bytes   INTEGER,
+    mtime_ns     INTEGER,
+    width        INTEGER,
+    height       INTEGER,
+    format       TEXT,
+    mode         TEXT,
+    source_pdf   TEXT,
+    source_label TEXT,
+    source_page  INTEGER,
+    source_xref  INTEGER,
+    source_kind  TEXT,
+    caption      TEXT,
+    updated_at   REAL
+);
+CREATE TABLE IF NOT EXISTS renditions (
+    source_path  TEXT NOT NULL,
+    preset       TEXT NOT NULL,
+    path         TEXT NOT NULL,
+    width        INTEGER,
+    height       INTEGER,
+    size_bytes   INTEGER,
+    updated_at   REAL,
+    PRIMARY KEY (source_path, preset)
+);
+CREATE INDEX IF NOT EXISTS images_by_source ON images (source_pdf, source_page);
+"""
+
+# Colunas acrescentadas depois da primeira versão do catálogo
+MIGRATIONS = {"caption": "ALTER TABLE images ADD COLUMN caption TEXT"}
+
+# ================== CONEXÃO ==================
+
+def relative_key(path):
+    """Chave do catálogo: caminho relativo à raiz do projeto, com '/'"""
+    return os.path.relpath(path, PROJECT_ROOT).replace(os.sep, "/")
+
+
+def connect(catalog_file=CATALOG_FILE):
+    """
+    Abre (e cria, se preciso) o catálogo.
+
+    O modo WAL permite que etapas paralelas do workflow leiam enquanto
+    outra grava.
+
+    Returns:
+        sqlite3.Connection: Conexão com linhas acessíveis por nome
+    """
+    Path(catalog_file).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(catalog_file), timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    columns = {row["name"] for row in conn.execute("PRAGMA table_info(images)")}
+    for column, statement in MIGRATIONS.items():
+        if column not in columns:
+            conn.execute(statement)
+    return conn
+
+
+@contextmanager
+def catalog_session(conn=None):
+    """
+    Conexão para um lote de operações, com um único commit no final.
+
+    Args:
+        conn (sqlite3.Connection): Conexão existente (reaproveitada sem commit)
+    """
+    if conn is not None:
+        yield conn
+        return
+
+    conn = connect()
+    try:
+        yield conn
+        conn.commit()
+    finally:
+        conn.close()
+
+
+# ================== REGISTRO ==================
+
+def file_sha256(path):
+    """SHA-256 do conteúdo de um arquivo"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _read_header(path):
+    """Dimensões, formato e modo lidos só do cabeçalho (sem decodificar)"""
+    from PIL import Image
+    try:
+        with Image.open(path) as image:
+            return image.size[0], image.size[1], image.format, image.mode
+    except Exception:
+        return None, None, None, None
+
+
+def _read_facts(path, size=None, image_format=None, mode=None):
+    """
+    Tamanho, mtime, hash e cabeçalho de um arquivo: tudo o que é lido do
+    disco, antes de abrir qualquer transação de escrita.
+    """
+    path = Path(path)
+    stat = path.stat()
+    if size is None or image_format is None or mode is None:
+        width, height, header_format, header_mode = _read_header(path)
+        size = size or (width, height)
+        image_format = image_format or header_format
+        mode = mode or header_mode
+    return {"path": path, "sha256": file_sha256(path), "size_bytes": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns, "size": size, "format": image_format, "mode": mode}
+
+
+def _upsert_image(db, facts, source_pdf=None, source_label=None, source_page=None, source_xref=None,
+                  source_kind=None, caption=None):
+    """Grava os fatos de _read_facts; a origem no PDF é preservada se não for informada"""
+    db.execute(
+        """
+        INSERT INTO images (path, sha256, size_bytes, mtime_ns, width, height, format, mode,
+                            source_pdf, source_label, source_page, source_xref, source_kind, caption,
+                            updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(path) DO UPDATE SET
+            sha256 = excluded.sha256,
+            size_bytes = excluded.size_bytes,
+            mtime_ns = excluded.mtime_ns,
+            width = excluded.width,
+            height = excluded.height,
+            format = excluded.format,
+            mode = excluded.mode,
+            source_pdf = COALESCE(excluded.source_pdf, images.source_pdf),
+            source_label = COALESCE(excluded.source_label, images.source_label),
+            source_page = COALESCE(excluded.source_page, images.source_page),
+            source_xref = COALESCE(excluded.source_xref, images.source_xref),
+            source_kind = COALESCE(excluded.source_kind, images.source_kind),
+            caption = COALESCE(excluded.caption, images.caption),
+            updated_at = excluded.updated_at
+        """,
+        (relative_key(facts["path"]), facts["sha256"], facts["size_bytes"], facts["mtime_ns"],
+         facts["size"][0], facts["size"][1], facts["format"], facts["mode"], source_pdf, source_label,
+         source_page, source_xref, source_kind, caption, time.time()),
+    )
+
+
+def record_image(path, size=None, image_format=None, mode=None, source_pdf=None, source_label=None,
+                 source_page=None, source_xref=None, source_kind=None, caption=None, conn=None):
+    """
+    Registra (ou atualiza) uma imagem gravada em disco.
+
+    Dimensões/formato já conhecidos por quem gravou o arquivo evitam
+    reabrir a imagem; a origem no PDF é preservada se não for informada.
+
+    Args:
+        path (Path): Arquivo da imagem
+        size (tuple): (largura, altura), se já conhecidas
+        image_format (str): Formato (JPEG, PNG...), se conhecido
+        mode (str): Modo de cor, se conhecido
+        source_pdf (str): Nome do PDF de origem
+        source_label (str): Referência do artigo (ex.: "Foth & Rauhut (2017)")
+        source_page (int): Página (1-based) no PDF
+        source_xref (int): xref do stream da imagem no PDF
+        source_kind (str): 'embedded' (stream extraído) ou 'rendered' (página)
+        caption (str): Legenda da figura no PDF, se encontrada
+        conn (sqlite3.Connection): Conexão existente (opcional)
+    """
+    facts = _read_facts(path, size, image_format, mode)
+    with catalog_session(conn) as db:
+        _upsert_image(db, facts, source_pdf, source_label, source_page, source_xref, source_kind, caption)
+
+
+def record_rendition(source_path, preset, output_path, size, conn=None):
+    """
+    Registra a versão processada de uma imagem para um preset.
+
+    Versões de um original que não está em disco (ex.: extração fundida com
+    --no-originals) não são registradas: o catálogo liga versões a imagens
+    de images/.
+
+    Args:
+        source_path (Path): Imagem original
+        preset (str): Preset aplicado
+        output_path (Path): Arquivo processado
+        size (tuple): (largura, altura) do arquivo processado
+        conn (sqlite3.Connection): Conexão existente (opcional)
+    """
+    if not Path(source_path).exists():
+        return
+    with catalog_session(conn) as db:
+        db.execute(
+            "INSERT OR REPLACE INTO renditions VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (relative_key(source_path), preset, relative_key(output_path), size[0], size[1],
+             Path(output_path).stat().st_size, time.time()),
+        )
+
+
+def rename_image(old_path, new_path, conn=None):
+    """
+    Acompanha uma renomeação: o registro (e suas versões processadas)
+    passa ao novo caminho, mantendo a origem no PDF.
+    """
+    old_key, new_key = relative_key(old_path), relative_key(new_path)
+    with catalog_session(conn) as db:
+        db.execute("DELETE FROM images WHERE path = ?", (new_key,))
+        db.execute("DELETE FROM renditions WHERE source_path = ?", (new_key,))
+        db.execute("UPDATE images SET path = ? WHERE path = ?", (new_key, old_key))
+        db.execute("UPDATE renditions SET source_path = ? WHERE source_path = ?", (new_key, old_key))
+
+
+def refresh(images_dir=IMAGES_DIR, conn=None):
+    """
+    Sincroniza o catálogo com images/ (uma passada de scandir, ou o índice
+    no modo em subpastas; ver image_layout.py).
+
+    Só arquivos novos ou alterados (tamanho/mtime) são relidos; registros
+    de arquivos que sumiram são removidos. Os arquivos são lidos e
+    hasheados antes da escrita, então o lock de escrita do catálogo fica
+    preso só durante as gravações (as etapas paralelas do workflow não
+    esperam pelo hash de images/ inteira).
+
+    Returns:
+        dict: Contagens 'added', 'updated', 'removed' e 'unchanged'
+    """
+    counts = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+    prefix = relative_key(images_dir) + "/"
+
+    with catalog_session(conn) as db:
+        known = {row["path"]: (row["size_bytes"], row["mtime_ns"])
+                 for row in db.execute("SELECT path, size_bytes, mtime_ns FROM images WHERE path LIKE ?",
+                                       (prefix + "%",))
+                 if image_layout.logical_name(row["path"][len(prefix):]) is not None}
+
+        seen, changed = set(), []
+        for path in image_layout.list_paths(extensions=IMAGE_EXTENSIONS, images_dir=images_dir):
+            key = relative_key(path)
+            try:
+                stat = path.stat()
+            except FileNotFoundError:  # no índice, mas apagado à mão
+                continue
+            seen.add(key)
+            if known.get(key) == (stat.st_size, stat.st_mtime_ns):
+                counts["unchanged"] += 1
+                continue
+            try:
+                changed.append(_read_facts(path))
+            except FileNotFoundError:  # apagado durante a leitura
+                seen.discard(key)
+                continue
+            counts["updated" if key in known else "added"] += 1
+
+        # Só escrita daqui em diante (uma transação curta)
+        for facts in changed:
+            _upsert_image(db, facts)
+        for key in set(known) - seen:
+            db.execute("DELETE FROM images WHERE path = ?", (key,))
+            counts["removed"] += 1
+
+    return counts
+
+
+def relocate(images_dir=IMAGES_DIR, conn=None):
+    """
+    Acompanha uma troca de organização de images/ (pasta plana <-> subpastas):
+    cada registro passa ao caminho que image_layout dá ao seu nome, sem
+    reler os arquivos.
+
+    Returns:
+        int: Registros atualizados
+    """
+    prefix = relative_key(images_dir) + "/"
+    updated = 0
+    with catalog_session(conn) as db:
+        for table, column, namespace in (("images", "path", ""), ("renditions", "source_path", ""),
+                                         ("renditions", "path", "processed")):
+            rows = db.execute(f"SELECT DISTINCT {column} FROM {table} WHERE {column} LIKE ?",
+                              (prefix + "%",)).fetchall()
+            for (old_key,) in rows:
+                if image_layout.logical_name(old_key[len(prefix):], namespace) is None:
+                    continue
+                new_key = relative_key(image_layout.path_for(old_key.rsplit("/", 1)[1], namespace, images_dir))
+                if new_key != old_key:
+                    db.execute(f"UPDATE {table} SET {column} = ? WHERE {column} = ?", (new_key, old_key))
+                    updated += 1
+    return updated
+
+
+# ================== CONSULTAS ==================
+
+def get_image(path, conn=None):
+    """Registro de uma imagem (dict) ou None"""
+    with catalog_session(conn) as db:
+        row = db.execute("SELECT * FROM images WHERE path = ?", (relative_key(path),)).fetchone()
+        return dict(row) if row else None
+
+
+def list_catalog(images_dir=IMAGES_DIR, extensions=None, conn=None):
+    """
+    Registros das imagens principais de images/ (no nível principal, ou nas
+    subpastas do image_layout), ordenados por nome.
+
+    Args:
+        images_dir (Path): Pasta consultada
+        extensions (list): Extensões aceitas (padrão: IMAGE_EXTENSIONS)
+        conn (sqlite3.Connection): Conexão existente (opcional)
+
+    Returns:
+        list: Um dict por imagem (com 'file': Path absoluto)
+    """
+    extensions = [ext.lower() for ext in (extensions or IMAGE_EXTENSIONS)]
+    prefix = relative_key(images_dir) + "/"
+    records = []
+
+    with catalog_session(conn) as db:
+        for row in db.execute("SELECT * FROM images WHERE path LIKE ?", (prefix + "%",)):
+            name = image_layout.logical_name(row["path"][len(prefix):])
+            if name is None or os.path.splitext(name)[1].lower() not in extensions:
+                continue
+            record = dict(row)
+            record["file"] = PROJECT_ROOT / row["path"]
+            records.append(record)
+        records.sort(key=lambda record: record["file"].name)
+
+    return records
+
+
+def renditions_of(path, conn=None):
+    """Versões processadas de uma imagem, por preset"""
+    with catalog_session(conn) as db:
+        rows = db.execute("SELECT * FROM renditions WHERE source_path = ?", (relative_key(path),))
+        return {row["preset"]: dict(row) for row in rows}
+
+
+if __name__ == "__main__":
+    with catalog_session() as db:
+        counts = refresh(conn=db)
+        records = list_catalog(conn=db)
+
+    if "--json" in sys.argv[1:]:
+        for record in records:
+            record["file"] = str(record["file"])
+        print(json.dumps(records, indent=2, ensure_ascii=False))
+    else:
+        print("=" * 70)
+        print("🗃️  CATÁLOGO DE IMAGENS")
+        print("=" * 70)
+        print(f"   Arquivo: {CATALOG_FILE}")
+        print(f"   Imagens: {len(records)} "
+              f"(+{counts['added']} novas, {counts['updated']} alteradas, -{counts['removed']} removidas)")
+        with_source = sum(1 for record in records if record["source_pdf"])
+        print(f"   Com origem no PDF: {with_source}")
+        print("=" * 70)
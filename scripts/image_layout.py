@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Organização da Pasta images/ (Plana ou em Subpastas com Índice)
+Projeto: Origem das Aves em Theropoda
+
+Por padrão tudo fica direto em images/ (e images/processed/). Com dezenas de
+milhares de arquivos, cada listagem fica lenta e nomes repetidos começam a
+colidir. No modo em subpastas, cada arquivo vai para
+
+    images/[processed/]<prefixo>/<hh>/<nome>
+
+onde <prefixo> é o começo do nome (o output_prefix do PDF: "cladogram",
+"archaeopteryx"...; "figure" para os nomes da Wikimedia) e <hh> são dois
+dígitos do SHA-1 do nome (256 subpastas por prefixo).
+
+O índice images/index.jsonl liga o nome lógico (o que o HTML e os
+relatórios usam) ao caminho real. Cada gravação é uma linha acrescentada
+(escrita com O_APPEND: processos paralelos podem gravar juntos), e a última
+linha de cada nome vale. As etapas resolvem caminhos e listam imagens por
+este módulo: sem índice, o comportamento é o de sempre (pasta plana).
+
+Uso:
+    python image_layout.py status
+    python image_layout.py shard      # move para subpastas e cria o índice
+    python image_layout.py flatten    # volta à pasta plana (ex.: publicar o site)
+    python image_layout.py compact    # reescreve o índice sem linhas antigas
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+# ================== CONFIGURAÇÃO ==================
+
+PROJECT_ROOT = Path(__file__).parent.parent
+IMAGES_DIR = PROJECT_ROOT / "images"
+INDEX_NAME = "index.jsonl"
+
+# Espaços de nomes: imagens principais e versões processadas
+NAMESPACES = ("", "processed")
+
+# Subpastas de images/ que não são imagens do projeto
+RESERVED_DIRS = {"processed", "backup"}
+
+IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff']
+
+# Dígitos hexadecimais do SHA-1 do nome na subpasta (2 = 256 subpastas)
+FANOUT_CHARS = 2
+
+# Índices já lidos: {arquivo: ((tamanho, mtime), {(espaço, nome): caminho})}
+_INDEX_CACHE = {}
+
+# ================== CAMINHOS ==================
+
+def index_file(images_dir=IMAGES_DIR):
+    return Path(images_dir) / INDEX_NAME
+
+
+def is_sharded(images_dir=IMAGES_DIR):
+    """A pasta usa o modo em subpastas? (existe um índice)"""
+    return index_file(images_dir).exists()
+
+
+def shard_subdir(name):
+    """Subpasta de um nome: "<prefixo>/<hh>" """
+    match = re.match(r"[a-z0-9]+", name.lower())
+    prefix = match.group(0) if match and match.group(0) not in RESERVED_DIRS else "_"
+    return f"{prefix}/{hashlib.sha1(name.encode('utf-8')).hexdigest()[:FANOUT_CHARS]}"
+
+
+def _base(namespace, images_dir):
+    return Path(images_dir) / namespace if namespace else Path(images_dir)
+
+
+def _load_index(images_dir=IMAGES_DIR):
+    """
+    Índice {(espaço, nome): caminho relativo a images/}, relido só quando
+    o arquivo muda.
+    """
+    path = index_file(images_dir)
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return {}
+    key = (stat.st_size, stat.st_mtime_ns)
+    cached = _INDEX_CACHE.get(path)
+    if cached and cached[0] == key:
+        return cached[1]
+
+    entries = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # linha incompleta (processo interrompido)
+            entry_key = (record.get("ns", ""), record["name"])
+            if record.get("path") is None:
+                entries.pop(entry_key, None)
+            else:
+                entries[entry_key] = record["path"]
+    _INDEX_CACHE[path] = (key, entries)
+    return entries
+
+
+def path_for(name, namespace="", images_dir=IMAGES_DIR):
+    """
+    Caminho de um nome lógico (exista ou não o arquivo).
+
+    Args:
+        name (str): Nome do arquivo (ex.: "cladogram_p3_img1.png")
+        namespace (str): "" (images/) ou "processed"
+        images_dir (Path): Pasta das imagens
+
+    Returns:
+        Path: Caminho indexado, ou onde o arquivo deve ser gravado
+    """
+    if not is_sharded(images_dir):
+        return _base(namespace, images_dir) / name
+    indexed = _load_index(images_dir).get((namespace, name))
+    if indexed is not None:
+        return Path(images_dir) / indexed
+    return _base(namespace, images_dir) / shard_subdir(name) / name
+
+
+def prepare(name, namespace="", images_dir=IMAGES_DIR):
+    """Caminho para gravar um nome, com a pasta criada (chamar register depois)"""
+    path = path_for(name, namespace, images_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _append(records, images_dir):
+    lines = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+    # Uma só escrita em modo append: linhas de processos diferentes não se misturam
+    fd = os.open(index_file(images_dir), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, lines.encode("utf-8"))
+    finally:
+        os.close(fd)
+
+
+def register(path, namespace="", images_dir=IMAGES_DIR):
+    """Registra no índice um arquivo gravado (sem efeito na pasta plana)"""
+    if not is_sharded(images_dir):
+        return
+    relative = os.path.relpath(path, images_dir).replace(os.sep, "/")
+    _append([{"ns": namespace, "name": Path(path).name, "path": relative}], images_dir)
+
+
+def unregister(name, namespace="", images_dir=IMAGES_DIR):
+    """Retira um nome do índice (arquivo removido ou renomeado)"""
+    if not is_sharded(images_dir):
+        return
+    _append([{"ns": namespace, "name": name, "path": None}], images_dir)
+
+
+def move(old_name, new_name, namespace="", images_dir=IMAGES_DIR):
+    """
+    Renomeia um arquivo pelo nome lógico (na pasta plana, um os.rename).
+
+    Returns:
+        Path: Novo caminho
+    """
+    old_path = path_for(old_name, namespace, images_dir)
+    if is_sharded(images_dir):
+        new_path = _base(namespace, images_dir) / shard_subdir(new_name) / new_name
+        new_path.parent.mkdir(parents=True, exist_ok=True)
+    else:
+        new_path = _base(namespace, images_dir) / new_name
+    os.rename(old_path, new_path)
+    if is_sharded(images_dir):
+        _remove_empty_parents(old_path, images_dir)
+        relative = os.path.relpath(new_path, images_dir).replace(os.sep, "/")
+        _append([{"ns": namespace, "name": old_name, "path": None},
+                 {"ns": namespace, "name": new_name, "path": relative}], images_dir)
+    return new_path
+
+
+def logical_name(relative, namespace=""):
+    """
+    Nome lógico de um caminho relativo a images/, se for onde a organização
+    guarda arquivos do espaço (senão None).
+    """
+    parts = relative.split("/")
+    if namespace:
+        if parts[0] != namespace:
+            return None
+        parts = parts[1:]
+    if len(parts) == 1:
+        return parts[0]
+    if len(parts) == 3 and "/".join(parts[:2]) == shard_subdir(parts[2]):
+        return parts[2]
+    return None
+
+
+def list_paths(namespace="", extensions=None, images_dir=IMAGES_DIR):
+    """
+    Arquivos de um espaço, ordenados por nome.
+
+    Na pasta plana é uma passada de scandir; em subpastas, vem do índice
+    (sem percorrer as pastas).
+
+    Returns:
+        list: Caminhos (Path)
+    """
+    extensions = [ext.lower() for ext in (extensions or IMAGE_EXTENSIONS)]
+    if is_sharded(images_dir):
+        return [Path(images_dir) / relative
+                for (ns, name), relative in sorted(_load_index(images_dir).items())
+                if ns == namespace and os.path.splitext(name)[1].lower() in extensions]
+
+    base = _base(namespace, images_dir)
+    if not base.exists():
+        return []
+    with os.scandir(base) as entries:
+        return sorted((Path(entry.path) for entry in entries
+                       if entry.is_file() and os.path.splitext(entry.name)[1].lower() in extensions),
+                      key=lambda path: path.name)
+
+
+def _remove_empty_parents(path, images_dir):
+    """Remove as subpastas <prefixo>/<hh> de um caminho que ficaram vazias"""
+    stop = {Path(images_dir)} | {_base(namespace, images_dir) for namespace in NAMESPACES}
+    parent = Path(path).parent
+    while parent not in stop:
+        try:
+            parent.rmdir()  # só se ficou vazia
+        except OSError:
+            break
+        parent = parent.parent
+
+
+def _remove_empty_subdirs(images_dir):
+    """Remove as subpastas <prefixo>/<hh> vazias (inclusive as criadas e não usadas)"""
+    for namespace in NAMESPACES:
+        base = _base(namespace, images_dir)
+        if not base.exists():
+            continue
+        for prefix_dir in base.iterdir():
+            if not prefix_dir.is_dir() or prefix_dir.name in RESERVED_DIRS:
+                continue
+            for bucket in prefix_dir.iterdir():
+                if re.fullmatch(f"[0-9a-f]{{{FANOUT_CHARS}}}", bucket.name):
+                    try:
+                        bucket.rmdir()  # só se ficou vazia
+                    except OSError:
+                        pass
+            try:
+                prefix_dir.rmdir()
+            except OSError:
+                pass
+
+
+# ================== MIGRAÇÃO ==================
+
+def _flat_files(base):
+    if not base.exists():
+        return []
+    with os.scandir(base) as entries:
+        return [Path(entry.path) for entry in entries
+                if entry.is_file() and os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS]
+
+
+def shard(images_dir=IMAGES_DIR):
+    """
+    Passa a pasta plana para subpastas e grava o índice.
+
+    Returns:
+        int: Arquivos movidos
+    """
+    images_dir = Path(images_dir)
+    if is_sharded(images_dir):
+        print("ℹ️  A pasta já está em subpastas.")
+        return 0
+    records = []
+    for namespace in NAMESPACES:
+        base = _base(namespace, images_dir)
+        for path in _flat_files(base):
+            target = base / shard_subdir(path.name) / path.name
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.rename(path, target)
+            records.append({"ns": namespace, "name": path.name,
+                            "path": os.path.relpath(target, images_dir).replace(os.sep, "/")})
+    # Índice por último: até aqui, uma interrupção deixa a pasta "plana" com
+    # arquivos já movidos, e repetir o comando os encontra
+    tmp_path = index_file(images_dir).with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    os.replace(tmp_path, index_file(images_dir))
+    _sync_catalog(images_dir)
+    return len(records)
+
+
+def flatten(images_dir=IMAGES_DIR):
+    """
+    Volta à pasta plana (o HTML referencia images/<nome>) e remove o índice.
+
+    Returns:
+        int: Arquivos movidos
+    """
+    images_dir = Path(images_dir)
+    if not is_sharded(images_dir):
+        print("ℹ️  A pasta já é plana.")
+        return 0
+    moved = 0
+    for (namespace, name), relative in sorted(_load_index(images_dir).items()):
+        source = images_dir / relative
+        target = _base(namespace, images_dir) / name
+        if source.exists() and source != target:
+            os.rename(source, target)
+            moved += 1
+    index_file(images_dir).unlink()
+    _remove_empty_subdirs(images_dir)
+    _sync_catalog(images_dir)
+    return moved
+
+
+def compact(images_dir=IMAGES_DIR):
+    """Reescreve o índice com uma linha por nome (sem nomes removidos)"""
+    entries = _load_index(images_dir)
+    tmp_path = index_file(images_dir).with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for (namespace, name), relative in sorted(entries.items()):
+            f.write(json.dumps({"ns": namespace, "name": name, "path": relative}, ensure_ascii=False) + "\n")
+    os.replace(tmp_path, index_file(images_dir))
+    return len(entries)
+
+
+def _sync_catalog(images_dir):
+    """Os caminhos mudaram: o catálogo acompanha (hashes já conhecidos não são relidos)"""
+    import image_catalog
+    with image_catalog.catalog_session() as db:
+        image_catalog.relocate(images_dir, conn=db)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Organização da pasta images/")
+    parser.add_argument("command", choices=["status", "shard", "flatten", "compact"])
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(Path(__file__).parent))
+    if args.command == "shard":
+        print(f"✅ {shard()} arquivo(s) movido(s) para subpastas; índice em {index_file()}")
+    elif args.command == "flatten":
+        print(f"✅ {flatten()} arquivo(s) de volta a images/")
+    elif args.command == "compact":
+        print(f"✅ Índice compactado: {compact()} nome(s)")
+    else:
+        mode = "subpastas com índice" if is_sharded() else "plana"
+        print(f"📁 {IMAGES_DIR}: {mode}")
+        for namespace in NAMESPACES:
+            print(f"   {namespace or 'images'}: {len(list_paths(namespace))} arquivo(s)")
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Correspondência Pontuada Imagens ↔ Nomes do HTML
+Projeto: Origem das Aves em Theropoda
+
+Sugere qual imagem extraída deve receber cada nome esperado pelo HTML:
+
+1. cada imagem é tokenizada uma única vez (nome do arquivo, legenda da
+   figura e origem no PDF, vindas do catálogo) num índice invertido;
+2. cada alvo (nome + descrição do HTML + palavras-chave) consulta o índice
+   e pontua só as imagens que compartilham termos com ele (peso IDF);
+3. a atribuição final é um emparelhamento um-para-um de pontuação total
+   máxima (algoritmo húngaro), em vez da primeira ocorrência encontrada.
+
+Os tokens são normalizados (minúsculas, sem acentos) e reduzidos aos
+primeiros STEM_LENGTH caracteres, o que aproxima termos em português e
+inglês ("cladograma"/"cladogram", "respiração"/"respiratory").
+"""
+
+import math
+import re
+import unicodedata
+from collections import defaultdict
+
+import numpy as np
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:  # scipy é opcional; há uma implementação em numpy
+    linear_sum_assignment = None
+
+# ================== CONFIGURAÇÃO ==================
+
+STEM_LENGTH = 6
+MIN_TOKEN_LENGTH = 3
+
+# Peso de cada campo da imagem na pontuação
+FIELD_WEIGHTS = {"name": 1.0, "caption": 0.7, "source": 0.5}
+
+# Candidatos exibidos por alvo
+TOP_CANDIDATES = 3
+
+# Candidatos por alvo que entram no emparelhamento: termos muito comuns
+# ligariam todos os alvos a todas as imagens (matriz densa 1k × 10k)
+MAX_CANDIDATES_PER_TARGET = 50
+
+STOPWORDS = {
+    "the", "and", "for", "with", "from", "its", "their", "new", "gen", "nov", "where", "this",
+    "that", "which", "showing", "view",
+    "fig", "figure", "figura", "img", "image", "imagem", "page", "highres",
+    "uma", "com", "dos", "das", "para", "por", "sem", "ou", "que", "jpg", "jpeg", "png",
+}
+
+# ================== TOKENIZAÇÃO ==================
+
+def _strip_accents(text):
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+
+
+def tokenize(text):
+    """
+    Termos normalizados de um texto (nome de arquivo, legenda, descrição).
+
+    Returns:
+        set: Radicais (até STEM_LENGTH caracteres)
+    """
+    if not text:
+        return set()
+    # Separar camelCase e trocar qualquer não alfanumérico por espaço
+    text = re.sub(r"([a-z])([A-Z])", r"\1 \2", text)
+    words = re.split(r"[^a-z0-9]+", _strip_accents(text).lower())
+    return {
+        word[:STEM_LENGTH] for word in words
+        if len(word) >= MIN_TOKEN_LENGTH and word not in STOPWORDS
+        and not word.isdigit() and not re.fullmatch(r"(p|img|page)\d+", word)
+    }
+
+
+# ================== ÍNDICE E PONTUAÇÃO ==================
+
+def build_index(images):
+    """
+    Índice invertido das imagens.
+
+    Args:
+        images (list): dicts com 'name' e, opcionalmente, 'caption' e 'source'
+
+    Returns:
+        dict: {token: (índices das imagens, pesos já multiplicados pelo IDF)}
+    """
+    postings = defaultdict(list)
+    for image_idx, image in enumerate(images):
+        weights = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            text = image.get(field)
+            if field == "name":
+                text = text.rsplit(".", 1)[0]
+            for token in tokenize(text):
+                weights[token] = max(weights.get(token, 0), weight)
+        for token, weight in weights.items():
+            postings[token].append((image_idx, weight))
+
+    total = max(len(images), 1)
+    index = {}
+    for token, entries in postings.items():
+        idf = math.log(1 + total / len(entries))
+        indices, weights = zip(*entries)
+        index[token] = (np.array(indices, dtype=np.int64), np.array(weights) * idf)
+    return index
+
+
+def score_candidates(index, n_images, target_tokens, limit=MAX_CANDIDATES_PER_TARGET):
+    """
+    Pontua as imagens que compartilham termos com um alvo.
+
+    As listas de cada termo são somadas num vetor denso (cada imagem
+    aparece uma vez por termo), e só as `limit` melhores são mantidas.
+
+    Returns:
+        dict: {índice da imagem: pontuação}
+    """
+    hits = [index[token] for token in target_tokens if token in index]
+    if not hits:
+        return {}
+
+    scores = np.zeros(n_images)
+    for indices, weights in hits:
+        scores[indices] += weights
+
+    candidates = np.flatnonzero(scores)
+    if len(candidates) > limit:
+        candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+    return {int(image_idx): float(scores[image_idx]) for image_idx in candidates}
+
+
+# ================== EMPARELHAMENTO ÓTIMO ==================
+
+def _hungarian(cost):
+    """
+    Atribuição de custo mínimo (linhas ≤ colunas), algoritmo húngaro com
+    caminhos aumentantes; o laço interno é vetorizado sobre as colunas.
+
+    Returns:
+        list: Pares (linha, coluna)
+    """
+    n, m = cost.shape
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=int)      # p[j]: linha (1-based) atribuída à coluna j
+    way = np.zeros(m + 1, dtype=int)
+
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            free = ~used[1:]
+            reduced = cost[i0 - 1] - u[i0] - v[1:]
+            improve = free & (reduced < minv[1:])
+            minv[1:][improve] = reduced[improve]
+            way[1:][improve] = j0
+
+            candidates = np.where(free, minv[1:], np.inf)
+            j1 = int(np.argmin(candidates)) + 1
+            delta = candidates[j1 - 1]
+
+            u[p[used]] += delta
+            v[used] -= delta
+            minv[~used] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+
+    return [(p[j] - 1, j - 1) for j in range(1, m + 1) if p[j]]
+
+
+def optimal_assignment(scores):
+    """
+    Emparelhamento um-para-um de pontuação total máxima.
+
+    Args:
+        scores (np.ndarray): Matriz alvos × candidatos (0 = sem relação)
+
+    Returns:
+        list: Pares (alvo, candidato) com pontuação positiva
+    """
+    if scores.size == 0:
+        return []
+
+    transposed = scores.shape[0] > scores.shape[1]
+    cost = -(scores.T if transposed else scores)
+
+    if linear_sum_assignment is not None:
+        pairs = zip(*linear_sum_assignment(cost))
+    else:
+        pairs = _hungarian(cost)
+
+    pairs = [(col, row) if transposed else (row, col) for row, col in pairs]
+    return [(target, candidate) for target, candidate in pairs if scores[target, candidate] > 0]
+
+
+def _components(edges, n_targets):
+    """Componentes conexos do grafo alvo–imagem (matrizes menores para o húngaro)"""
+    parent = list(range(n_targets))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    owner = {}
+    for target, candidates in edges.items():
+        for image_idx in candidates:
+            if image_idx in owner:
+                parent[find(target)] = find(owner[image_idx])
+            else:
+                owner[image_idx] = target
+
+    groups = defaultdict(list)
+    for target in edges:
+        groups[find(target)].append(target)
+    return list(groups.values())
+
+
+def match_images(images, targets, top=TOP_CANDIDATES):
+    """
+    Sugere uma imagem para cada alvo.
+
+    Args:
+        images (list): dicts com 'name', 'caption' e 'source'
+        targets (dict): {nome do alvo: texto descritivo (nome, descrição, palavras-chave)}
+        top (int): Candidatos ranqueados devolvidos por alvo
+
+    Returns:
+        dict: {alvo: {'assigned': (imagem, pontuação) ou None,
+                      'ranked': [(imagem, pontuação), ...]}}
+    """
+    index = build_index(images)
+    target_names = list(targets)
+    edges = {}
+    for target_idx, name in enumerate(target_names):
+        scores = score_candidates(index, len(images), tokenize(targets[name]))
+        if scores:
+            edges[target_idx] = scores
+
+    assigned = {}
+    for group in _components(edges, len(target_names)):
+        columns = sorted({image_idx for target in group for image_idx in edges[target]})
+        column_of = {image_idx: col for col, image_idx in enumerate(columns)}
+        matrix = np.zeros((len(group), len(columns)))
+        for row, target in enumerate(group):
+            for image_idx, score in edges[target].items():
+                matrix[row, column_of[image_idx]] = score
+        for row, col in optimal_assignment(matrix):
+            assigned[group[row]] = (columns[col], matrix[row, col])
+
+    result = {}
+    for target_idx, name in enumerate(target_names):
+        ranked = sorted(edges.get(target_idx, {}).items(), key=lambda item: -item[1])[:top]
+        choice = assigned.get(target_idx)
+        result[name] = {
+            "assigned": (images[choice[0]]["name"], round(choice[1], 3)) if choice else None,
+            "ranked": [(images[image_idx]["name"], round(score, 3)) for image_idx, score in ranked],
+        }
+    return result
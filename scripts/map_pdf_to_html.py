@@ -19,13 +19,20 @@ import json
 import base64
 from datetime import datetime
 
+import html_references
+import image_catalog
+import image_layout
+import pipeline_metrics
+import profiling
+
 # ================== CONFIGURAÇÃO ==================
 
 PROJECT_ROOT = Path(__file__).parent.parent
 IMAGES_DIR = PROJECT_ROOT / "images"
 OUTPUT_HTML = PROJECT_ROOT / "image_mapping_guide.html"
 
-# Imagens esperadas no HTML
+# Descrições das imagens do HTML (a lista de imagens usadas vem das
+# próprias páginas; ver html_references.py)
 HTML_IMAGES = {
     "intro_aves_dinos.jpg": {
         "description": "Ilustração artística da evolução dinossauro para ave",
@@ -110,6 +117,7 @@ PDF_SOURCES = {
 
 # ================== FUNÇÕES ==================
 
+@profiling.traced(category="guide")
 def image_to_base64(image_path):
     """Converte imagem para base64 para embedding no HTML"""
     try:
@@ -120,33 +128,22 @@ def image_to_base64(image_path):
         return None
 
 
-def generate_mapping_guide():
-    """Gera o guia HTML interativo"""
-    
-    print("=" * 70)
-    print("🗺️  GERANDO GUIA DE MAPEAMENTO PDF → HTML")
-    print("=" * 70)
-    
-    # Coletar imagens extraídas
-    image_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.bmp']
-    extracted_images = sorted([f for f in IMAGES_DIR.iterdir() 
-                               if f.is_file() and f.suffix.lower() in image_extensions])
+def group_by_source(records):
+    """
+    Agrupa registros de imagens pelo paper de origem.
     
-    if not extracted_images:
-        print("\n⚠️  Nenhuma imagem encontrada em:", IMAGES_DIR)
-        print("   Execute extract_pdf_images.py primeiro.")
-        return
-    
-    print(f"\n📁 Encontradas {len(extracted_images)} imagens extraídas")
-    
-    # Organizar imagens por prefixo (origem do PDF)
+    Returns:
+        dict: {fonte: [registros]}
+    """
     images_by_source = {}
-    for img in extracted_images:
-        # Detectar prefixo (nome do PDF de origem)
-        name_lower = img.stem.lower()
+    for record in records:
+        # Origem registrada na extração; sem ela, deduzir pelo nome do arquivo
+        name_lower = Path(record["file"]).stem.lower()
         
         source = "outros"
-        if "propatagium" in name_lower:
+        if record["source_label"]:
+            source = record["source_label"]
+        elif "propatagium" in name_lower:
             source = "Uno & Hirasawa (2023)"
         elif "body_shape" in name_lower or "com" in name_lower:
             source = "Macaulay et al. (2023)"
@@ -160,11 +157,36 @@ def generate_mapping_guide():
         if source not in images_by_source:
             images_by_source[source] = []
         
-        images_by_source[source].append(img)
+        images_by_source[source].append(record)
     
-    print(f"📚 Organizadas por {len(images_by_source)} fontes")
+    return images_by_source
+
+
+def image_source(record):
+    """`src` do card: a imagem embutida (registro com bytes) ou o arquivo ao lado do guia"""
+    if record.get("data"):
+        mime = {"jpg": "jpeg"}.get(record["format"].lower(), record["format"].lower())
+        return f"data:image/{mime};base64,{base64.b64encode(record['data']).decode('ascii')}"
+    return Path(record["file"]).name
+
+
+def render_guide(records, reference_graph, existing_names=()):
+    """
+    Monta o HTML do guia, sem ler nem gravar arquivos.
+    
+    Args:
+        records (list): Registros no formato do catálogo ('file', 'size_bytes',
+            'width', 'height', 'source_page', 'source_label'); com 'data' e
+            'format', a imagem vai embutida no HTML
+        reference_graph (dict): Grafo de html_references.load_reference_graph()
+        existing_names (set): Nomes esperados pelo site que já existem
+    
+    Returns:
+        str: Documento HTML
+    """
+    images_by_source = group_by_source(records)
+    existing_names = set(existing_names) | {Path(record["file"]).name for record in records}
     
-    # Gerar HTML
     html_content = f"""<!DOCTYPE html>
 <html lang="pt-br">
 <head>
@@ -370,12 +392,17 @@ def generate_mapping_guide():
         </div>
         
         <div class="section">
-            <div class="section-title">🎯 IMAGENS NECESSÁRIAS NO HTML (10 alvos)</div>
+            <div class="section-title">🎯 IMAGENS NECESSÁRIAS NO HTML ({len(reference_graph['images'])} alvos)</div>
 """
     
-    # Listar imagens esperadas pelo HTML
-    for idx, (filename, info) in enumerate(HTML_IMAGES.items(), 1):
-        exists = (IMAGES_DIR / filename).exists()
+    # Listar imagens usadas pelas páginas (descrição curada ou texto alternativo)
+    for idx, (filename, uses) in enumerate(reference_graph["images"].items(), 1):
+        info = HTML_IMAGES.get(filename) or {
+            "description": reference_graph["alt"].get(filename, "—"),
+            "context": "; ".join(sorted({f"{use['page']} › {use['slide']}" for use in uses})),
+            "suggested_source": "—",
+        }
+        exists = filename in existing_names
         status_badge = f'<span class="badge" style="background: {"#4CAF50" if exists else "#F44336"}">{"✅ Presente" if exists else "❌ Ausente"}</span>'
         
         html_content += f"""
@@ -420,28 +447,22 @@ def generate_mapping_guide():
 """
         
         # Cards das imagens
-        for img_path in images:
-            # Obter informações da imagem
-            file_size = img_path.stat().st_size / 1024  # KB
-            
-            # Tentar carregar dimensões
-            try:
-                from PIL import Image
-                with Image.open(img_path) as pil_img:
-                    width, height = pil_img.size
-                    dimensions = f"{width}x{height}"
-            except:
-                dimensions = "N/A"
+        for record in images:
+            # Informações da imagem (do catálogo)
+            img_path = Path(record["file"])
+            file_size = record["size_bytes"] / 1024  # KB
+            dimensions = f"{record['width']}x{record['height']}" if record["width"] else "N/A"
+            origin = f" (p. {record['source_page']})" if record["source_page"] else ""
             
             html_content += f"""
                 <div class="card">
-                    <img src="{img_path.name}" alt="{img_path.name}" 
+                    <img src="{image_source(record)}" alt="{img_path.name}" 
                          onerror="this.src='data:image/svg+xml,%3Csvg xmlns=%22http://www.w3.org/2000/svg%22 width=%22100%22 height=%22100%22%3E%3Crect fill=%22%23ddd%22 width=%22100%22 height=%22100%22/%3E%3Ctext x=%2250%25%22 y=%2250%25%22 text-anchor=%22middle%22 dy=%22.3em%22%3EImagem%3C/text%3E%3C/svg%3E'">
                     <div class="card-title">{img_path.name}</div>
                     <div class="card-info">
                         <strong>Dimensões:</strong> {dimensions}<br>
                         <strong>Tamanho:</strong> {file_size:.1f} KB<br>
-                        <strong>Formato:</strong> {img_path.suffix.upper()[1:]}
+                        <strong>Formato:</strong> {img_path.suffix.upper()[1:]}{origin}
                     </div>
                 </div>
 """
@@ -462,11 +483,48 @@ def generate_mapping_guide():
 </body>
 </html>
 """
+    return html_content
+
+
+@pipeline_metrics.stage("guide")
+@profiling.traced(category="guide")
+def generate_mapping_guide():
+    """Gera o guia HTML interativo"""
+    
+    print("=" * 70)
+    print("🗺️  GERANDO GUIA DE MAPEAMENTO PDF → HTML")
+    print("=" * 70)
+    
+    # Coletar imagens extraídas (catálogo sincronizado com images/)
+    image_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.bmp']
+    with image_catalog.catalog_session() as catalog:
+        image_catalog.refresh(conn=catalog)
+        extracted_images = image_catalog.list_catalog(extensions=image_extensions, conn=catalog)
+    
+    if not extracted_images:
+        print("\n⚠️  Nenhuma imagem encontrada em:", IMAGES_DIR)
+        print("   Execute extract_pdf_images.py primeiro.")
+        return
+    
+    print(f"\n📁 Encontradas {len(extracted_images)} imagens extraídas")
+    
+    images_by_source = group_by_source(extracted_images)
+    print(f"📚 Organizadas por {len(images_by_source)} fontes")
+    
+    # Imagens que as páginas do site realmente usam
+    reference_graph = html_references.load_reference_graph()
+    existing_names = {name for name in reference_graph["images"] if image_layout.path_for(name).exists()}
+    html_content = render_guide(extracted_images, reference_graph, existing_names)
     
     # Salvar arquivo
     with open(OUTPUT_HTML, 'w', encoding='utf-8') as f:
         f.write(html_content)
     
+    metrics = pipeline_metrics.current()
+    metrics.count("processed", len(extracted_images))
+    metrics.add_bytes("in", sum(record["size_bytes"] or 0 for record in extracted_images))
+    metrics.add_bytes("out", OUTPUT_HTML.stat().st_size)
+    
     print(f"\n✅ Guia HTML gerado com sucesso!")
     print(f"📁 Local: {OUTPUT_HTML}")
     print(f"\n💡 Abra o arquivo no navegador para visualizar o guia interativo.")
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Execução Supervisionada (Tempo e Memória por Tarefa)
+Projeto: Origem das Aves em Theropoda
+
+Alguns PDFs têm páginas com conteúdo vetorial enorme ou streams de imagem
+corrompidos: `extract_image`/`get_pixmap` podem passar minutos nelas, e um
+try/except só pega erros, não travamentos. Aqui cada tarefa (uma página)
+roda num processo próprio, que pode ser morto:
+
+- limite de tempo: passado o prazo, o processo é encerrado (kill);
+- limite de memória: espaço de endereçamento do processo limitado com
+  setrlimit (onde houver `resource`; no Windows vale só o tempo);
+- tentativas degradadas: ao falhar, a tarefa volta com as opções da
+  próxima tentativa (ex.: renderizar a figura em DPI menor em vez de
+  decodificar o stream inteiro);
+- quarentena: esgotadas as tentativas, a tarefa é registrada com o
+  motivo de cada falha (e o melhor resultado parcial, se houver).
+
+A função executada devolve (status, resultado), com status 'ok' ou
+'partial' (parte da tarefa falhou: tenta-se a próxima opção, mas o
+resultado fica guardado caso nenhuma faça melhor). A tentativa seguinte a
+um resultado parcial o recebe em opções['previous'], para refazer só o que
+falhou; o resultado que ela devolve substitui o anterior (a função junta
+os dois).
+"""
+
+import multiprocessing
+import os
+import time
+from collections import deque
+from multiprocessing.connection import wait
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# ================== CONFIGURAÇÃO ==================
+
+# Limites por tarefa (página)
+TASK_TIMEOUT_S = 120
+TASK_MEMORY_MB = 2048
+
+# Folga para a verificação dos prazos (segundos)
+POLL_INTERVAL_S = 0.5
+
+# ================== PROCESSO SUPERVISIONADO ==================
+
+def _address_space_bytes():
+    """Espaço de endereçamento atual do processo (Linux), ou 0"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def _limit_memory(memory_mb):
+    """Limita a memória que o processo pode alocar além da que já usa"""
+    if resource is None or not memory_mb:
+        return
+    limit = _address_space_bytes() + memory_mb * 1024 * 1024
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ValueError, OSError):
+        pass  # limite maior que o permitido: segue só com o prazo
+
+
+def _child(connection, func, args, options, memory_mb):
+    """Ponto de entrada do processo supervisionado"""
+    _limit_memory(memory_mb)
+    try:
+        status, result = func(*args, options)
+        message = (status, result, None)
+    except MemoryError:
+        message = ("memory", None, "MemoryError")
+    except Exception as e:
+        message = ("error", None, f"{type(e).__name__}: {e}")
+    try:
+        connection.send(message)
+    except MemoryError:
+        connection.send(("memory", None, "MemoryError"))
+    finally:
+        connection.close()
+
+
+def supervise(tasks, func, attempts, workers=1, timeout=TASK_TIMEOUT_S, memory_mb=TASK_MEMORY_MB,
+              on_done=None):
+    """
+    Executa tarefas em processos supervisionados, com tentativas degradadas.
+
+    Args:
+        tasks (list): Pares (chave, args); na ordem de início (ex.: maior primeiro)
+        func (callable): Função de nível de módulo chamada como
+            func(*args, opções) no processo filho; devolve (status, resultado)
+        attempts (list): Opções de cada tentativa, da normal à mais degradada;
+            depois de um resultado parcial, a tentativa recebe também
+            'previous' (esse resultado)
+        workers (int): Processos simultâneos
+        timeout (float): Prazo por tentativa (segundos)
+        memory_mb (int): Memória extra permitida por tentativa (MB)
+        on_done (callable): Chamado no processo principal como
+            on_done(chave, resultado, relatório) quando a tarefa termina com
+            algum resultado (completo ou parcial)
+
+    Returns:
+        dict: {chave: relatório}, com 'status' ('ok', 'degraded' ou
+              'quarantined'), 'result' e 'attempts' (opções, desfecho,
+              erro e duração de cada tentativa)
+    """
+    context = multiprocessing.get_context()
+    queue = deque((key, args, 0) for key, args in tasks)
+    running = {}
+    reports = {key: {"status": None, "result": None, "attempts": []} for key, _ in tasks}
+
+    def finish(key, args, index, outcome, result, error, elapsed):
+        report = reports[key]
+        report["attempts"].append({
+            "options": attempts[index], "outcome": outcome,
+            "error": error, "elapsed_s": round(elapsed, 3),
+        })
+        if outcome in ("ok", "partial"):
+            report["result"] = result  # já inclui o resultado parcial anterior
+        if outcome == "ok":
+            report["status"] = "ok" if index == 0 else "degraded"
+        elif index + 1 < len(attempts):
+            queue.appendleft((key, args, index + 1))  # próxima tentativa logo em seguida
+            return
+        else:
+            report["status"] = "quarantined"
+        if on_done is not None and report["result"] is not None:
+            on_done(key, report["result"], report)
+
+    while queue or running:
+        while queue and len(running) < max(workers, 1):
+            key, args, index = queue.popleft()
+            options = attempts[index]
+            if reports[key]["result"] is not None:
+                options = dict(options, previous=reports[key]["result"])
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(
+                target=_child, args=(sender, func, args, options, memory_mb), daemon=True
+            )
+            process.start()
+            sender.close()
+            running[receiver] = (key, args, index, process, time.monotonic())
+
+        deadline = min(started for *_, started in running.values()) + timeout
+        wait(list(running), timeout=max(min(deadline - time.monotonic(), POLL_INTERVAL_S), 0))
+
+        now = time.monotonic()
+        for receiver in list(running):
+            key, args, index, process, started = running[receiver]
+            if receiver.poll():
+                try:
+                    outcome, result, error = receiver.recv()
+                except EOFError:  # morreu sem responder (ex.: OOM killer, segfault)
+                    process.join()
+                    outcome, result, error = "crashed", None, f"código de saída {process.exitcode}"
+            elif now - started > timeout:
+                process.kill()
+                outcome, result, error = "timeout", None, f"mais de {timeout:g}s"
+            else:
+                continue
+            process.join()
+            receiver.close()
+            del running[receiver]
+            finish(key, args, index, outcome, result, error, now - started)
+
+    return reports
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+API de Biblioteca das Etapas (Bytes na Entrada, Bytes na Saída)
+Projeto: Origem das Aves em Theropoda
+
+Os scripts das etapas são CLIs: criam pastas, perguntam com input() e
+relatam com print. Para usar o pipeline dentro de outro serviço, este
+módulo expõe as mesmas operações como funções puras, sem prompts, sem
+prints e sem tocar em images/:
+
+- `extract_pdf_bytes(dados)`: figuras de um PDF (e, opcionalmente, já
+  processadas com um preset);
+- `process_image_bytes(dados, preset)`: uma imagem processada;
+- `build_guide(registros)`: o HTML do guia de mapeamento.
+
+Os resultados são dicts com os bytes e os metadados. Os CLIs usam os mesmos
+núcleos (decode_figure/trim_figure/encode_figure em extract_pdf_images,
+prepare_loaded_image/apply_preset em process_images, render_guide em
+map_pdf_to_html), então os arquivos gravados por eles e os bytes
+devolvidos aqui são iguais.
+
+Recursos caros são reaproveitados entre chamadas no mesmo processo: as
+transformações de cor ICC → sRGB (_ICC_TRANSFORM_CACHE) e o grafo de
+referências do site (recarregado só quando as páginas mudam).
+
+Uso:
+    import pipeline_api
+    result = pipeline_api.extract_pdf_bytes(pdf_bytes, preset="reveal_slide", trim=True)
+    slide = pipeline_api.process_image_bytes(png_bytes, "thumbnail")
+    html = pipeline_api.build_guide(result["figures"])
+"""
+
+import io
+
+import fitz  # PyMuPDF
+
+import html_references
+from extract_pdf_images import MIN_HEIGHT, MIN_WIDTH, decode_figure, encode_figure, find_caption, trim_figure
+from map_pdf_to_html import render_guide
+from process_images import (
+    PROCESSING_PRESETS, TILED_PIXEL_THRESHOLD,
+    apply_preset, load_large_image, open_source_image, prepare_loaded_image
+)
+
+# ================== CONFIGURAÇÃO ==================
+
+# Extensão de arquivo de cada formato de saída dos presets
+FORMAT_EXTENSIONS = {"JPEG": "jpg", "PNG": "png"}
+
+# ================== PROCESSAMENTO ==================
+
+def _check_preset(preset):
+    if preset not in PROCESSING_PRESETS:
+        raise ValueError(f"Preset inválido: {preset} (use {', '.join(PROCESSING_PRESETS)})")
+
+
+def _encode_rendition(image, preset, enhance, crop, crop_mode, original_size, trim_info, tiled_info):
+    """Aplica o preset a uma imagem normalizada e devolve o resultado com os bytes"""
+    image, save_kwargs = apply_preset(image, preset, enhance, crop, crop_mode)
+    buffer = io.BytesIO()
+    image.save(buffer, **save_kwargs)
+    return {
+        "data": buffer.getvalue(),
+        "format": save_kwargs["format"],
+        "extension": FORMAT_EXTENSIONS[save_kwargs["format"]],
+        "preset": preset,
+        "original_size": original_size,
+        "new_size": image.size,
+        "enhanced": enhance,
+        "cropped": crop,
+        "crop_mode": crop_mode if crop else None,
+        "trim": trim_info,
+        "tiled": tiled_info,
+    }
+
+
+def process_image_bytes(data, preset="reveal_slide", enhance=False, crop=False, crop_mode="center",
+                        trim=False, memory_limit_mb=None):
+    """
+    Processa uma imagem (bytes de qualquer formato que o Pillow abra).
+
+    Args:
+        data (bytes): Arquivo da imagem
+        preset (str): Nome do preset de processamento
+        enhance (bool): Aplicar melhorias de qualidade
+        crop (bool): Aplicar recorte inteligente
+        crop_mode (str): Modo do recorte ('center', 'entropy' ou 'edges')
+        trim (bool): Remover margens brancas antes do redimensionamento
+        memory_limit_mb (int): Teto de memória do caminho em faixas
+            (fontes acima de TILED_PIXEL_THRESHOLD pixels); None usa
+            TILED_MEMORY_LIMIT_MB sem recusar decodificações inteiras
+
+    Returns:
+        dict: 'data' (bytes), 'format', 'extension', 'preset',
+              'original_size', 'new_size', 'trim', 'tiled'...
+
+    Raises:
+        ValueError: Preset ou modo de recorte inválido
+        PIL.UnidentifiedImageError: Bytes que não são uma imagem
+    """
+    _check_preset(preset)
+    source = io.BytesIO(data)
+    image = open_source_image(source)
+    original_size = image.size
+
+    if original_size[0] * original_size[1] <= TILED_PIXEL_THRESHOLD:
+        image.load()
+        image, trim_info = prepare_loaded_image(image, trim)
+        tiled_info = None
+    else:
+        # Digitalizações gigantes: reduzir em faixas sob o teto de memória
+        config = PROCESSING_PRESETS[preset]
+        image, trim_info, tiled_info = load_large_image(
+            image, source, config["max_width"], config["max_height"],
+            crop=crop, trim=trim, memory_limit_mb=memory_limit_mb
+        )
+    return _encode_rendition(image, preset, enhance, crop, crop_mode, original_size, trim_info, tiled_info)
+
+
+# ================== EXTRAÇÃO ==================
+
+def extract_pdf_bytes(data, min_width=MIN_WIDTH, min_height=MIN_HEIGHT, trim=False, output_prefix="image",
+                      preset=None, process_options=None, pages=None, render_dpi=None, source_label=None):
+    """
+    Extrai as figuras de um PDF em memória.
+
+    Args:
+        data (bytes): Arquivo PDF
+        min_width (int): Largura mínima para considerar a imagem
+        min_height (int): Altura mínima para considerar a imagem
+        trim (bool): Remover margens brancas das figuras
+        output_prefix (str): Prefixo dos nomes sugeridos (como na extração)
+        preset (str): Processar também cada figura com este preset
+        process_options (dict): Opções do processamento (enhance, crop,
+            crop_mode, trim)
+        pages (list): Só estas páginas (0-based); padrão: todas
+        render_dpi (int): Renderizar a área de cada figura neste DPI em vez
+            de decodificar o stream embutido
+        source_label (str): Origem gravada nos registros (ex.: "Uno &
+            Hirasawa (2023)"), usada pelo guia
+
+    Returns:
+        dict: 'page_count', 'figures' (registros no formato do catálogo,
+              com 'data' e, com preset, 'rendition'), 'skipped' (figuras
+              pequenas demais) e 'failed' ([{'page', 'image', 'error'}])
+    """
+    if preset is not None:
+        _check_preset(preset)
+    process_options = process_options or {}
+    figures, failed, skipped = [], [], 0
+
+    with fitz.open(stream=data, filetype="pdf") as document:
+        page_count = document.page_count
+        for page_num in range(page_count) if pages is None else pages:
+            page = document[page_num]
+            image_list = page.get_images(full=True)
+            text_blocks = page.get_text("blocks") if image_list else []
+
+            for img_index, img_info in enumerate(image_list):
+                try:
+                    pil_image, image_bytes, image_ext, (width, height) = decode_figure(
+                        document, page, img_info, render_dpi
+                    )
+                    if width < min_width or height < min_height:
+                        skipped += 1
+                        continue
+                    trim_info = None
+                    if trim:
+                        pil_image, image_ext, trim_info = trim_figure(pil_image, image_ext)
+                    figure_bytes = encode_figure(pil_image, image_bytes, image_ext)
+
+                    rendition = None
+                    if preset is not None:
+                        pil_image.load()
+                        image, rendition_trim = prepare_loaded_image(pil_image, process_options.get("trim", False))
+                        rendition = _encode_rendition(
+                            image, preset, process_options.get("enhance", False),
+                            process_options.get("crop", False), process_options.get("crop_mode", "center"),
+                            pil_image.size, rendition_trim, None
+                        )
+
+                    figures.append({
+                        "file": f"{output_prefix}_p{page_num + 1}_img{img_index + 1}.{image_ext}",
+                        "data": figure_bytes,
+                        "format": image_ext,
+                        "width": pil_image.size[0],
+                        "height": pil_image.size[1],
+                        "size_bytes": len(figure_bytes),
+                        "source_page": page_num + 1,
+                        "source_xref": img_info[0],
+                        "source_kind": "rendered" if render_dpi else "embedded",
+                        "source_label": source_label,
+                        "caption": find_caption(page, img_info[0], text_blocks),
+                        "trim": trim_info,
+                        "rendition": rendition,
+                    })
+                except Exception as e:
+                    failed.append({"page": page_num + 1, "image": img_index + 1,
+                                   "error": f"{type(e).__name__}: {e}"})
+
+    return {"page_count": page_count, "figures": figures, "skipped": skipped, "failed": failed}
+
+
+# ================== GUIA ==================
+
+def build_guide(records, reference_graph=None):
+    """
+    HTML do guia de mapeamento a partir de registros (do catálogo ou de
+    extract_pdf_bytes; registros com 'data' vão embutidos no HTML).
+
+    Args:
+        records (list): Registros das imagens
+        reference_graph (dict): Grafo de referências do site; padrão: o das
+            páginas do projeto (html_references.load_reference_graph)
+
+    Returns:
+        str: Documento HTML
+    """
+    if reference_graph is None:
+        reference_graph = html_references.load_reference_graph()
+    return render_guide(records, reference_graph)
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Métricas das Etapas para o Prometheus (textfile collector)
+Projeto: Origem das Aves em Theropoda
+
+Cada etapa (extração, guia, renomeação, processamento) exporta ao terminar
+contadores e histogramas num arquivo texto no formato do Prometheus, que o
+textfile collector do node_exporter lê de uma pasta:
+
+- theropoda_pipeline_images_total{stage, result}: processed/skipped/failed
+- theropoda_pipeline_bytes_total{stage, direction}: bytes lidos/gravados
+- theropoda_pipeline_decode_failures_total{stage}
+- theropoda_pipeline_image_duration_seconds{stage} (histograma por imagem)
+- theropoda_pipeline_runs_total{stage, status}
+- theropoda_pipeline_last_run_*{stage}: duração, horário, sucesso e pico de
+  memória (RSS) do processo inteiro até o fim da etapa (no workflow, as
+  etapas dividem o processo: o pico pode ser de uma etapa anterior)
+
+Contadores e histogramas são cumulativos entre execuções (o estado fica em
+.cache/metrics/state.json, atualizado sob um lock de arquivo para que CLIs
+e shards simultâneos na mesma máquina não percam contagens); o .prom é
+regravado de forma atômica. A pasta
+de saída pode ser trocada pela variável PROMETHEUS_TEXTFILE_DIR.
+
+Uso:
+    python pipeline_metrics.py    # imprimir o arquivo de métricas atual
+"""
+
+import contextlib
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# ================== CONFIGURAÇÃO ==================
+
+PROJECT_ROOT = Path(__file__).parent.parent
+STATE_FILE = PROJECT_ROOT / ".cache" / "metrics" / "state.json"
+STATE_LOCK_FILE = STATE_FILE.with_name("state.lock")
+METRICS_DIR = Path(os.environ.get("PROMETHEUS_TEXTFILE_DIR", PROJECT_ROOT / ".cache" / "metrics"))
+METRICS_FILE = METRICS_DIR / "theropoda_pipeline.prom"
+
+PREFIX = "theropoda_pipeline"
+
+# Limites (segundos) do histograma de latência por imagem
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+METRIC_HELP = {
+    "images_total": ("counter", "Imagens tratadas pela etapa, por resultado"),
+    "bytes_total": ("counter", "Bytes lidos (in) e gravados (out) pela etapa"),
+    "decode_failures_total": ("counter", "Imagens que não puderam ser decodificadas"),
+    "runs_total": ("counter", "Execuções da etapa, por status"),
+    "image_duration_seconds": ("histogram", "Tempo por imagem"),
+    "last_run_duration_seconds": ("gauge", "Duração da última execução"),
+    "last_run_timestamp_seconds": ("gauge", "Horário (Unix) do fim da última execução"),
+    "last_run_success": ("gauge", "1 se a última execução terminou sem exceção"),
+    "last_run_process_peak_rss_bytes": ("gauge", "Pico de memória residente do processo inteiro (desde o "
+                                                 "início, inclusive etapas anteriores) ao fim da etapa"),
+}
+
+# Escrita do estado (etapas paralelas do workflow rodam em threads; entre
+# processos, vale o lock de arquivo em STATE_LOCK_FILE)
+_STATE_LOCK = threading.Lock()
+_CURRENT = threading.local()
+
+# ================== COLETA ==================
+
+def process_peak_rss_bytes():
+    """
+    Pico de RSS do processo desde o início (None onde não há como medir).
+    Não é por etapa: etapas no mesmo processo veem o maior pico até ali.
+    """
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024  # Linux: KB
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss)
+    except ImportError:
+        return None
+
+
+class StageMetrics:
+    """Acumulador de uma execução de etapa"""
+
+    def __init__(self, stage):
+        self.stage = stage
+        self.started = time.time()
+        self.images = {}
+        self.bytes = {}
+        self.decode_failures = 0
+        self.latencies = []
+
+    def count(self, result, amount=1):
+        """Imagens por resultado ('processed', 'skipped' ou 'failed')"""
+        self.images[result] = self.images.get(result, 0) + amount
+
+    def add_bytes(self, direction, amount):
+        """Bytes lidos ('in') ou gravados ('out')"""
+        if amount:
+            self.bytes[direction] = self.bytes.get(direction, 0) + int(amount)
+
+    def decode_failure(self):
+        self.decode_failures += 1
+
+    def observe(self, seconds):
+        """Latência de uma imagem"""
+        self.latencies.append(seconds)
+
+    def merge(self, other):
+        """Soma o que outro acumulador coletou (ex.: num processo do pool)"""
+        for result, amount in other.images.items():
+            self.count(result, amount)
+        for direction, amount in other.bytes.items():
+            self.add_bytes(direction, amount)
+        self.decode_failures += other.decode_failures
+        self.latencies.extend(other.latencies)
+
+
+class _NullMetrics(StageMetrics):
+    """Usado fora de uma etapa instrumentada: descarta tudo"""
+
+    def __init__(self):
+        super().__init__(None)
+
+    def count(self, result, amount=1):
+        pass
+
+    def add_bytes(self, direction, amount):
+        pass
+
+    def decode_failure(self):
+        pass
+
+    def observe(self, seconds):
+        pass
+
+    def merge(self, other):
+        pass
+
+
+_NULL = _NullMetrics()
+
+
+def current():
+    """Métricas da etapa em execução nesta thread"""
+    return getattr(_CURRENT, "metrics", None) or _NULL
+
+
+def stage(name):
+    """
+    Decorador: a função passa a ser uma execução da etapa `name`.
+
+    Dentro dela, `pipeline_metrics.current()` devolve o acumulador; no fim
+    (com ou sem exceção) as métricas são gravadas. Chamadas aninhadas de
+    etapas instrumentadas contam só na mais externa.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if getattr(_CURRENT, "metrics", None) is not None:
+                return func(*args, **kwargs)
+            metrics = _CURRENT.metrics = StageMetrics(name)
+            success = False
+            try:
+                result = func(*args, **kwargs)
+                success = True
+                return result
+            finally:
+                _CURRENT.metrics = None
+                try:
+                    export(metrics, success)
+                except OSError as e:
+                    print(f"⚠️  Métricas não gravadas: {e}")
+        return wrapper
+    return decorator
+
+
+@contextlib.contextmanager
+def collecting(name):
+    """
+    Acumula as métricas do bloco sem exportar (em processos auxiliares; o
+    processo principal soma o resultado com StageMetrics.merge).
+
+    Yields:
+        StageMetrics: O acumulador
+    """
+    previous = getattr(_CURRENT, "metrics", None)
+    metrics = _CURRENT.metrics = StageMetrics(name)
+    try:
+        yield metrics
+    finally:
+        _CURRENT.metrics = previous
+
+
+# ================== EXPORTAÇÃO ==================
+
+def _series(metric, **labels):
+    label_text = ",".join(f'{key}="{value}"' for key, value in sorted(labels.items()))
+    return f"{PREFIX}_{metric}{{{label_text}}}"
+
+
+def _load_state():
+    try:
+        with open(STATE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"counters": {}, "histograms": {}, "gauges": {}}
+
+
+def _write_atomic(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+@contextlib.contextmanager
+def _state_lock():
+    """
+    Exclusão mútua na leitura-modificação-escrita do estado: entre threads
+    (_STATE_LOCK) e entre processos (flock; sem cross-process no Windows).
+    """
+    with _STATE_LOCK:
+        if fcntl is None:
+            yield
+            return
+        STATE_LOCK_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(STATE_LOCK_FILE, "a") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def export(metrics, success=True):
+    """Soma a execução ao estado acumulado e regrava o arquivo .prom"""
+    name = metrics.stage
+    with _state_lock():
+        state = _load_state()
+        counters = state["counters"]
+
+        def add(series, value):
+            counters[series] = counters.get(series, 0) + value
+
+        for result, amount in metrics.images.items():
+            add(_series("images_total", stage=name, result=result), amount)
+        for direction, amount in metrics.bytes.items():
+            add(_series("bytes_total", stage=name, direction=direction), amount)
+        add(_series("decode_failures_total", stage=name), metrics.decode_failures)
+        add(_series("runs_total", stage=name, status="success" if success else "failed"), 1)
+
+        if metrics.latencies:
+            histogram = state["histograms"].setdefault(
+                name, {"buckets": [0] * len(LATENCY_BUCKETS), "sum": 0.0, "count": 0}
+            )
+            for seconds in metrics.latencies:
+                for index, bound in enumerate(LATENCY_BUCKETS):
+                    if seconds <= bound:
+                        histogram["buckets"][index] += 1
+                histogram["sum"] += seconds
+                histogram["count"] += 1
+
+        gauges = state["gauges"]
+        finished = time.time()
+        gauges[_series("last_run_duration_seconds", stage=name)] = round(finished - metrics.started, 3)
+        gauges[_series("last_run_timestamp_seconds", stage=name)] = round(finished, 3)
+        gauges[_series("last_run_success", stage=name)] = 1 if success else 0
+        gauges.pop(_series("last_run_peak_rss_bytes", stage=name), None)  # nome antigo
+        rss = process_peak_rss_bytes()
+        if rss is not None:
+            gauges[_series("last_run_process_peak_rss_bytes", stage=name)] = rss
+
+        _write_atomic(STATE_FILE, json.dumps(state, indent=2))
+        _write_atomic(METRICS_FILE, render(state))
+
+
+def render(state):
+    """Texto no formato de exposição do Prometheus"""
+    by_metric = {}
+    for series, value in list(state["counters"].items()) + list(state["gauges"].items()):
+        metric = series[len(PREFIX) + 1:series.index("{")]
+        by_metric.setdefault(metric, []).append(f"{series} {value}")
+
+    for stage_name, histogram in sorted(state["histograms"].items()):
+        lines = by_metric.setdefault("image_duration_seconds", [])
+        for bound, count in zip(LATENCY_BUCKETS, histogram["buckets"]):
+            lines.append(f'{PREFIX}_image_duration_seconds_bucket{{le="{bound}",stage="{stage_name}"}} {count}')
+        lines.append(f'{PREFIX}_image_duration_seconds_bucket{{le="+Inf",stage="{stage_name}"}} {histogram["count"]}')
+        lines.append(f'{PREFIX}_image_duration_seconds_sum{{stage="{stage_name}"}} {round(histogram["sum"], 6)}')
+        lines.append(f'{PREFIX}_image_duration_seconds_count{{stage="{stage_name}"}} {histogram["count"]}')
+
+    output = []
+    for metric, (metric_type, help_text) in METRIC_HELP.items():
+        if metric not in by_metric:
+            continue
+        output.append(f"# HELP {PREFIX}_{metric} {help_text}")
+        output.append(f"# TYPE {PREFIX}_{metric} {metric_type}")
+        output.extend(sorted(by_metric[metric]) if metric_type != "histogram" else by_metric[metric])
+    return "\n".join(output) + "\n"
+
+
+if __name__ == "__main__":
+    if METRICS_FILE.exists():
+        print(METRICS_FILE.read_text(encoding="utf-8"), end="")
+    else:
+        print(f"⚠️  Nenhuma métrica gravada ainda ({METRICS_FILE})")
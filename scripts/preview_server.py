@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Servidor Local de Pré-visualização (Versões Processadas sob Demanda)
+Projeto: Origem das Aves em Theropoda
+
+Substitui o `python -m http.server` na revisão dos slides: serve o projeto
+como ele (index.html, docs/, images/...) e, além disso,
+
+    GET /<preset>/<imagem>[?trim=1&enhance=1&crop=entropy]
+
+devolve a imagem processada com o preset na hora, pelo mesmo núcleo do
+process_images.py (pipeline_api.process_image_bytes), sem rodar o
+processamento em lote antes. Mudou a imagem, o preset ou as opções, a
+próxima requisição já mostra o resultado novo.
+
+- cache em memória e em disco (.cache/renditions/), ambos LRU com limite
+  de bytes; a chave inclui tamanho/mtime do original, a configuração do
+  preset e as opções;
+- requisições simultâneas da mesma versão esperam um único processamento;
+- ETag com Cache-Control: no-cache: o navegador revalida sempre e recebe
+  304 sem corpo quando nada mudou (sem processar nem ler o cache);
+- /images/<nome> também funciona com images/ em subpastas (image_layout).
+
+Só a biblioteca padrão (asyncio); o processamento roda num pool de threads.
+
+Uso:
+    python preview_server.py [--port 8765] [--memory-mb 64] [--disk-mb 512] [--workers 4]
+    # http://127.0.0.1:8765/reveal_slide/cladogram_p3_img1.png
+    # http://127.0.0.1:8765/_stats   (acertos do cache, processamentos...)
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import mimetypes
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import image_layout
+import pipeline_api
+from process_images import CROP_MODES, PROCESSING_PRESETS
+
+# ================== CONFIGURAÇÃO ==================
+
+PROJECT_ROOT = Path(__file__).parent.parent
+CACHE_DIR = PROJECT_ROOT / ".cache" / "renditions"
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Limites dos caches (MB)
+MEMORY_CACHE_MB = 64
+DISK_CACHE_MB = 512
+
+# Conexões ociosas (keep-alive) e cabeçalho máximo de uma requisição
+IDLE_TIMEOUT_S = 15
+MAX_HEADER_BYTES = 16 * 1024
+
+# Muda quando o formato das versões muda (invalida o cache em disco)
+RENDITION_VERSION = 1
+
+STATUS_TEXT = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+               405: "Method Not Allowed", 500: "Internal Server Error"}
+
+# ================== CACHE ==================
+
+class MemoryLRU:
+    """LRU em memória limitado pelo total de bytes dos valores"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key, data, content_type):
+        if len(data) > self.max_bytes:
+            return  # maior que o cache inteiro: fica só no disco
+        if key in self.entries:
+            self.size -= len(self.entries.pop(key)[0])
+        self.entries[key] = (data, content_type)
+        self.size += len(data)
+        while self.size > self.max_bytes:
+            _, (evicted, _) = self.entries.popitem(last=False)
+            self.size -= len(evicted)
+
+
+class DiskLRU:
+    """
+    LRU em disco: um arquivo por versão (<chave>.<ext>); o mtime marca o
+    último uso. Usado pelas threads do pool (daí o lock).
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.files = OrderedDict()  # chave → (nome do arquivo, bytes), do mais antigo ao mais novo
+        self.size = 0
+        self.directory.mkdir(parents=True, exist_ok=True)
+        found = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    stat = entry.stat()
+                    found.append((stat.st_mtime_ns, entry.name, stat.st_size))
+        for _, name, size in sorted(found):
+            self.files[name.split(".")[0]] = (name, size)
+            self.size += size
+        self._evict()
+
+    def get(self, key):
+        """(bytes, extensão) de uma versão guardada, ou None"""
+        with self.lock:
+            entry = self.files.get(key)
+            if entry is None:
+                return None
+            self.files.move_to_end(key)
+        path = self.directory / entry[0]
+        try:
+            os.utime(path)
+            return path.read_bytes(), path.suffix
+        except FileNotFoundError:  # removido por fora
+            with self.lock:
+                if self.files.pop(key, None):
+                    self.size -= entry[1]
+            return None
+
+    def put(self, key, data, extension):
+        name = f"{key}.{extension}"
+        tmp_path = self.directory / f"{name}.{threading.get_ident()}.tmp"
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, self.directory / name)
+        with self.lock:
+            previous = self.files.pop(key, None)
+            if previous:
+                self.size -= previous[1]
+            self.files[key] = (name, len(data))
+            self.size += len(data)
+            self._evict()
+
+    def _evict(self):
+        while self.size > self.max_bytes and self.files:
+            _, (name, size) = self.files.popitem(last=False)
+            self.size -= size
+            (self.directory / name).unlink(missing_ok=True)
+
+
+class RenditionCache:
+    """
+    Memória → disco → processamento, com uma única execução por chave:
+    quem pede uma versão que já está sendo feita espera a mesma tarefa.
+    """
+
+    def __init__(self, memory_mb=MEMORY_CACHE_MB, disk_mb=DISK_CACHE_MB, workers=None,
+                 cache_dir=CACHE_DIR):
+        self.memory = MemoryLRU(memory_mb * 1024 * 1024)
+        self.disk = DiskLRU(cache_dir, disk_mb * 1024 * 1024)
+        self.executor = ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1)
+        self.pending = {}
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "renders": 0, "collapsed": 0,
+                      "not_modified": 0, "errors": 0}
+
+    async def get(self, key, render):
+        """
+        Args:
+            key (str): Chave da versão (ver rendition_key)
+            render (callable): Função sem argumentos, rodada no pool, que
+                devolve (bytes, extensão)
+
+        Returns:
+            tuple: (bytes, content-type)
+        """
+        cached = self.memory.get(key)
+        if cached is not None:
+            self.stats["memory_hits"] += 1
+            return cached
+
+        task = self.pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fill(key, render))
+            self.pending[key] = task
+            task.add_done_callback(lambda _: self.pending.pop(key, None))
+        else:
+            self.stats["collapsed"] += 1
+        # shield: um cliente que desiste não cancela a versão dos outros
+        return await asyncio.shield(task)
+
+    async def _fill(self, key, render):
+        loop = asyncio.get_running_loop()
+        data, extension, from_disk = await loop.run_in_executor(self.executor, self._load_or_render, key, render)
+        self.stats["disk_hits" if from_disk else "renders"] += 1
+        content_type = mimetypes.types_map.get(f".{extension.lstrip('.')}", "application/octet-stream")
+        self.memory.put(key, data, content_type)
+        return data, content_type
+
+    def _load_or_render(self, key, render):
+        stored = self.disk.get(key)
+        if stored is not None:
+            return stored[0], stored[1], True
+        data, extension = render()
+        self.disk.put(key, data, extension)
+        return data, extension, False
+
+
+# ================== VERSÕES ==================
+
+def parse_options(query):
+    """
+    Opções do processamento a partir da query string.
+
+    Returns:
+        dict: enhance, trim, crop e crop_mode (normalizados)
+
+    Raises:
+        ValueError: Modo de recorte inválido
+    """
+    params = {name: values[-1] for name, values in parse_qs(query).items()}
+
+    def flag(name):
+        return params.get(name, "0").lower() in ("1", "true", "s", "sim", "yes")
+
+    options = {"enhance": flag("enhance"), "trim": flag("trim"), "crop": False, "crop_mode": "center"}
+    crop = params.get("crop")
+    if crop and crop.lower() not in ("0", "false", "n", "nao", "não", "no"):
+        mode = "center" if crop.lower() in ("1", "true", "s", "sim", "yes") else crop.lower()
+        if mode not in CROP_MODES:
+            raise ValueError(f"Modo de recorte inválido: {crop} (use {', '.join(CROP_MODES)})")
+        options.update(crop=True, crop_mode=mode)
+    return options
+
+
+def rendition_key(name, stat, preset, options):
+    """Chave (e ETag) de uma versão: original, configuração do preset e opções"""
+    material = json.dumps([RENDITION_VERSION, name, stat.st_size, stat.st_mtime_ns, preset,
+                           PROCESSING_PRESETS[preset], options], sort_keys=True)
+    return hashlib.sha1(material.encode("utf-8")).hexdigest()
+
+
+def render_rendition(source, preset, options):
+    """Processa o original (no pool de threads)"""
+    result = pipeline_api.process_image_bytes(source.read_bytes(), preset, **options)
+    return result["data"], result["extension"]
+
+
+def valid_image_name(name):
+    return bool(name) and os.path.basename(name) == name and not name.startswith(".")
+
+
+# ================== HTTP ==================
+
+def _etag_matches(headers, etag):
+    candidates = headers.get("if-none-match", "")
+    return candidates.strip() == "*" or etag in [c.strip().removeprefix("W/") for c in candidates.split(",")]
+
+
+async def serve_rendition(cache, preset, name, query, headers):
+    if not valid_image_name(name):
+        return 400, {}, "nome de imagem inválido".encode("utf-8")
+    source = image_layout.path_for(name)
+    try:
+        stat = source.stat()
+        options = parse_options(query)
+    except FileNotFoundError:
+        return 404, {}, f"imagem não encontrada: {name}".encode("utf-8")
+    except ValueError as e:
+        return 400, {}, str(e).encode("utf-8")
+
+    key = rendition_key(name, stat, preset, options)
+    etag = f'"{key}"'
+    cache_headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(headers, etag):
+        cache.stats["not_modified"] += 1
+        return 304, cache_headers, b""
+    try:
+        data, content_type = await cache.get(key, lambda: render_rendition(source, preset, options))
+    except Exception as e:
+        cache.stats["errors"] += 1
+        return 500, {}, f"erro ao processar {name}: {type(e).__name__}: {e}".encode("utf-8")
+    return 200, {**cache_headers, "Content-Type": content_type}, data
+
+
+def _static_path(path):
+    """Arquivo do projeto para um caminho da URL (None se fora do projeto)"""
+    relative = path.lstrip("/")
+    parts = relative.split("/")
+    if len(parts) == 2 and parts[0] == "images" and valid_image_name(parts[1]):
+        return image_layout.path_for(parts[1])  # também em subpastas
+    target = (PROJECT_ROOT / relative).resolve()
+    root = PROJECT_ROOT.resolve()
+    if target != root and root not in target.parents:
+        return None
+    if target.is_dir():
+        target = target / "index.html"
+    return target
+
+
+async def serve_static(path, headers, executor):
+    target = _static_path(path)
+    try:
+        stat = target.stat() if target else None
+    except (FileNotFoundError, NotADirectoryError):
+        stat = None
+    if stat is None:
+        return 404, {}, "arquivo não encontrado".encode("utf-8")
+
+    etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+    cache_headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(headers, etag):
+        return 304, cache_headers, b""
+    data = await asyncio.get_running_loop().run_in_executor(executor, target.read_bytes)
+    content_type = mimetypes.guess_type(target.name)[0] or "application/octet-stream"
+    if content_type.startswith("text/") or content_type in ("application/javascript", "application/json"):
+        content_type += "; charset=utf-8"
+    return 200, {**cache_headers, "Content-Type": content_type}, data
+
+
+async def route(cache, method, target, headers):
+    """(status, cabeçalhos, corpo) de uma requisição"""
+    if method not in ("GET", "HEAD"):
+        return 405, {"Allow": "GET, HEAD"}, b""
+    url = urlsplit(target)
+    path = unquote(url.path)
+    parts = path.strip("/").split("/")
+
+    if path == "/_stats":
+        body = {**cache.stats, "memory_bytes": cache.memory.size, "disk_bytes": cache.disk.size,
+                "in_flight": len(cache.pending)}
+        return 200, {"Content-Type": "application/json", "Cache-Control": "no-store"}, \
+            json.dumps(body).encode("utf-8")
+    if len(parts) == 2 and parts[0] in PROCESSING_PRESETS:
+        return await serve_rendition(cache, parts[0], parts[1], url.query, headers)
+    return await serve_static(path, headers, cache.executor)
+
+
+def _response_head(status, headers, length, keep_alive):
+    lines = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}",
+             f"Date: {formatdate(usegmt=True)}",
+             f"Content-Length: {length}",
+             f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    if status >= 400:
+        headers = {"Content-Type": "text/plain; charset=utf-8", **headers}
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+def make_handler(cache, verbose=True):
+    """Handler de conexão para asyncio.start_server (HTTP/1.1 com keep-alive)"""
+
+    async def handle(reader, writer):
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), IDLE_TIMEOUT_S)
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError,
+                        ConnectionError):
+                    break
+                started = time.perf_counter()
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = request_line.split(" ")
+                except ValueError:
+                    writer.write(_response_head(400, {}, 0, False))
+                    break
+                headers = {}
+                for line in header_lines:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+
+                try:
+                    status, response_headers, body = await route(cache, method, target, headers)
+                except Exception as e:
+                    status, response_headers, body = 500, {}, f"{type(e).__name__}: {e}".encode("utf-8")
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                writer.write(_response_head(status, response_headers, len(body), keep_alive))
+                if method != "HEAD":
+                    writer.write(body)
+                await writer.drain()
+                if verbose:
+                    print(f"   {status} {method} {target} ({(time.perf_counter() - started) * 1000:.0f} ms)")
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    return handle
+
+
+async def run_server(host=DEFAULT_HOST, port=DEFAULT_PORT, memory_mb=MEMORY_CACHE_MB, disk_mb=DISK_CACHE_MB,
+                     workers=None, verbose=True):
+    """Sobe o servidor e atende até ser interrompido"""
+    cache = RenditionCache(memory_mb, disk_mb, workers)
+    server = await asyncio.start_server(make_handler(cache, verbose), host, port, limit=MAX_HEADER_BYTES)
+    print("=" * 70)
+    print("🖥️  SERVIDOR DE PRÉ-VISUALIZAÇÃO")
+    print("=" * 70)
+    print(f"   Projeto:  http://{host}:{port}/")
+    print(f"   Versões:  http://{host}:{port}/<preset>/<imagem>  ({', '.join(PROCESSING_PRESETS)})")
+    print(f"   Cache:    {memory_mb} MB em memória, {disk_mb} MB em {CACHE_DIR}")
+    print("=" * 70)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        cache.executor.shutdown(wait=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor local de pré-visualização com versões sob demanda")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--memory-mb", type=int, default=MEMORY_CACHE_MB, help="Limite do cache em memória")
+    parser.add_argument("--disk-mb", type=int, default=DISK_CACHE_MB, help="Limite do cache em disco")
+    parser.add_argument("--workers", type=int, help="Threads de processamento (padrão: núcleos)")
+    parser.add_argument("--quiet", action="store_true", help="Não listar as requisições")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(run_server(args.host, args.port, args.memory_mb, args.disk_mb, args.workers,
+                               verbose=not args.quiet))
+    except KeyboardInterrupt:
+        print("\n👋 Servidor encerrado.")
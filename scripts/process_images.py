@@ -14,14 +14,38 @@ Requisitos:
     pip install Pillow
 
 Uso:
-    python process_images.py
+    python process_images.py            # menu interativo
+    python process_images.py --resume   # retomar um processamento interrompido
+    python process_images.py --profile  # medir cada passo (ver profiling.py)
+    python process_images.py --preset reveal_slide --shard 2/4   # parte 2 de 4, sem menu
 """
 
 from PIL import Image, ImageEnhance, ImageFilter
+import numpy as np
+import hashlib
+import io
+import math
 import os
+import time
+import warnings
+from contextlib import nullcontext
+
+try:
+    from PIL import ImageCms
+except ImportError:  # Pillow compilado sem LittleCMS
+    ImageCms = None
 from pathlib import Path
 import json
 
+import html_references
+import image_catalog
+import image_layout
+import pipeline_metrics
+import profiling
+import run_journal
+import sharding
+from project_status import list_images
+
 # ================== CONFIGURAÇÃO ==================
 
 PROJECT_ROOT = Path(__file__).parent.parent
@@ -29,10 +53,6 @@ IMAGES_DIR = PROJECT_ROOT / "images"
 PROCESSED_DIR = PROJECT_ROOT / "images" / "processed"
 BACKUP_DIR = PROJECT_ROOT / "images" / "backup"
 
-# Criar diretórios
-PROCESSED_DIR.mkdir(exist_ok=True, parents=True)
-BACKUP_DIR.mkdir(exist_ok=True, parents=True)
-
 # Configurações de processamento
 PROCESSING_PRESETS = {
     "reveal_slide": {
@@ -65,8 +85,44 @@ PROCESSING_PRESETS = {
     }
 }
 
+# Recorte por saliência: lado maior do proxy reduzido onde as janelas são
+# avaliadas, e número de níveis de cinza usados no histograma de entropia
+CROP_MODES = ("center", "entropy", "edges")
+SALIENCY_PROXY_SIZE = 256
+ENTROPY_BINS = 16
+
+# Remoção de margens: distância máxima do branco (0-255) ainda tratada como
+# fundo, fração mínima de pixels de conteúdo para uma linha/coluna contar
+# (ignora poeira/ruído de digitalização) e folga mantida ao redor da figura
+TRIM_TOLERANCE = 16
+TRIM_NOISE_FRACTION = 0.005
+TRIM_PADDING = 8
+
+# Processamento em faixas para digitalizações gigantes: acima do limiar de
+# pixels a imagem é reduzida faixa a faixa, sem cópias intermediárias do
+# tamanho original; o teto de memória limita a altura de cada faixa (e,
+# quando escolhido com --memory, recusa formatos decodificados inteiros que
+# passariam dele).
+# TILED_MAX_PIXELS substitui o limite anti "decompression bomb" do Pillow
+# apenas ao abrir as imagens que este script processa.
+TILED_PIXEL_THRESHOLD = 50_000_000
+TILED_MEMORY_LIMIT_MB = 256
+TILED_MAX_PIXELS = 4_000_000_000
+TILED_TRIM_PROXY_SIZE = 2048
+
+# Transformações ICC construídas uma única vez por perfil (e modos de
+# entrada/saída) e reaproveitadas por todo o lote; None = perfil já é sRGB
+_ICC_TRANSFORM_CACHE = {}
+
+# Bits por pixel dos rawmodes sem compressão lidos direto do arquivo
+RAW_BITS_PER_PIXEL = {
+    "1": 1, "L": 8, "P": 8, "LA": 16, "I;16": 16, "I;16B": 16,
+    "RGB": 24, "BGR": 24, "RGBA": 32, "RGBX": 32, "BGRA": 32, "BGRX": 32, "CMYK": 32,
+}
+
 # ================== FUNÇÕES DE PROCESSAMENTO ==================
 
+@profiling.traced(category="process")
 def resize_image(image, max_width, max_height, maintain_aspect=True):
     """
     Redimensiona uma imagem mantendo proporções.
@@ -89,18 +145,143 @@ def resize_image(image, max_width, max_height, maintain_aspect=True):
         return image.resize((max_width, max_height), Image.Resampling.LANCZOS)
 
 
-def smart_crop(image, target_width, target_height):
+def _crop_window_size(img_width, img_height, target_width, target_height):
+    """Maior janela com a proporção do alvo que cabe na imagem."""
+    aspect_ratio = target_width / target_height
+    img_aspect_ratio = img_width / img_height
+    
+    if img_aspect_ratio > aspect_ratio:
+        return int(img_height * aspect_ratio), img_height
+    return img_width, int(img_width / aspect_ratio)
+
+
+def _window_sums(profile, window):
+    """
+    Soma de todas as janelas de tamanho `window` ao longo do eixo 0.
+    
+    Como a janela de recorte ocupa sempre toda a extensão do eixo fixo, a
+    imagem integral se reduz a somas acumuladas do perfil por linha/coluna,
+    e cada janela custa O(1).
+    """
+    integral = np.zeros((profile.shape[0] + 1,) + profile.shape[1:], dtype=profile.dtype)
+    np.cumsum(profile, axis=0, out=integral[1:])
+    return integral[window:] - integral[:-window]
+
+
+def _saliency_scores(proxy, window, axis, mode):
+    """
+    Pontua cada posição da janela no proxy (entropia ou energia de bordas).
+    
+    Args:
+        proxy (PIL.Image): Cópia reduzida da imagem
+        window (int): Tamanho da janela no eixo livre (px do proxy)
+        axis (int): 1 desliza na horizontal, 0 na vertical
+        mode (str): 'entropy' ou 'edges'
+    
+    Returns:
+        numpy.ndarray: Pontuação por deslocamento ao longo do eixo livre
+    """
+    gray = np.asarray(proxy.convert("L"), dtype=np.int16)
+    if axis == 1:
+        gray = gray.T  # eixo livre sempre no eixo 0
+    
+    if mode == "edges":
+        # Magnitude do gradiente (diferenças finitas) como energia de bordas
+        energy = np.zeros(gray.shape, dtype=np.int64)
+        energy[1:] += np.abs(np.diff(gray, axis=0))
+        energy[:, 1:] += np.abs(np.diff(gray, axis=1))
+        return _window_sums(energy.sum(axis=1), window).astype(np.float64)
+    
+    # Entropia: histograma de cada linha do eixo livre, acumulado por janela
+    lines = gray.shape[0]
+    levels = (gray * ENTROPY_BINS) >> 8
+    keys = (np.arange(lines)[:, None] * ENTROPY_BINS + levels).ravel()
+    histograms = np.bincount(keys, minlength=lines * ENTROPY_BINS).reshape(lines, ENTROPY_BINS)
+    counts = _window_sums(histograms, window)
+    probabilities = counts / float(counts[0].sum())
+    with np.errstate(divide="ignore", invalid="ignore"):
+        terms = np.where(probabilities > 0, probabilities * np.log2(probabilities), 0.0)
+    return -terms.sum(axis=1)
+
+
+def find_salient_crop_box(image, target_width, target_height, mode="entropy"):
+    """
+    Escolhe a janela de recorte mais informativa usando um proxy reduzido.
+    
+    As janelas candidatas (maior janela com a proporção do alvo, deslizando
+    no eixo livre) são avaliadas com imagens integrais NumPy sobre uma cópia
+    de até SALIENCY_PROXY_SIZE px; a janela vencedora é reescalada para a
+    resolução original.
+    
+    Args:
+        image (PIL.Image): Imagem original
+        target_width (int): Largura desejada
+        target_height (int): Altura desejada
+        mode (str): 'entropy' ou 'edges'
+    
+    Returns:
+        tuple: Caixa (left, top, right, bottom) na resolução original
+    """
+    img_width, img_height = image.size
+    new_width, new_height = _crop_window_size(img_width, img_height, target_width, target_height)
+    axis = 1 if new_width < img_width else 0
+    free_span = (img_width - new_width) if axis == 1 else (img_height - new_height)
+    
+    if free_span <= 0:
+        return (0, 0, new_width, new_height)
+    
+    # Proxy reduzido: amostragem NEAREST para o dobro do tamanho (custo
+    # independente da resolução original) seguida de média 2x2 anti-serrilhado
+    scale = min(1.0, SALIENCY_PROXY_SIZE / max(img_width, img_height))
+    proxy = image
+    if scale < 1.0:
+        oversampled = (max(2, round(img_width * scale) * 2), max(2, round(img_height * scale) * 2))
+        proxy = image.resize(oversampled, Image.Resampling.NEAREST).reduce(2)
+    
+    if axis == 1:
+        window = min(proxy.size[0], max(1, round(new_width * proxy.size[0] / img_width)))
+    else:
+        window = min(proxy.size[1], max(1, round(new_height * proxy.size[1] / img_height)))
+    scores = _saliency_scores(proxy, window, axis, mode)
+    
+    # Em empate (ex.: fundo uniforme) prevalece a janela mais central
+    positions = np.arange(scores.shape[0])
+    center = (scores.shape[0] - 1) / 2.0
+    tie_break = np.abs(positions - center) * 1e-9
+    best = int(np.argmax(scores - tie_break))
+    
+    proxy_span = scores.shape[0] - 1
+    offset = round(best / proxy_span * free_span) if proxy_span > 0 else free_span // 2
+    offset = min(max(offset, 0), free_span)
+    
+    if axis == 1:
+        return (offset, 0, offset + new_width, new_height)
+    return (0, offset, new_width, offset + new_height)
+
+
+@profiling.traced(category="process")
+def smart_crop(image, target_width, target_height, mode="center"):
     """
-    Recorte inteligente focando no centro da imagem.
+    Recorte inteligente focando no centro ou na região mais informativa.
     
     Args:
         image (PIL.Image): Imagem original
         target_width (int): Largura desejada
         target_height (int): Altura desejada
+        mode (str): 'center' (centro geométrico), 'entropy' ou 'edges'
+            (janela escolhida por saliência, ver find_salient_crop_box)
     
     Returns:
         PIL.Image: Imagem recortada
     """
+    if mode not in CROP_MODES:
+        raise ValueError(f"Modo de recorte inválido: {mode} (use {', '.join(CROP_MODES)})")
+    
+    if mode != "center":
+        crop_box = find_salient_crop_box(image, target_width, target_height, mode=mode)
+        cropped = image.crop(crop_box)
+        return cropped.resize((target_width, target_height), Image.Resampling.LANCZOS)
+    
     img_width, img_height = image.size
     aspect_ratio = target_width / target_height
     img_aspect_ratio = img_width / img_height
@@ -120,6 +301,496 @@ def smart_crop(image, target_width, target_height):
     return cropped.resize((target_width, target_height), Image.Resampling.LANCZOS)
 
 
+def find_content_bbox(image, tolerance=TRIM_TOLERANCE, noise_fraction=TRIM_NOISE_FRACTION,
+                      padding=TRIM_PADDING):
+    """
+    Encontra a caixa do conteúdo de uma figura com margens brancas.
+    
+    Pixels quase brancos (ou transparentes) são fundo; linhas e colunas com
+    menos de `noise_fraction` pixels de conteúdo são tratadas como ruído.
+    
+    Args:
+        image (PIL.Image): Imagem em qualquer modo
+        tolerance (int): Distância máxima do branco considerada fundo
+        noise_fraction (float): Fração mínima de conteúdo por linha/coluna
+        padding (int): Folga mantida ao redor do conteúdo (px)
+    
+    Returns:
+        tuple: Caixa (left, top, right, bottom) ou None se a imagem for vazia
+    """
+    content = np.asarray(image.convert("L")) < (255 - tolerance)
+    
+    if image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info:
+        alpha = np.asarray(image.convert("RGBA").getchannel("A"))
+        content &= alpha > tolerance
+    
+    height, width = content.shape
+    rows = np.flatnonzero(content.sum(axis=1) > noise_fraction * width)
+    cols = np.flatnonzero(content.sum(axis=0) > noise_fraction * height)
+    
+    if rows.size == 0 or cols.size == 0:
+        return None
+    
+    return (
+        max(int(cols[0]) - padding, 0),
+        max(int(rows[0]) - padding, 0),
+        min(int(cols[-1]) + 1 + padding, width),
+        min(int(rows[-1]) + 1 + padding, height),
+    )
+
+
+@profiling.traced(category="process")
+def trim_margins(image, tolerance=TRIM_TOLERANCE, noise_fraction=TRIM_NOISE_FRACTION,
+                 padding=TRIM_PADDING):
+    """
+    Recorta as margens brancas de uma figura.
+    
+    Args:
+        image (PIL.Image): Imagem original
+        tolerance (int): Distância máxima do branco considerada fundo
+        noise_fraction (float): Fração mínima de conteúdo por linha/coluna
+        padding (int): Folga mantida ao redor do conteúdo (px)
+    
+    Returns:
+        tuple: (imagem recortada, dict com caixa, pixels e bytes removidos)
+    """
+    width, height = image.size
+    box = find_content_bbox(image, tolerance, noise_fraction, padding)
+    
+    if box is None or box == (0, 0, width, height):
+        return image, {"box": None, "pixels_removed": 0, "decoded_bytes_removed": 0}
+    
+    trimmed = image.crop(box)
+    pixels_removed = width * height - trimmed.size[0] * trimmed.size[1]
+    bytes_per_pixel = len(image.getbands()) * (2 if image.mode.startswith("I;16") else 1)
+    
+    return trimmed, {
+        "box": box,
+        "pixels_removed": pixels_removed,
+        "decoded_bytes_removed": pixels_removed * bytes_per_pixel,
+    }
+
+
+def _icc_transform(profile_key, build_profile, in_mode, out_mode):
+    """
+    Transformação ICC em cache para sRGB (None se a origem já for sRGB).
+    
+    Args:
+        profile_key (str): Identificador estável do perfil de origem
+        build_profile (callable): Cria o perfil de origem (só na 1ª vez)
+        in_mode (str): Modo da imagem de origem
+        out_mode (str): Modo de saída
+    """
+    key = (profile_key, in_mode, out_mode)
+    if key not in _ICC_TRANSFORM_CACHE:
+        source_profile = build_profile()
+        description = ImageCms.getProfileDescription(source_profile) or ""
+        if in_mode == out_mode and "sRGB" in description:
+            _ICC_TRANSFORM_CACHE[key] = None
+        else:
+            _ICC_TRANSFORM_CACHE[key] = ImageCms.buildTransform(
+                source_profile, ImageCms.createProfile("sRGB"), in_mode, out_mode
+            )
+    return _ICC_TRANSFORM_CACHE[key]
+
+
+def _apply_embedded_icc(image, out_mode):
+    """
+    Converte pelo perfil ICC embutido; devolve None se não houver/falhar.
+    
+    Tons de cinza (L → L) passam por uma tabela de 256 valores: o LittleCMS
+    não converte cinza para sRGB em L, então a rampa 0-255 vai por L → RGB
+    e a imagem continua em L.
+    """
+    icc_profile = image.info.get("icc_profile")
+    if not icc_profile or ImageCms is None:
+        return None
+    
+    gray = image.mode == "L" and out_mode == "L"
+    in_mode, transform_mode = image.mode, "RGB" if gray else out_mode
+    profile_key = hashlib.sha1(icc_profile).hexdigest()
+    try:
+        transform = _icc_transform(
+            profile_key, lambda: ImageCms.ImageCmsProfile(io.BytesIO(icc_profile)), in_mode, transform_mode
+        )
+    except (ImageCms.PyCMSError, OSError, ValueError):
+        _ICC_TRANSFORM_CACHE[(profile_key, in_mode, transform_mode)] = None
+        return None
+    
+    if transform is None:
+        converted = image
+    elif gray:
+        ramp = Image.frombytes("L", (256, 1), bytes(range(256)))
+        converted = image.point(list(transform.apply(ramp).getchannel(0).getdata()))
+        converted.info = dict(image.info)
+    else:
+        converted = transform.apply(image)
+    converted.info.pop("icc_profile", None)
+    return converted
+
+
+def _apply_palette_icc(image):
+    """
+    Converte a paleta de uma imagem P pelo perfil ICC embutido (só as 256
+    cores, não a imagem inteira).
+    """
+    if not image.info.get("icc_profile"):
+        return
+    palette = bytes(image.getpalette("RGB") or [])
+    swatches = Image.frombytes("RGB", (len(palette) // 3, 1), palette)
+    swatches.info["icc_profile"] = image.info["icc_profile"]
+    converted = _apply_embedded_icc(swatches, "RGB")
+    if converted is not None:
+        image.putpalette(converted.tobytes(), "RGB")
+        image.info.pop("icc_profile", None)
+
+
+def _flatten_alpha(image):
+    """Compõe uma imagem RGBA/LA sobre fundo branco (uma única cópia)."""
+    base_mode = "L" if image.mode == "LA" else "RGB"
+    background = Image.new(base_mode, image.size, 255 if base_mode == "L" else (255, 255, 255))
+    background.paste(image.convert(base_mode) if image.mode == "LA" else image, mask=image.getchannel("A"))
+    background.info = {key: value for key, value in image.info.items() if key != "transparency"}
+    return background
+
+
+def _flatten_palette(image):
+    """
+    Converte P para RGB compondo a transparência na própria paleta
+    (256 entradas), sem criar uma cópia RGBA da imagem inteira.
+    """
+    transparency = image.info.pop("transparency", None)
+    if transparency is not None:
+        palette = image.getpalette("RGB") or []
+        palette += [0] * (768 - len(palette))
+        if isinstance(transparency, int):
+            alphas = [255] * 256
+            alphas[transparency] = 0
+        else:
+            alphas = list(transparency) + [255] * (256 - len(transparency))
+        for index, alpha in enumerate(alphas):
+            for channel in range(3):
+                value = palette[index * 3 + channel]
+                palette[index * 3 + channel] = (value * alpha + 255 * (255 - alpha)) // 255
+        image.putpalette(palette, "RGB")
+    return image.convert("RGB")
+
+
+def _sixteen_bit_to_gray(image, value_max=None):
+    """
+    Reduz imagens de 16/32 bits ou float para L de 8 bits.
+    
+    A escala vem do modo, não do conteúdo: em 16 bits fica sempre o byte mais
+    significativo (uma digitalização escura continua escura, e todas as
+    faixas de uma imagem recebem a mesma escala). Inteiros de 32 bits e float
+    são escalados pelo máximo `value_max`, que no caminho em faixas é o da
+    imagem inteira; sem ele, usa-se o da própria imagem.
+    """
+    # 16 bits: o unpacker do Pillow fica com o byte mais significativo
+    if image.mode in ("I;16", "I;16L", "I;16B"):
+        rawmode = "L;16B" if image.mode == "I;16B" else "L;16"
+        return Image.frombytes("L", image.size, image.tobytes(), "raw", rawmode)
+    
+    values = np.asarray(image)
+    if image.mode.startswith("I;16"):
+        scaled = values >> 8
+    else:
+        high = image.getextrema()[1] if value_max is None else value_max
+        scaled = values * (255.0 / high) if high > 0 else np.zeros(values.shape)
+    return Image.fromarray(np.clip(scaled, 0, 255).astype(np.uint8), "L")
+
+
+@profiling.traced(category="process")
+def normalize_color_mode(image, value_max=None):
+    """
+    Normaliza o modo de cor para RGB (ou L, para tons de cinza).
+    
+    Um caminho por modo de origem: transparência é composta sobre branco
+    (em P, direto na paleta), cores com perfil ICC embutido passam pela
+    transformação para sRGB em cache (em P, só a paleta; com alfa, depois
+    de compor), LAB vai para sRGB, 16 bits são reduzidos para 8 e tons de
+    cinza continuam em L (1/3 dos bytes para redimensionar e codificar).
+    A imagem de entrada pode ser modificada (paleta e info).
+    
+    Args:
+        image (PIL.Image): Imagem em qualquer modo
+        value_max (float): Máximo da imagem inteira para modos I e F (quando
+            `image` é só uma faixa dela)
+    
+    Returns:
+        PIL.Image: Imagem em RGB ou L
+    """
+    mode = image.mode
+    
+    if mode in ("RGB", "CMYK"):
+        converted = _apply_embedded_icc(image, "RGB")
+        if converted is not None:
+            return converted
+        return image if mode == "RGB" else image.convert("RGB")
+    if mode == "L":
+        converted = _apply_embedded_icc(image, "L")
+        return image if converted is None else converted
+    if mode == "P":
+        _apply_palette_icc(image)
+        return _flatten_palette(image)
+    if mode in ("RGBA", "LA", "PA", "RGBa", "La"):
+        if mode not in ("RGBA", "LA"):
+            image = image.convert("LA" if mode == "La" else "RGBA")
+        flattened = _flatten_alpha(image)
+        converted = _apply_embedded_icc(flattened, flattened.mode)
+        return flattened if converted is None else converted
+    if mode == "1":
+        return image.convert("L")
+    if mode.startswith("I") or mode == "F":
+        return _sixteen_bit_to_gray(image, value_max)
+    if mode == "LAB" and ImageCms is not None:
+        transform = _icc_transform("LAB", lambda: ImageCms.createProfile("LAB"), "LAB", "RGB")
+        converted = transform.apply(image)
+        converted.info.pop("icc_profile", None)
+        return converted
+    
+    # RGBX, YCbCr, HSV...
+    return image.convert("RGB")
+
+
+@profiling.traced(category="process")
+def open_source_image(input_path):
+    """
+    Abre uma imagem sem decodificá-la, aceitando até TILED_MAX_PIXELS.
+    
+    O Pillow recusa imagens acima de ~179 MP (DecompressionBombError); as
+    digitalizações do projeto são confiáveis e seguem pelo caminho em faixas.
+    """
+    previous_limit = Image.MAX_IMAGE_PIXELS
+    Image.MAX_IMAGE_PIXELS = TILED_MAX_PIXELS
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", Image.DecompressionBombWarning)
+            return Image.open(input_path)
+    finally:
+        Image.MAX_IMAGE_PIXELS = previous_limit
+
+
+def _raw_strip_layout(image):
+    """
+    Layout (offset, stride, rawmode, orientação) de imagens sem compressão
+    (TIFF raw, BMP, PPM), ou None quando é preciso decodificar tudo.
+    """
+    if len(image.tile) != 1:
+        return None
+    
+    codec, extents, offset, args = image.tile[0][:4]
+    if codec != "raw" or tuple(extents) != (0, 0) + image.size:
+        return None
+    
+    rawmode, stride, orientation = (args, 0, 1) if isinstance(args, str) else (tuple(args) + (0, 1))[:3]
+    if rawmode not in RAW_BITS_PER_PIXEL:
+        return None
+    if not stride:
+        stride = (image.size[0] * RAW_BITS_PER_PIXEL[rawmode] + 7) // 8
+    
+    return offset, stride, rawmode, orientation
+
+
+def _decoded_bytes(image):
+    """Memória da imagem decodificada inteira pelo Pillow (RGB ocupa 4 bytes/pixel)"""
+    if image.mode in ("1", "L", "P"):
+        bytes_per_pixel = 1
+    elif image.mode.startswith("I;16"):
+        bytes_per_pixel = 2
+    else:
+        bytes_per_pixel = 4
+    return image.size[0] * image.size[1] * bytes_per_pixel
+
+
+def _check_full_decode(image, memory_limit_mb):
+    """
+    Confere o teto de memória de um formato sem leitura em faixas, que é
+    decodificado inteiro.
+    
+    Com teto escolhido (--memory), a imagem acima dele é recusada; sem ele,
+    é decodificada inteira mesmo assim (como antes do caminho em faixas),
+    com um aviso.
+    
+    Raises:
+        ValueError: A decodificação passaria do teto escolhido
+    """
+    limit = TILED_MEMORY_LIMIT_MB if memory_limit_mb is None else memory_limit_mb
+    needed_mb = _decoded_bytes(image) / (1024 * 1024)
+    if needed_mb <= limit:
+        return
+    message = (f"{image.format or 'imagem'} {image.size[0]}x{image.size[1]} só pode ser decodificada "
+               f"inteira (~{needed_mb:.0f} MB, teto de {limit} MB)")
+    if memory_limit_mb is not None:
+        raise ValueError(f"{message}: aumente o teto (--memory) ou converta para TIFF sem "
+                         f"compressão, lido em faixas")
+    print(f"   ⚠️  {message}; decodificando inteira mesmo assim")
+
+
+def _iter_strips(image, input_path, box, strip_rows):
+    """
+    Gera (y, faixa) cobrindo `box`, decodificando só a faixa quando possível.
+    
+    Imagens sem compressão são lidas faixa a faixa direto do arquivo; nos
+    demais formatos (PNG, TIFF comprimido...) a decodificação é completa (JPEG
+    já reduzido por draft) e apenas as conversões são feitas por faixa (o
+    teto de memória é conferido antes, em _check_full_decode).
+    """
+    left, top, right, bottom = box
+    width, height = image.size
+    layout = _raw_strip_layout(image)
+    
+    if layout is None:
+        image.load()
+        for y in range(top, bottom, strip_rows):
+            yield y, image.crop((left, y, right, min(y + strip_rows, bottom)))
+        return
+    
+    offset, stride, rawmode, orientation = layout
+    # `input_path` também pode ser um arquivo já aberto (ex.: io.BytesIO)
+    opened = open(input_path, "rb") if isinstance(input_path, (str, os.PathLike)) else nullcontext(input_path)
+    with opened as source:
+        for y in range(top, bottom, strip_rows):
+            rows = min(strip_rows, bottom - y)
+            # Arquivos "de baixo para cima" (BMP) guardam a última linha primeiro
+            first_row = y if orientation > 0 else height - y - rows
+            source.seek(offset + first_row * stride)
+            data = source.read(rows * stride)
+            strip = Image.frombuffer(image.mode, (width, rows), data, "raw", rawmode, stride, orientation)
+            for key in ("transparency", "icc_profile"):
+                if key in image.info:
+                    strip.info[key] = image.info[key]
+            if image.mode == "P":
+                strip.putpalette(image.getpalette())
+            yield y, strip if (left, right) == (0, width) else strip.crop((left, 0, right, rows))
+
+
+def _reduce_region(image, input_path, box, factor, memory_limit_mb):
+    """
+    Reduz `box` pelo fator inteiro `factor`, faixa a faixa, já normalizada
+    (RGB, ou L para tons de cinza).
+    
+    Returns:
+        tuple: (imagem reduzida, altura das faixas usadas)
+    
+    Raises:
+        ValueError: Ver _check_full_decode
+    """
+    left, top, right, bottom = box
+    region_width = right - left
+    if _raw_strip_layout(image) is None:
+        _check_full_decode(image, memory_limit_mb)
+    
+    # Cada linha da faixa pode existir em ~4 cópias de 4 bytes/pixel (bruta,
+    # decodificada, RGBA e RGB); as faixas são lidas na largura total
+    limit = TILED_MEMORY_LIMIT_MB if memory_limit_mb is None else memory_limit_mb
+    budget_rows = (limit * 1024 * 1024) // (image.size[0] * 16)
+    strip_rows = max(factor, budget_rows // factor * factor)
+    
+    reduced_size = (math.ceil(region_width / factor), math.ceil((bottom - top) / factor))
+    # Inteiros de 32 bits e float: uma só escala para todas as faixas
+    value_max = None
+    if image.mode in ("I", "F"):
+        value_max = max(strip.getextrema()[1]
+                        for _, strip in _iter_strips(image, input_path, box, strip_rows))
+    
+    reduced = None
+    for y, strip in _iter_strips(image, input_path, box, strip_rows):
+        strip = normalize_color_mode(strip, value_max)
+        if reduced is None:
+            reduced = Image.new(strip.mode, reduced_size, 255 if strip.mode == "L" else (255, 255, 255))
+        if factor > 1:
+            strip = strip.reduce(factor)
+        reduced.paste(strip, (0, (y - top) // factor))
+    
+    return reduced, strip_rows
+
+
+@profiling.traced(category="process")
+def load_large_image(image, input_path, max_width, max_height, crop=False, trim=False,
+                     memory_limit_mb=None):
+    """
+    Carrega uma imagem gigante já reduzida e normalizada, sem cópias do tamanho
+    original (caminho em faixas usado acima de TILED_PIXEL_THRESHOLD).
+    
+    Args:
+        image (PIL.Image): Imagem aberta (ainda não decodificada)
+        input_path (Path): Caminho do arquivo (para leitura por faixas)
+        max_width (int): Largura do preset
+        max_height (int): Altura do preset
+        crop (bool): Haverá recorte (reduz menos, para cobrir o alvo)
+        trim (bool): Remover margens brancas antes da redução final
+        memory_limit_mb (int): Teto de memória das faixas (TIFF raw, BMP,
+            PPM) e da imagem decodificada inteira (JPEG após o draft, PNG e
+            demais formatos); None usa TILED_MEMORY_LIMIT_MB e só avisa
+            quando uma decodificação inteira passa dele
+    
+    Returns:
+        tuple: (imagem reduzida, dict do recorte de margens ou None,
+                dict com detalhes do caminho em faixas)
+    
+    Raises:
+        ValueError: Formato sem leitura em faixas cuja decodificação
+            passaria do teto de memória escolhido
+    """
+    width, height = image.size
+    box = (0, 0, width, height)
+    decode = "raw_strips" if _raw_strip_layout(image) else "full"
+    trim_info = None
+    
+    if trim:
+        # Passada grosseira só para achar o conteúdo; a caixa volta à escala original
+        coarse = max(1, math.ceil(max(width, height) / TILED_TRIM_PROXY_SIZE))
+        proxy = open_source_image(input_path)
+        if decode == "full" and proxy.draft(proxy.mode, (width // coarse, height // coarse)) is not None:
+            proxy = normalize_color_mode(proxy)
+        else:
+            proxy, _ = _reduce_region(proxy, input_path, box, coarse, memory_limit_mb)
+        proxy_box = find_content_bbox(proxy)
+        if proxy_box is not None:
+            scale_x, scale_y = width / proxy.size[0], height / proxy.size[1]
+            box = (
+                max(math.floor((proxy_box[0] - 1) * scale_x), 0),
+                max(math.floor((proxy_box[1] - 1) * scale_y), 0),
+                min(math.ceil((proxy_box[2] + 1) * scale_x), width),
+                min(math.ceil((proxy_box[3] + 1) * scale_y), height),
+            )
+        pixels_removed = width * height - (box[2] - box[0]) * (box[3] - box[1])
+        trim_info = {
+            "box": box if pixels_removed else None,
+            "pixels_removed": pixels_removed,
+            "decoded_bytes_removed": pixels_removed * len(proxy.getbands()),
+        }
+    
+    # Redução necessária para a região caber (ou cobrir, com recorte) no preset
+    ratios = ((box[2] - box[0]) / max_width, (box[3] - box[1]) / max_height)
+    target_ratio = min(ratios) if crop else max(ratios)
+    
+    # JPEG: o decodificador reduz na DCT (1/2, 1/4, 1/8) e economiza memória
+    if decode == "full" and target_ratio >= 2:
+        requested = (math.ceil(width / target_ratio), math.ceil(height / target_ratio))
+        if image.draft(image.mode, requested) is not None:
+            decode = "jpeg_draft"
+            scale_x, scale_y = image.size[0] / width, image.size[1] / height
+            box = (
+                math.floor(box[0] * scale_x), math.floor(box[1] * scale_y),
+                math.ceil(box[2] * scale_x), math.ceil(box[3] * scale_y),
+            )
+            target_ratio *= min(scale_x, scale_y)
+    
+    factor = max(1, int(target_ratio))
+    reduced, strip_rows = _reduce_region(image, input_path, box, factor, memory_limit_mb)
+    
+    return reduced, trim_info, {
+        "decode": decode,
+        "decoded_size": image.size,
+        "reduce_factor": factor,
+        "strip_rows": strip_rows,
+        "memory_limit_mb": memory_limit_mb,
+    }
+
+
+@profiling.traced(category="process")
 def enhance_image(image, sharpness=1.2, contrast=1.1, brightness=1.0):
     """
     Aplica melhorias sutis na imagem.
@@ -151,7 +822,134 @@ def enhance_image(image, sharpness=1.2, contrast=1.1, brightness=1.0):
     return image
 
 
-def process_image(input_path, output_path, preset="reveal_slide", enhance=False, crop=False):
+def prepare_loaded_image(image, trim=False):
+    """
+    Normaliza uma imagem decodificada e, se pedido, remove as margens.
+    
+    Returns:
+        tuple: (imagem RGB/L, dict do recorte de margens ou None)
+    """
+    # Normalizar modo de cor (RGB/L, ICC para sRGB, alfa sobre branco)
+    image = normalize_color_mode(image)
+    
+    # Remover margens brancas antes de redimensionar
+    trim_info = None
+    if trim:
+        image, trim_info = trim_margins(image)
+    return image, trim_info
+
+
+def apply_preset(image, preset, enhance=False, crop=False, crop_mode="center"):
+    """
+    Recorta/redimensiona e melhora uma imagem já normalizada, sem gravar nada.
+    
+    Returns:
+        tuple: (imagem final, argumentos de Image.save: 'format', 'quality'
+                e 'optimize')
+    """
+    # Obter configurações do preset
+    config = PROCESSING_PRESETS[preset]
+    
+    # Aplicar recorte inteligente se solicitado
+    if crop:
+        image = smart_crop(image, config["max_width"], config["max_height"], mode=crop_mode)
+    else:
+        # Apenas redimensionar mantendo proporções
+        image = resize_image(image, config["max_width"], config["max_height"])
+    
+    # Aplicar melhorias se solicitado
+    if enhance:
+        image = enhance_image(image, sharpness=1.2, contrast=1.1)
+    
+    save_kwargs = {"format": config["format"], "quality": config["quality"], "optimize": True}
+    if config["format"] == "PNG":
+        save_kwargs.pop("quality")  # PNG não usa quality
+    return image, save_kwargs
+
+
+def _apply_preset_and_save(image, source_name, output_path, preset, enhance, crop, crop_mode,
+                           original_size, original_file_size, trim_info=None, tiled_info=None,
+                           catalog=None):
+    """
+    Recorta/redimensiona, melhora e salva uma imagem já normalizada.
+    
+    `catalog` é a conexão do chamador com o catálogo, se ele já tiver uma
+    transação aberta (ex.: a extração fundida).
+    
+    Returns:
+        dict: Informações sobre o processamento
+    """
+    image, save_kwargs = apply_preset(image, preset, enhance, crop, crop_mode)
+    
+    # Salvar imagem processada (extensão de acordo com o formato do preset)
+    if save_kwargs["format"] == "JPEG":
+        if not str(output_path).lower().endswith(('.jpg', '.jpeg')):
+            output_path = _with_suffix(output_path, '.jpg')
+    elif save_kwargs["format"] == "PNG":
+        if not str(output_path).lower().endswith('.png'):
+            output_path = _with_suffix(output_path, '.png')
+    
+    output_path.parent.mkdir(exist_ok=True, parents=True)
+    with profiling.span("save", "process", format=save_kwargs["format"]):
+        image.save(output_path, **save_kwargs)
+    if PROCESSED_DIR in output_path.parents:
+        image_layout.register(output_path, "processed")
+    with profiling.span("record_rendition", "catalog"):
+        image_catalog.record_rendition(image_layout.path_for(source_name), preset, output_path, image.size,
+                                       conn=catalog)
+    
+    # Calcular estatísticas
+    new_file_size = output_path.stat().st_size / 1024  # KB
+    compression_ratio = (1 - new_file_size / original_file_size) * 100 if original_file_size > 0 else 0
+    
+    result = {
+        "status": "success",
+        "input": str(source_name),
+        "output": str(output_path.name),
+        "preset": preset,
+        "original_size": original_size,
+        "new_size": image.size,
+        "original_file_size_kb": round(original_file_size, 2),
+        "new_file_size_kb": round(new_file_size, 2),
+        "compression_ratio_percent": round(compression_ratio, 2),
+        "enhanced": enhance,
+        "cropped": crop,
+        "crop_mode": crop_mode if crop else None,
+        "trim": trim_info,
+        "tiled": tiled_info
+    }
+    
+    print(f"✅ {source_name}")
+    print(f"   {original_size[0]}x{original_size[1]} → {image.size[0]}x{image.size[1]}")
+    print(f"   {original_file_size:.1f}KB → {new_file_size:.1f}KB ({compression_ratio:.1f}% redução)")
+    if trim_info and trim_info["pixels_removed"]:
+        print(f"   ✂️  Margens removidas: {trim_info['pixels_removed']} px")
+    if tiled_info:
+        print(f"   🧩 Processada em faixas de {tiled_info['strip_rows']} linhas "
+              f"(redução {tiled_info['reduce_factor']}x, {tiled_info['decode']})")
+    
+    return result
+
+
+def _with_suffix(output_path, suffix):
+    """Troca a extensão; em processed/ o caminho é resolvido de novo (a subpasta depende do nome)"""
+    renamed = output_path.with_suffix(suffix)
+    if PROCESSED_DIR in output_path.parents:
+        return image_layout.path_for(renamed.name, "processed")
+    return renamed
+
+
+def _error_result(source_name, error, decode_error=False):
+    """Resultado de falha no formato do relatório"""
+    print(f"❌ Erro ao processar {source_name}: {error}")
+    result = {"status": "error", "input": str(source_name), "error": str(error)}
+    if decode_error:
+        result["decode_error"] = True
+    return result
+
+
+def process_image(input_path, output_path, preset="reveal_slide", enhance=False, crop=False,
+                  crop_mode="center", trim=False, memory_limit_mb=None):
     """
     Processa uma imagem com base no preset escolhido.
     
@@ -161,153 +959,243 @@ def process_image(input_path, output_path, preset="reveal_slide", enhance=False,
         preset (str): Nome do preset de processamento
         enhance (bool): Aplicar melhorias de qualidade
         crop (bool): Aplicar recorte inteligente
+        crop_mode (str): Modo do recorte ('center', 'entropy' ou 'edges')
+        trim (bool): Remover margens brancas antes do redimensionamento
+        memory_limit_mb (int): Teto de memória do caminho em faixas
+            (usado para fontes acima de TILED_PIXEL_THRESHOLD pixels)
     
     Returns:
         dict: Informações sobre o processamento
     """
     try:
-        # Carregar imagem
-        image = Image.open(input_path)
+        # Carregar imagem (só o cabeçalho; a decodificação vem depois)
+        image = open_source_image(input_path)
+    except Exception as e:
+        return _error_result(input_path.name, e, decode_error=True)
+    
+    try:
         original_size = image.size
-        original_format = image.format
         original_file_size = input_path.stat().st_size / 1024  # KB
         
-        # Converter para RGB se necessário (para salvar em JPEG)
-        if image.mode in ('RGBA', 'LA', 'P'):
-            # Criar fundo branco
-            background = Image.new('RGB', image.size, (255, 255, 255))
-            if image.mode == 'P':
-                image = image.convert('RGBA')
-            background.paste(image, mask=image.split()[-1] if image.mode == 'RGBA' else None)
-            image = background
-        elif image.mode != 'RGB':
-            image = image.convert('RGB')
+        if original_size[0] * original_size[1] <= TILED_PIXEL_THRESHOLD:
+            return process_loaded_image(
+                image, input_path.name, output_path, preset, enhance, crop, crop_mode, trim,
+                original_file_size=original_file_size
+            )
         
-        # Obter configurações do preset
+        # Digitalizações gigantes: reduzir em faixas sob o teto de memória
         config = PROCESSING_PRESETS[preset]
+        image, trim_info, tiled_info = load_large_image(
+            image, input_path, config["max_width"], config["max_height"],
+            crop=crop, trim=trim, memory_limit_mb=memory_limit_mb
+        )
+        return _apply_preset_and_save(
+            image, input_path.name, output_path, preset, enhance, crop, crop_mode,
+            original_size, original_file_size, trim_info, tiled_info
+        )
         
-        # Aplicar recorte inteligente se solicitado
-        if crop:
-            image = smart_crop(image, config["max_width"], config["max_height"])
-        else:
-            # Apenas redimensionar mantendo proporções
-            image = resize_image(image, config["max_width"], config["max_height"])
-        
-        # Aplicar melhorias se solicitado
-        if enhance:
-            image = enhance_image(image, sharpness=1.2, contrast=1.1)
-        
-        # Salvar imagem processada
-        save_kwargs = {"quality": config["quality"], "optimize": True}
-        
-        if config["format"] == "JPEG":
-            save_kwargs["format"] = "JPEG"
-            if not str(output_path).lower().endswith(('.jpg', '.jpeg')):
-                output_path = output_path.with_suffix('.jpg')
-        elif config["format"] == "PNG":
-            save_kwargs["format"] = "PNG"
-            save_kwargs.pop("quality")  # PNG não usa quality
-            if not str(output_path).lower().endswith('.png'):
-                output_path = output_path.with_suffix('.png')
-        
-        image.save(output_path, **save_kwargs)
-        
-        # Calcular estatísticas
-        new_file_size = output_path.stat().st_size / 1024  # KB
-        compression_ratio = (1 - new_file_size / original_file_size) * 100 if original_file_size > 0 else 0
-        
-        result = {
-            "status": "success",
-            "input": str(input_path.name),
-            "output": str(output_path.name),
-            "preset": preset,
-            "original_size": original_size,
-            "new_size": image.size,
-            "original_file_size_kb": round(original_file_size, 2),
-            "new_file_size_kb": round(new_file_size, 2),
-            "compression_ratio_percent": round(compression_ratio, 2),
-            "enhanced": enhance,
-            "cropped": crop
-        }
-        
-        print(f"✅ {input_path.name}")
-        print(f"   {original_size[0]}x{original_size[1]} → {image.size[0]}x{image.size[1]}")
-        print(f"   {original_file_size:.1f}KB → {new_file_size:.1f}KB ({compression_ratio:.1f}% redução)")
+    except Exception as e:
+        return _error_result(input_path.name, e)
+
+
+def process_loaded_image(image, source_name, output_path, preset="reveal_slide", enhance=False,
+                         crop=False, crop_mode="center", trim=False, original_file_size=None,
+                         catalog=None):
+    """
+    Processa uma imagem já decodificada (ex.: recém-extraída de um PDF),
+    sem ler nem gravar o original em disco.
+    
+    Args:
+        image (PIL.Image): Imagem decodificada
+        source_name (str): Nome usado no relatório
+        output_path (Path): Caminho de saída
+        preset (str): Nome do preset de processamento
+        enhance (bool): Aplicar melhorias de qualidade
+        crop (bool): Aplicar recorte inteligente
+        crop_mode (str): Modo do recorte ('center', 'entropy' ou 'edges')
+        trim (bool): Remover margens brancas antes do redimensionamento
+        original_file_size (float): Tamanho do original em KB (ex.: bytes
+            do stream no PDF), para a taxa de compressão
+        catalog (sqlite3.Connection): Conexão do catálogo já aberta pelo
+            chamador (evita disputar o lock de escrita com ela)
+    
+    Returns:
+        dict: Informações sobre o processamento
+    """
+    try:
+        # Decodificar explicitamente (o Pillow adia até o primeiro acesso)
+        with profiling.span("decode", "process"):
+            image.load()
+    except Exception as e:
+        return _error_result(source_name, e, decode_error=True)
+    
+    try:
+        original_size = image.size
+        image, trim_info = prepare_loaded_image(image, trim)
         
-        return result
+        return _apply_preset_and_save(
+            image, source_name, output_path, preset, enhance, crop, crop_mode,
+            original_size, original_file_size or 0, trim_info, catalog=catalog
+        )
         
     except Exception as e:
-        print(f"❌ Erro ao processar {input_path.name}: {e}")
-        return {
-            "status": "error",
-            "input": str(input_path.name),
-            "error": str(e)
-        }
+        return _error_result(source_name, e)
 
 
-def process_all_images(preset="reveal_slide", enhance=False, crop=False, backup=True):
+def record_result_metrics(metrics, result, bytes_in):
+    """Conta um resultado de processamento nas métricas da etapa"""
+    if result["status"] == "success":
+        metrics.count("processed")
+        metrics.add_bytes("in", bytes_in)
+        metrics.add_bytes("out", image_layout.path_for(result["output"], "processed").stat().st_size)
+    else:
+        metrics.count("failed")
+        if result.get("decode_error"):
+            metrics.decode_failure()
+
+
+def write_processing_report(preset, results, report_path=None):
+    """
+    Grava o relatório de processamento (processing_report.json).
+    
+    Args:
+        preset (str): Preset usado
+        results (list): Resultados de process_image/process_loaded_image
+        report_path (Path): Destino (padrão: raiz do projeto)
+    
+    Returns:
+        Path: Caminho do relatório
+    """
+    report_path = report_path or PROJECT_ROOT / "processing_report.json"
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            "preset": preset,
+            "total_images": len(results),
+            "successful": sum(1 for r in results if r["status"] == "success"),
+            "failed": sum(1 for r in results if r["status"] == "error"),
+            "trim_pixels_removed": sum((r.get("trim") or {}).get("pixels_removed", 0) for r in results),
+            "trim_decoded_bytes_removed": sum((r.get("trim") or {}).get("decoded_bytes_removed", 0) for r in results),
+            "results": results
+        }, f, indent=2, ensure_ascii=False)
+    return report_path
+
+
+@pipeline_metrics.stage("process")
+def process_all_images(preset="reveal_slide", enhance=False, crop=False, backup=True,
+                       crop_mode="center", trim=False, memory_limit_mb=None,
+                       confirm=True, only_referenced=True, resume=False, shard=None):
     """
     Processa todas as imagens da pasta images/
     
+    Cada resultado é gravado no diário .cache/checkpoints/processing.jsonl
+    assim que fica pronto; o relatório final é compactado a partir dele.
+    
     Args:
         preset (str): Preset de processamento
         enhance (bool): Aplicar melhorias
         crop (bool): Aplicar recorte
+        crop_mode (str): Modo do recorte ('center', 'entropy' ou 'edges')
         backup (bool): Criar backup antes de processar
+        memory_limit_mb (int): Teto de memória das imagens gigantes (ver
+            load_large_image; se escolhido, PNG e afins acima dele são
+            recusados)
+        only_referenced (bool): Processar só as imagens usadas pelas páginas
+            do site (grafo de html_references)
+        resume (bool): Retomar uma execução interrompida com os mesmos
+            parâmetros, pulando as imagens já processadas
+        shard (tuple): (i, N) para processar só as imagens desta parte; grava
+            um relatório parcial em shard_reports/ (ver sharding.py)
     """
     print("=" * 70)
     print("🎨 PROCESSAMENTO DE IMAGENS")
     print("=" * 70)
+    if shard:
+        print(f"Parte: {shard[0]}/{shard[1]}")
     print(f"Preset: {preset} - {PROCESSING_PRESETS[preset]['description']}")
     print(f"Melhorias: {'Sim' if enhance else 'Não'}")
-    print(f"Recorte: {'Sim' if crop else 'Não'}")
+    print(f"Recorte: {f'Sim ({crop_mode})' if crop else 'Não'}")
+    print(f"Remover margens: {'Sim' if trim else 'Não'}")
     print(f"Backup: {'Sim' if backup else 'Não'}")
     print("=" * 70)
     
     # Listar imagens
     image_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff']
-    images = [f for f in IMAGES_DIR.iterdir() 
-              if f.is_file() and f.suffix.lower() in image_extensions]
+    images = list_images(image_extensions)
     
-    if not images:
+    metrics = pipeline_metrics.current()
+    if only_referenced:
+        referenced = set(html_references.referenced_images())
+        unreferenced = [img for img in images if img.name not in referenced]
+        images = [img for img in images if img.name in referenced]
+        if unreferenced:
+            print(f"\n⏭️  {len(unreferenced)} imagens não usadas pelo site serão ignoradas.")
+            metrics.count("skipped", len(unreferenced))
+    
+    # Execução por partes: só as imagens cujo hash cai nesta parte
+    universe = [img.name for img in images]
+    if shard:
+        images = [img for img in images if sharding.in_shard(img.name, shard)]
+    
+    if not images and not shard:
         print("\n⚠️  Nenhuma imagem encontrada para processar.")
         return
     
     print(f"\n📁 Encontradas {len(images)} imagens para processar.\n")
     
     # Confirmar processamento
-    response = input("Continuar? (s/n): ").lower()
-    if response != 's':
-        print("Operação cancelada.")
-        return
+    if confirm:
+        response = input("Continuar? (s/n): ").lower()
+        if response != 's':
+            print("Operação cancelada.")
+            return
     
-    # Processar imagens
-    results = []
+    params = {"preset": preset, "enhance": enhance, "crop": crop, "crop_mode": crop_mode,
+              "trim": trim, "memory_limit_mb": memory_limit_mb, "only_referenced": only_referenced}
+    journal = run_journal.RunJournal(f"processing{sharding.shard_suffix(shard)}", params, resume=resume)
     
-    for img_path in images:
-        # Criar backup se solicitado
-        if backup:
-            backup_path = BACKUP_DIR / img_path.name
-            if not backup_path.exists():
-                import shutil
-                shutil.copy2(img_path, backup_path)
-        
-        # Processar imagem
-        output_path = PROCESSED_DIR / img_path.name
-        result = process_image(img_path, output_path, preset, enhance, crop)
-        results.append(result)
-        print()
-    
-    # Gerar relatório
-    report_path = PROJECT_ROOT / "processing_report.json"
-    with open(report_path, 'w', encoding='utf-8') as f:
-        json.dump({
-            "preset": preset,
-            "total_images": len(images),
-            "successful": sum(1 for r in results if r["status"] == "success"),
-            "failed": sum(1 for r in results if r["status"] == "error"),
-            "results": results
-        }, f, indent=2, ensure_ascii=False)
+    # Backup deduplicado (um snapshot por execução; sem copiar bytes repetidos).
+    # Ao retomar, o snapshot da execução interrompida já cobre as imagens.
+    backup = backup and not journal.resumed and bool(images)
+    if backup:
+        import backup_store
+        snapshot = backup_store.snapshot(images, label=f"process:{preset}")
+        stats = snapshot["stats"]
+        print(f"💾 Snapshot {snapshot['id']}: {stats['dedup']} já guardadas, "
+              f"{stats['reflink'] + stats['hardlink']} vinculadas, {stats['copy']} copiadas\n")
+    
+    # Processar imagens (cada resultado vai para o diário ao ficar pronto)
+    skipped = 0
+    with journal:
+        for img_path in images:
+            fingerprint = run_journal.file_fingerprint(img_path)
+            previous = journal.lookup(img_path.name, fingerprint)
+            if (previous and previous["status"] == "success"
+                    and image_layout.path_for(previous["output"], "processed").exists()):
+                skipped += 1
+                metrics.count("skipped")
+                continue
+            
+            output_path = image_layout.path_for(img_path.name, "processed")
+            started = time.perf_counter()
+            with profiling.span("process_image", "process", file=img_path.name):
+                result = process_image(img_path, output_path, preset, enhance, crop, crop_mode, trim,
+                                       memory_limit_mb)
+            metrics.observe(time.perf_counter() - started)
+            record_result_metrics(metrics, result, fingerprint[0])
+            journal.record(img_path.name, fingerprint, result)
+            print()
+    
+    if skipped:
+        print(f"⏩ {skipped} imagens já processadas (diário de checkpoints) foram puladas.\n")
+    
+    # Gerar relatório (compactado a partir do diário; por partes, só o parcial)
+    results = journal.results([img.name for img in images])
+    if shard:
+        report_path = sharding.write_partial(
+            "processing", shard, params, universe, {result["input"]: result for result in results}
+        )
+    else:
+        report_path = write_processing_report(preset, results)
     
     # Resumo
     successful = sum(1 for r in results if r["status"] == "success")
@@ -321,19 +1209,27 @@ def process_all_images(preset="reveal_slide", enhance=False, crop=False, backup=
     print(f"📉 Redução média de tamanho: {avg_reduction:.1f}%")
     print(f"📁 Imagens processadas salvas em: {PROCESSED_DIR}")
     if backup:
-        print(f"💾 Backups salvos em: {BACKUP_DIR}")
+        print(f"💾 Backups salvos em: {backup_store.STORE_DIR} (snapshot {snapshot['id']})")
     print(f"📄 Relatório detalhado: {report_path}")
     print("=" * 70)
 
 
+def ask_crop_mode():
+    """Pergunta o modo de recorte (padrão: centro geométrico)"""
+    mode = input("Modo de recorte (center/entropy/edges, padrão=center): ").strip().lower() or "center"
+    if mode not in CROP_MODES:
+        print("⚠️  Modo inválido, usando 'center'.")
+        mode = "center"
+    return mode
+
+
 def process_single_image_interactive():
     """Modo interativo para processar uma imagem específica"""
     print("\n🖼️  PROCESSAMENTO INDIVIDUAL")
     print("=" * 70)
     
     # Listar imagens
-    images = sorted([f for f in IMAGES_DIR.iterdir() 
-                     if f.is_file() and f.suffix.lower() in ['.jpg', '.jpeg', '.png', '.gif', '.bmp']])
+    images = list_images(['.jpg', '.jpeg', '.png', '.gif', '.bmp'])
     
     if not images:
         print("⚠️  Nenhuma imagem encontrada.")
@@ -369,12 +1265,13 @@ def process_single_image_interactive():
         # Opções adicionais
         enhance = input("\nAplicar melhorias de qualidade? (s/n): ").lower() == 's'
         crop = input("Aplicar recorte inteligente? (s/n): ").lower() == 's'
+        crop_mode = ask_crop_mode() if crop else "center"
         
         # Processar
-        output_path = PROCESSED_DIR / selected_image.name
+        output_path = image_layout.path_for(selected_image.name, "processed")
         print(f"\n🔄 Processando {selected_image.name}...\n")
         
-        result = process_image(selected_image, output_path, selected_preset, enhance, crop)
+        result = process_image(selected_image, output_path, selected_preset, enhance, crop, crop_mode)
         
         if result["status"] == "success":
             print(f"\n✅ Imagem processada com sucesso!")
@@ -410,7 +1307,9 @@ def main_menu():
         elif choice == '2':
             enhance = input("Aplicar melhorias? (s/n): ").lower() == 's'
             crop = input("Aplicar recorte? (s/n): ").lower() == 's'
-            process_all_images(preset="card_image", enhance=enhance, crop=crop, backup=True)
+            crop_mode = ask_crop_mode() if crop else "center"
+            process_all_images(preset="card_image", enhance=enhance, crop=crop, backup=True,
+                               crop_mode=crop_mode)
         elif choice == '3':
             process_single_image_interactive()
         elif choice == '4':
@@ -433,9 +1332,12 @@ def main_menu():
                 
                 enhance = input("Aplicar melhorias? (s/n): ").lower() == 's'
                 crop = input("Aplicar recorte? (s/n): ").lower() == 's'
+                crop_mode = ask_crop_mode() if crop else "center"
+                trim = input("Remover margens brancas? (s/n): ").lower() == 's'
                 backup = input("Criar backup? (s/n): ").lower() == 's'
                 
-                process_all_images(preset=preset, enhance=enhance, crop=crop, backup=backup)
+                process_all_images(preset=preset, enhance=enhance, crop=crop, backup=backup,
+                                   crop_mode=crop_mode, trim=trim)
             except Exception as e:
                 print(f"❌ Erro: {e}")
         elif choice == '0':
@@ -455,4 +1357,37 @@ if __name__ == "__main__":
         print(f"❌ Pasta de imagens não encontrada: {IMAGES_DIR}")
         exit(1)
     
-    main_menu()
+    import argparse
+    parser = argparse.ArgumentParser(description="Processamento de imagens")
+    parser.add_argument("--resume", action="store_true",
+                        help="Retomar o último processamento interrompido (mesmos parâmetros)")
+    parser.add_argument("--preset", choices=list(PROCESSING_PRESETS),
+                        help="Processar todas as imagens com o preset, sem o menu")
+    parser.add_argument("--enhance", action="store_true", help="Com --preset: aplicar melhorias")
+    parser.add_argument("--no-backup", action="store_true", help="Com --preset: não criar snapshot")
+    parser.add_argument("--memory", metavar="MB", type=int,
+                        help="Com --preset: teto de memória das imagens gigantes (padrão: "
+                             f"{TILED_MEMORY_LIMIT_MB}). TIFF sem compressão, BMP e PPM são lidos "
+                             "em faixas dentro dele; PNG, TIFF comprimido e JPEG (já reduzido) são "
+                             "decodificados inteiros e, com o teto informado, recusados se "
+                             "passarem dele (sem a opção, só um aviso)")
+    parser.add_argument("--shard", metavar="I/N", type=sharding.parse_shard,
+                        help="Processar só a parte I de N das imagens (ver sharding.py)")
+    profiling.add_arguments(parser)
+    args = parser.parse_args()
+    
+    with profiling.from_arguments(args, "process"):
+        if args.resume:
+            header, _ = run_journal.read_journal(f"processing{sharding.shard_suffix(args.shard)}")
+            if header is None:
+                print("⚠️  Nenhum processamento para retomar.")
+                exit(1)
+            process_all_images(**header["params"], backup=False, confirm=False, resume=True,
+                               shard=args.shard)
+        elif args.preset:
+            process_all_images(preset=args.preset, enhance=args.enhance, backup=not args.no_backup,
+                               memory_limit_mb=args.memory, confirm=False, shard=args.shard)
+        elif args.shard:
+            parser.error("--shard requer --preset ou --resume")
+        else:
+            main_menu()
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Instrumentação Opcional das Etapas (Spans, cProfile, tracemalloc)
+Projeto: Origem das Aves em Theropoda
+
+Mede quanto tempo cada parte das etapas gasta (abrir/decodificar, aparar,
+redimensionar, melhorar, gravar, catálogo...):
+
+- `span("nome")` (bloco `with`) e `@traced("nome")` (funções) registram
+  intervalos com thread, para ver também as etapas paralelas do workflow;
+- desligado (padrão), `span` devolve um contexto nulo compartilhado e
+  `traced` faz só uma verificação de flag: custo desprezível;
+- `profile_run(...)` liga a coleta, opcionalmente com cProfile e
+  tracemalloc, e no fim grava um trace no formato do Chrome
+  (chrome://tracing ou https://ui.perfetto.dev) e imprime uma tabela
+  resumida por span;
+- processos auxiliares (pool, page_watchdog) coletam cada tarefa com
+  `collecting(worker_settings())` e devolvem o resultado, que o processo
+  principal junta com `merge` (cada processo vira uma faixa no trace).
+
+Os resultados ficam em .cache/profile/.
+
+Uso (nos scripts das etapas):
+    python process_images.py --profile [--cprofile] [--tracemalloc]
+    python extract_pdf_images.py --profile
+    python workflow_dag.py --profile
+"""
+
+import contextlib
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+# ================== CONFIGURAÇÃO ==================
+
+PROJECT_ROOT = Path(__file__).parent.parent
+PROFILE_DIR = PROJECT_ROOT / ".cache" / "profile"
+
+# Linhas da tabela do cProfile e alocações do tracemalloc exibidas
+CPROFILE_TOP = 25
+TRACEMALLOC_TOP = 10
+
+# Estado da coleta (um único módulo-global: a verificação desligada é barata)
+_ENABLED = False
+_MEMORY = False
+_EVENTS = []
+_PROFILERS = []
+_WORKER_PEAKS = []
+_T0 = 0
+_NULL_SPAN = contextlib.nullcontext()
+
+# ================== SPANS ==================
+
+class _Span:
+    """Intervalo medido; vira um evento completo ('X') do Chrome trace"""
+
+    __slots__ = ("name", "category", "args", "start", "memory")
+
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        if _MEMORY:
+            self.memory = tracemalloc.get_traced_memory()[0]
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        args = self.args
+        if _MEMORY:
+            args = dict(args, alloc_kb=round((tracemalloc.get_traced_memory()[0] - self.memory) / 1024, 1))
+        if exc_type is not None:
+            args = dict(args, error=exc_type.__name__)
+        # list.append é atômico: spans de várias threads sem lock
+        _EVENTS.append({
+            "name": self.name, "cat": self.category, "ph": "X",
+            "ts": (self.start - _T0) / 1000, "dur": (end - self.start) / 1000,
+            "pid": os.getpid(), "tid": threading.get_ident(), "args": args,
+        })
+        return False
+
+
+def enabled():
+    return _ENABLED
+
+
+def span(name, category="stage", **args):
+    """
+    Mede um bloco `with`.
+
+    Args:
+        name (str): Nome do span (ex.: "resize_image")
+        category (str): Categoria no trace (ex.: "process", "extract")
+        **args: Detalhes exibidos no trace (ex.: file="x.jpg")
+    """
+    if not _ENABLED:
+        return _NULL_SPAN
+    return _Span(name, category, args)
+
+
+def traced(name=None, category="stage"):
+    """Decorador: mede cada chamada da função como um span"""
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _ENABLED:
+                return func(*args, **kwargs)
+            with _Span(span_name, category, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def profiled_call(func, *args, **kwargs):
+    """
+    Executa func com um cProfile próprio da thread atual (o cProfile só
+    enxerga a thread em que foi ligado). Sem coleta com cProfile, ou se o
+    interpretador não permitir um segundo perfilador, apenas chama func.
+    """
+    if not (_ENABLED and _PROFILERS):
+        return func(*args, **kwargs)
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:  # Python 3.12+: um perfilador por interpretador
+        return func(*args, **kwargs)
+    try:
+        return func(*args, **kwargs)
+    finally:
+        profiler.disable()
+        _PROFILERS.append(profiler)
+
+
+# ================== COLETA ==================
+
+def start(cprofile=False, memory=False):
+    """Liga a coleta (zera spans anteriores)"""
+    global _ENABLED, _MEMORY, _T0
+    _EVENTS.clear()
+    _PROFILERS.clear()
+    _WORKER_PEAKS.clear()
+    _T0 = time.perf_counter_ns()
+    _MEMORY = memory
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    if cprofile:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        _PROFILERS.append(profiler)
+    _ENABLED = True
+
+
+def stop():
+    """
+    Desliga a coleta.
+
+    Returns:
+        dict: 'events' (spans), 'profilers' (cProfile), 'memory'
+              (snapshot do tracemalloc ou None) e 'worker_peaks' (pico de
+              memória rastreada de cada tarefa em processo auxiliar)
+    """
+    global _ENABLED, _MEMORY
+    _ENABLED = False
+    if _PROFILERS:
+        _PROFILERS[0].disable()
+    memory_snapshot = None
+    if _MEMORY:
+        memory_snapshot = {"peak": tracemalloc.get_traced_memory()[1], "snapshot": tracemalloc.take_snapshot()}
+        tracemalloc.stop()
+    _MEMORY = False
+    return {"events": list(_EVENTS), "profilers": list(_PROFILERS), "memory": memory_snapshot,
+            "worker_peaks": list(_WORKER_PEAKS)}
+
+
+# ================== PROCESSOS AUXILIARES ==================
+
+class _ProfileStats:
+    """cProfile de outro processo, já convertido (aceito por pstats.Stats)"""
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+def worker_settings():
+    """Opções da coleta para repassar a processos auxiliares (None se desligada)"""
+    if not _ENABLED:
+        return None
+    return {"pid": os.getpid(), "t0": _T0, "cprofile": bool(_PROFILERS), "memory": _MEMORY}
+
+
+@contextlib.contextmanager
+def collecting(settings, name="worker_task"):
+    """
+    Coleta uma tarefa num processo auxiliar: spans (no mesmo relógio do
+    principal), cProfile e pico do tracemalloc. No próprio processo
+    principal (ou sem coleta) não faz nada: os spans já vão para _EVENTS.
+
+    Args:
+        settings (dict): worker_settings() do processo principal
+        name (str): Span que envolve a tarefa
+
+    Yields:
+        dict: Preenchido no fim com 'events', 'profile' e 'memory_peak',
+              para merge() no processo principal (vazio sem coleta)
+    """
+    captured = {}
+    if not settings or settings["pid"] == os.getpid():
+        yield captured
+        return
+
+    global _ENABLED, _MEMORY, _T0
+    previous = (_ENABLED, _MEMORY, _T0)
+    first_event = len(_EVENTS)  # com fork, a lista herdada tem os spans do principal
+    for inherited in _PROFILERS:
+        if isinstance(inherited, cProfile.Profile):
+            inherited.disable()  # cópia herdada no fork: o que ela mede é descartado
+    profiler = None
+    if settings["cprofile"]:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:  # Python 3.12+: um perfilador por interpretador
+            profiler = None
+    started_tracing = settings["memory"] and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    elif settings["memory"]:
+        tracemalloc.reset_peak()
+    _ENABLED, _MEMORY, _T0 = True, settings["memory"], settings["t0"]
+    try:
+        with _Span(name, "worker", {}):
+            yield captured
+    finally:
+        _ENABLED, _MEMORY, _T0 = previous
+        captured["events"] = _EVENTS[first_event:]
+        del _EVENTS[first_event:]
+        if profiler is not None:
+            profiler.disable()
+            profiler.create_stats()
+            captured["profile"] = _ProfileStats(profiler.stats)
+        if settings["memory"]:
+            captured["memory_peak"] = tracemalloc.get_traced_memory()[1]
+            if started_tracing:
+                tracemalloc.stop()
+
+
+def merge(captured):
+    """Junta ao processo principal o que collecting() coletou num processo auxiliar"""
+    if not (_ENABLED and captured):
+        return
+    _EVENTS.extend(captured["events"])
+    if captured.get("profile") is not None and _PROFILERS:
+        _PROFILERS.append(captured["profile"])
+    if captured.get("memory_peak") is not None:
+        _WORKER_PEAKS.append(captured["memory_peak"])
+
+
+# ================== RELATÓRIOS ==================
+
+def write_chrome_trace(events, path):
+    """Grava os spans no formato JSON do Chrome trace"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    thread_names = [
+        {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": thread.ident, "args": {"name": thread.name}}
+        for thread in threading.enumerate()
+    ]
+    # Uma faixa por processo (os auxiliares entram com merge)
+    process_names = [
+        {"name": "process_name", "ph": "M", "pid": pid,
+         "args": {"name": "principal" if pid == os.getpid() else f"auxiliar {pid}"}}
+        for pid in sorted({event["pid"] for event in events} | {os.getpid()})
+    ]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": process_names + thread_names + events, "displayTimeUnit": "ms"}, f)
+    return path
+
+
+def summarize(events):
+    """
+    Tabela por span: chamadas, tempo total/médio/máximo.
+
+    O tempo total inclui spans internos (um span de etapa contém os de
+    redimensionar, gravar...).
+
+    Returns:
+        list: dicts ordenados pelo tempo total
+    """
+    rows = {}
+    for event in events:
+        row = rows.setdefault((event["cat"], event["name"]),
+                              {"category": event["cat"], "name": event["name"],
+                               "count": 0, "total_ms": 0.0, "max_ms": 0.0})
+        duration = event["dur"] / 1000
+        row["count"] += 1
+        row["total_ms"] += duration
+        row["max_ms"] = max(row["max_ms"], duration)
+    for row in rows.values():
+        row["mean_ms"] = row["total_ms"] / row["count"]
+    return sorted(rows.values(), key=lambda row: -row["total_ms"])
+
+
+def print_summary(rows):
+    print("\n" + "=" * 70)
+    print("⏱️  PERFIL POR SPAN")
+    print("=" * 70)
+    print(f"{'span':<32}{'chamadas':>9}{'total ms':>11}{'média ms':>10}{'máx ms':>9}")
+    for row in rows:
+        name = f"{row['category']}:{row['name']}"[:31]
+        print(f"{name:<32}{row['count']:>9}{row['total_ms']:>11.1f}{row['mean_ms']:>10.2f}{row['max_ms']:>9.1f}")
+    print("=" * 70)
+
+
+@contextlib.contextmanager
+def profile_run(label, cprofile=False, memory=False, output_dir=PROFILE_DIR):
+    """
+    Coleta spans durante o bloco e grava os relatórios no fim.
+
+    Args:
+        label (str): Nome da execução (prefixo dos arquivos)
+        cprofile (bool): Também perfilar com cProfile (.prof + top funções)
+        memory (bool): Medir alocações com tracemalloc (por span e top linhas)
+        output_dir (Path): Pasta dos relatórios
+
+    Yields:
+        dict: Preenchido no fim com os caminhos gravados
+    """
+    outputs = {}
+    start(cprofile=cprofile, memory=memory)
+    try:
+        yield outputs
+    finally:
+        collected = stop()
+        stamp = time.strftime("%Y%m%d_%H%M%S")
+        output_dir = Path(output_dir)
+
+        outputs["trace"] = write_chrome_trace(collected["events"], output_dir / f"{label}_{stamp}.trace.json")
+        print_summary(summarize(collected["events"]))
+
+        if collected["profilers"]:
+            stats = pstats.Stats(collected["profilers"][0])
+            for profiler in collected["profilers"][1:]:
+                stats.add(profiler)
+            outputs["cprofile"] = output_dir / f"{label}_{stamp}.prof"
+            stats.dump_stats(outputs["cprofile"])
+            stream = io.StringIO()
+            stats.stream = stream
+            stats.sort_stats("cumulative").print_stats(CPROFILE_TOP)
+            print(stream.getvalue())
+
+        if collected["memory"]:
+            print(f"🧠 Pico de memória rastreada: {collected['memory']['peak'] / 1024 / 1024:.1f} MB")
+            for stat in collected["memory"]["snapshot"].statistics("lineno")[:TRACEMALLOC_TOP]:
+                print(f"   {stat}")
+        if collected["worker_peaks"]:
+            print(f"🧠 Pico por tarefa em processo auxiliar: {max(collected['worker_peaks']) / 1024 / 1024:.1f} MB "
+                  f"(maior de {len(collected['worker_peaks'])})")
+
+        print(f"\n📈 Trace do Chrome: {outputs['trace']}")
+        if "cprofile" in outputs:
+            print(f"📈 cProfile: {outputs['cprofile']} (ex.: python -m pstats)")
+
+
+def add_arguments(parser):
+    """Opções --profile/--cprofile/--tracemalloc comuns aos scripts"""
+    parser.add_argument("--profile", action="store_true",
+                        help=f"Medir spans e gravar um trace do Chrome em {PROFILE_DIR}")
+    parser.add_argument("--cprofile", action="store_true", help="Com --profile: incluir cProfile")
+    parser.add_argument("--tracemalloc", action="store_true", help="Com --profile: medir alocações")
+
+
+def from_arguments(args, label):
+    """Contexto de profile_run conforme as opções (nulo sem --profile)"""
+    if not args.profile:
+        return contextlib.nullcontext({})
+    return profile_run(label, cprofile=args.cprofile, memory=args.tracemalloc)
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Status do Projeto em Uma Única Varredura (com Cache)
+Projeto: Origem das Aves em Theropoda
+
+Reúne numa só passada de `os.scandir` (raiz do projeto + images/) tudo o
+que o status e as etapas precisam saber sobre arquivos: PDFs presentes,
+imagens extraídas, imagens exigidas pelo HTML e relatórios gerados.
+
+O resultado fica em cache (em memória e em .cache/status.json), indexado
+pelo mtime das duas pastas: criar, remover ou renomear um arquivo invalida
+o cache; reler o status sem mudanças custa apenas dois `stat`.
+
+Uso:
+    python project_status.py          # resumo legível
+    python project_status.py --json   # status para monitoramento
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import image_layout
+
+# ================== CONFIGURAÇÃO ==================
+
+PROJECT_ROOT = Path(__file__).parent.parent
+IMAGES_DIR = PROJECT_ROOT / "images"
+CACHE_DIR = PROJECT_ROOT / ".cache"
+STATUS_CACHE_FILE = CACHE_DIR / "status.json"
+
+# Número de PDFs científicos esperados na raiz do projeto
+EXPECTED_PDFS = 5
+
+# Extensões reconhecidas como imagem pelas etapas
+IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff']
+
+# Arquivos gerados pelas etapas (na raiz do projeto)
+REPORT_FILES = ["extraction_report.json", "processing_report.json", "image_mapping_guide.html"]
+
+# Snapshot da última varredura neste processo
+_SNAPSHOT = None
+
+# ================== VARREDURA ==================
+
+def _dir_mtime_ns(path):
+    """mtime da pasta (muda quando entradas são criadas/removidas/renomeadas)"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _cache_key():
+    # O índice do modo em subpastas muda a cada gravação (ver image_layout.py)
+    return [_dir_mtime_ns(PROJECT_ROOT), _dir_mtime_ns(IMAGES_DIR), _dir_mtime_ns(image_layout.index_file(IMAGES_DIR))]
+
+
+def _scan():
+    """Uma passada de scandir pela raiz e por images/"""
+    root_files = []
+    with os.scandir(PROJECT_ROOT) as entries:
+        for entry in entries:
+            if entry.is_file():
+                root_files.append(entry.name)
+
+    image_files = []
+    if image_layout.is_sharded(IMAGES_DIR):
+        image_files = [path.name for path in image_layout.list_paths(extensions=IMAGE_EXTENSIONS)]
+    elif IMAGES_DIR.exists():
+        with os.scandir(IMAGES_DIR) as entries:
+            for entry in entries:
+                if entry.is_file() and os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS:
+                    image_files.append(entry.name)
+
+    return {
+        "key": _cache_key(),
+        "scanned_at": time.time(),
+        "root_files": sorted(root_files),
+        "images": sorted(image_files),
+    }
+
+
+def get_snapshot(use_cache=True):
+    """
+    Snapshot dos arquivos do projeto, reaproveitado enquanto as pastas
+    não mudarem.
+
+    Args:
+        use_cache (bool): Reaproveitar a varredura anterior se válida
+
+    Returns:
+        dict: Snapshot (chaves 'root_files', 'images', 'cache')
+    """
+    global _SNAPSHOT
+    key = _cache_key()
+
+    if use_cache and _SNAPSHOT is not None and _SNAPSHOT["key"] == key:
+        return dict(_SNAPSHOT, cache="memory")
+
+    if use_cache and _SNAPSHOT is None:
+        try:
+            with open(STATUS_CACHE_FILE, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("key") == key:
+                _SNAPSHOT = cached
+                return dict(cached, cache="disk")
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+
+    _SNAPSHOT = _scan()
+    try:
+        # Gravado dentro de .cache/ para não alterar o mtime da raiz
+        # (escrita atômica: etapas paralelas podem varrer ao mesmo tempo)
+        CACHE_DIR.mkdir(exist_ok=True)
+        tmp_path = STATUS_CACHE_FILE.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(_SNAPSHOT, f)
+        tmp_path.replace(STATUS_CACHE_FILE)
+    except OSError:
+        pass
+
+    return dict(_SNAPSHOT, cache="miss")
+
+
+def list_images(extensions=None, use_cache=True):
+    """
+    Imagens principais de images/, a partir do snapshot.
+
+    Args:
+        extensions (list): Extensões aceitas (padrão: IMAGE_EXTENSIONS)
+        use_cache (bool): Reaproveitar a varredura anterior se válida
+
+    Returns:
+        list: Caminhos (Path) ordenados por nome
+    """
+    extensions = [ext.lower() for ext in (extensions or IMAGE_EXTENSIONS)]
+    snapshot = get_snapshot(use_cache)
+    return [image_layout.path_for(name) for name in snapshot["images"]
+            if os.path.splitext(name)[1].lower() in extensions]
+
+
+def required_images():
+    """Imagens exigidas pelo HTML (grafo de referências das páginas do site)"""
+    from html_references import referenced_images
+    return referenced_images()
+
+
+def project_status(use_cache=True):
+    """
+    Status do projeto em formato estruturado (serializável em JSON).
+
+    Returns:
+        dict: PDFs, imagens, imagens exigidas e relatórios
+    """
+    snapshot = get_snapshot(use_cache)
+    root_files = set(snapshot["root_files"])
+    images = set(snapshot["images"])
+    required = required_images()
+
+    return {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "cache": snapshot["cache"],
+        "pdfs": {
+            "found": sorted(name for name in root_files if name.lower().endswith(".pdf")),
+            "expected": EXPECTED_PDFS,
+        },
+        "images": {
+            "total": len(images),
+            "required_total": len(required),
+            "required_found": [name for name in required if name in images],
+            "required_missing": [name for name in required if name not in images],
+        },
+        "reports": {name: name in root_files for name in REPORT_FILES},
+    }
+
+
+def print_status(status):
+    """Exibe o status em formato legível"""
+    print("\n" + "=" * 80)
+    print("📊 STATUS DO PROJETO")
+    print("=" * 80)
+
+    pdfs = status["pdfs"]["found"]
+    print(f"\n📁 Estrutura do Projeto:")
+    print(f"   PDFs encontrados: {len(pdfs)}/{status['pdfs']['expected']}")
+    for pdf in pdfs[:5]:  # Limitar a 5
+        print(f"      • {pdf}")
+
+    images = status["images"]
+    print(f"\n🖼️  Imagens:")
+    print(f"   Total extraídas: {images['total']}")
+    print(f"   Necessárias no HTML: {len(images['required_found'])}/{images['required_total']}")
+
+    missing = images["required_missing"]
+    if missing:
+        print(f"\n   ⚠️  Faltando ({len(missing)}):")
+        for name in missing[:5]:  # Limitar a 5
+            print(f"      • {name}")
+
+    print(f"\n📄 Relatórios:")
+    for name, exists in status["reports"].items():
+        print(f"   {name}: {'✅' if exists else '❌'}")
+
+    print("\n" + "=" * 80)
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, str(Path(__file__).parent))
+    status = project_status()
+    if "--json" in sys.argv[1:]:
+        print(json.dumps(status, indent=2, ensure_ascii=False))
+    else:
+        print_status(status)
@@ -17,29 +17,21 @@ O script irá:
 """
 
 import os
-import shutil
 from pathlib import Path
 import json
 
+import batch_rename
+import html_references
+import image_catalog
+import image_layout
+import image_matcher
+import profiling
+
 # ================== CONFIGURAÇÃO ==================
 
 PROJECT_ROOT = Path(__file__).parent.parent
 IMAGES_DIR = PROJECT_ROOT / "images"
 
-# Nomes de imagens esperados pelo HTML (extraídos do index.html)
-HTML_IMAGE_NAMES = [
-    "intro_aves_dinos.jpg",
-    "respiracao_aves.png",
-    "cladograma_theropoda_aves.png",
-    "archosauria_skull.jpg",
-    "theropoda_overview.jpg",
-    "coelophysis.jpg",
-    "deinonychus.jpg",
-    "archaeopteryx.jpg",
-    "confuciusornis.jpg",
-    "neornithes_anatomy.jpg"
-]
-
 # Mapeamento sugerido baseado no conteúdo dos PDFs
 SUGGESTED_MAPPING = {
     # Imagens de cladogramas e filogenias
@@ -58,6 +50,7 @@ SUGGESTED_MAPPING = {
 
 # ================== FUNÇÕES ==================
 
+@profiling.traced(category="rename")
 def list_extracted_images():
     """Lista todas as imagens na pasta images/"""
     if not IMAGES_DIR.exists():
@@ -65,13 +58,9 @@ def list_extracted_images():
         return []
     
     image_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff']
-    images = []
-    
-    for file in IMAGES_DIR.iterdir():
-        if file.is_file() and file.suffix.lower() in image_extensions:
-            images.append(file)
-    
-    return sorted(images)
+    with image_catalog.catalog_session() as catalog:
+        image_catalog.refresh(conn=catalog)
+        return [record["file"] for record in image_catalog.list_catalog(extensions=image_extensions, conn=catalog)]
 
 
 def display_images_and_targets():
@@ -93,8 +82,8 @@ def display_images_and_targets():
     
     print("\n🎯 NOMES ESPERADOS NO HTML:")
     print("-" * 70)
-    for idx, name in enumerate(HTML_IMAGE_NAMES, 1):
-        exists = (IMAGES_DIR / name).exists()
+    for idx, name in enumerate(html_image_names(), 1):
+        exists = image_layout.path_for(name).exists()
         status = "✅" if exists else "❌"
         print(f"   {idx:2d}. {status} {name}")
     
@@ -103,29 +92,90 @@ def display_images_and_targets():
     return extracted
 
 
+def html_image_names():
+    """
+    Nomes de imagens esperados pelo HTML, lidos das páginas do site (ver
+    html_references.py). Consultado a cada uso, e não na importação: o grafo
+    em cache só é refeito quando alguma página muda, e o menu vê as páginas
+    editadas durante a sessão.
+    """
+    return html_references.referenced_images()
+
+
+def target_descriptions():
+    """Texto de cada alvo do HTML: nome, descrição/sugestão de fonte e palavras-chave"""
+    from map_pdf_to_html import HTML_IMAGES
+    
+    keywords = {}
+    for keyword, target_names in SUGGESTED_MAPPING.items():
+        for target in target_names:
+            keywords.setdefault(target, []).append(keyword)
+    
+    descriptions = {}
+    for target in html_image_names():
+        info = HTML_IMAGES.get(target, {})
+        descriptions[target] = " ".join(
+            [Path(target).stem, info.get("description", ""), info.get("suggested_source", "")]
+            + keywords.get(target, [])
+        )
+    return descriptions
+
+
+@profiling.traced(category="rename")
 def suggest_mappings(extracted_images):
-    """Sugere correspondências entre imagens extraídas e nomes do HTML"""
+    """
+    Sugere correspondências entre imagens extraídas e nomes do HTML
+    
+    Cada alvo ainda ausente recebe no máximo uma imagem (emparelhamento
+    ótimo pela pontuação de image_matcher); as demais candidatas aparecem
+    como alternativas.
+    
+    Returns:
+        dict: {alvo: [imagem atribuída, alternativas...]}
+    """
     print("\n💡 SUGESTÕES DE MAPEAMENTO")
     print("=" * 70)
     
-    suggestions = {}
+    # Nome, legenda e origem de cada imagem vêm do catálogo
+    extracted_names = {img.name for img in extracted_images}
+    records = {record["file"].name: record for record in image_catalog.list_catalog()}
     
+    descriptions = target_descriptions()
+    targets = {target: text for target, text in descriptions.items() if target not in extracted_names}
+    target_stems = {Path(target).stem for target in descriptions}
+    images = []
     for img in extracted_images:
-        img_name = img.stem.lower()  # Nome sem extensão
-        
-        # Buscar correspondências por palavras-chave
-        for keyword, target_names in SUGGESTED_MAPPING.items():
-            if keyword in img_name:
-                for target in target_names:
-                    if target not in suggestions:
-                        suggestions[target] = []
-                    suggestions[target].append(img.name)
+        if img.stem in target_stems:
+            continue  # já tem nome de alvo
+        record = records.get(img.name, {})
+        images.append({
+            "name": img.name,
+            "caption": record.get("caption"),
+            "source": " ".join(filter(None, [record.get("source_label"), record.get("source_pdf")])),
+        })
+    
+    matches = image_matcher.match_images(images, targets)
+    suggestions = {}
+    
+    for target_name, match in matches.items():
+        if match["assigned"]:
+            assigned_name = match["assigned"][0]
+            suggestions[target_name] = [assigned_name] + [
+                name for name, _ in match["ranked"] if name != assigned_name
+            ]
     
     if suggestions:
-        for target_name, source_images in suggestions.items():
+        for target_name, match in matches.items():
+            if not match["ranked"]:
+                continue
             print(f"\n📌 {target_name}:")
-            for src in source_images:
-                print(f"   ← {src}")
+            if match["assigned"]:
+                print(f"   ← {match['assigned'][0]} (pontuação {match['assigned'][1]})")
+            else:
+                print("   ⚠️  Sem candidata livre (todas atribuídas a outros alvos)")
+            for name, score in match["ranked"]:
+                if not match["assigned"] or name != match["assigned"][0]:
+                    print(f"      alternativa: {name} ({score})")
     else:
         print("   ⚠️  Nenhuma correspondência automática encontrada.")
         print("   Por favor, renomeie manualmente usando a função rename_image()")
@@ -135,17 +185,19 @@ def suggest_mappings(extracted_images):
     return suggestions
 
 
-def rename_image(old_name, new_name, backup=True):
+def rename_image(old_name, new_name, backup=True, overwrite=None):
     """
-    Renomeia uma imagem da pasta images/
+    Renomeia uma imagem da pasta images/ (lote de um arquivo, com diário)
     
     Args:
         old_name (str): Nome atual da imagem
         new_name (str): Novo nome desejado
-        backup (bool): Criar backup antes de renomear
+        backup (bool): Mantido por compatibilidade: o destino substituído
+            sempre é movido para a pasta do lote (images/backup/renames/)
+        overwrite (bool): Sobrescrever destino existente (None = perguntar)
     """
-    old_path = IMAGES_DIR / old_name
-    new_path = IMAGES_DIR / new_name
+    old_path = image_layout.path_for(old_name)
+    new_path = image_layout.path_for(new_name)
     
     if not old_path.exists():
         print(f"❌ Arquivo não encontrado: {old_name}")
@@ -153,26 +205,52 @@ def rename_image(old_name, new_name, backup=True):
     
     if new_path.exists():
         print(f"⚠️  Arquivo de destino já existe: {new_name}")
-        response = input("   Sobrescrever? (s/n): ").lower()
-        if response != 's':
+        if overwrite is None:
+            overwrite = input("   Sobrescrever? (s/n): ").lower() == 's'
+        if not overwrite:
             print("   Operação cancelada.")
             return False
     
     try:
-        if backup and new_path.exists():
-            backup_path = IMAGES_DIR / f"{new_path.stem}_backup{new_path.suffix}"
-            shutil.copy2(new_path, backup_path)
-            print(f"   💾 Backup criado: {backup_path.name}")
-        
-        shutil.move(str(old_path), str(new_path))
-        print(f"✅ Renomeado: {old_name} → {new_name}")
-        return True
+        plan = batch_rename.plan_renames({old_name: new_name}, overwrite=True)
+        for _, _, reason in plan["skipped"]:
+            print(f"❌ Erro ao renomear: {reason}")
+        return batch_rename.apply_plan(plan)["renamed"] > 0
         
     except Exception as e:
         print(f"❌ Erro ao renomear: {e}")
         return False
 
 
+def rename_batch(mapping, ask_overwrite=False):
+    """
+    Renomeia um lote inteiro de uma vez (planejado, com diário e reversível).
+    
+    Args:
+        mapping (dict|list): {nome_atual: novo_nome} ou lista de pares
+        ask_overwrite (bool): Perguntar uma única vez se destinos já
+            existentes devem ser substituídos (senão, são ignorados)
+    
+    Returns:
+        int: Número de imagens renomeadas
+    """
+    plan = batch_rename.plan_renames(mapping)
+    existing_targets = [item for item in plan["skipped"] if item[2] == "destino já existe"]
+    
+    if existing_targets and ask_overwrite:
+        print(f"\n⚠️  {len(existing_targets)} destino(s) já existem:")
+        for old_name, new_name, _ in existing_targets[:10]:
+            print(f"   • {new_name} ← {old_name}")
+        if input("Substituir todos (os atuais vão para o backup do lote)? (s/n): ").lower() == 's':
+            plan = batch_rename.plan_renames(mapping, overwrite=True)
+    
+    batch_rename.print_plan(plan)
+    result = batch_rename.apply_plan(plan)
+    if result["journal"]:
+        print(f"   📓 Diário: {result['journal']}")
+    return result["renamed"]
+
+
 def interactive_rename():
     """Modo interativo para renomear imagens"""
     print("\n🔄 MODO INTERATIVO DE RENOMEAÇÃO")
@@ -188,9 +266,11 @@ def interactive_rename():
     for idx, img in enumerate(extracted, 1):
         print(f"   {idx}. {img.name}")
     
+    # Mesma lista para a exibição e para os números digitados
+    html_names = html_image_names()
     print("\n🎯 Nomes esperados pelo HTML:")
-    for idx, name in enumerate(HTML_IMAGE_NAMES, 1):
-        exists = (IMAGES_DIR / name).exists()
+    for idx, name in enumerate(html_names, 1):
+        exists = image_layout.path_for(name).exists()
         status = "✅" if exists else "❌"
         print(f"   {idx}. {status} {name}")
     
@@ -220,21 +300,22 @@ def interactive_rename():
                 print(f"⚠️  Número de origem inválido (1-{len(extracted)})")
                 continue
             
-            if target_idx < 0 or target_idx >= len(HTML_IMAGE_NAMES):
-                print(f"⚠️  Número de destino inválido (1-{len(HTML_IMAGE_NAMES)})")
+            if target_idx < 0 or target_idx >= len(html_names):
+                print(f"⚠️  Número de destino inválido (1-{len(html_names)})")
                 continue
             
             old_name = extracted[source_idx].name
-            new_name = HTML_IMAGE_NAMES[target_idx]
+            new_name = html_names[target_idx]
             
             # Manter a extensão original se o novo nome não especificar
             if '.' not in new_name:
                 new_name += extracted[source_idx].suffix
             
-            rename_image(old_name, new_name)
-            
-            # Atualizar lista
-            extracted = list_extracted_images()
+            if rename_image(old_name, new_name):
+                # Atualizar lista sem reler a pasta
+                old_path = extracted[source_idx]
+                extracted = [img for img in extracted if img.name != new_name]
+                extracted[extracted.index(old_path)] = image_layout.path_for(new_name)
             
         except ValueError:
             print("⚠️  Por favor, digite números válidos.")
@@ -245,8 +326,14 @@ def interactive_rename():
             print(f"❌ Erro: {e}")
 
 
-def auto_rename_by_suggestions():
-    """Renomeia automaticamente baseado nas sugestões"""
+def auto_rename_by_suggestions(confirm=True):
+    """
+    Renomeia automaticamente baseado nas sugestões
+    
+    Args:
+        confirm (bool): Pedir confirmação; sem ela (modo não interativo)
+            destinos já existentes nunca são sobrescritos
+    """
     print("\n🤖 RENOMEAÇÃO AUTOMÁTICA")
     print("=" * 70)
     
@@ -257,14 +344,15 @@ def auto_rename_by_suggestions():
         print("⚠️  Nenhuma sugestão automática disponível.")
         return
     
-    print("\n⚠️  ATENÇÃO: Esta operação irá renomear arquivos automaticamente!")
-    response = input("Continuar? (s/n): ").lower()
-    
-    if response != 's':
-        print("Operação cancelada.")
-        return
+    if confirm:
+        print("\n⚠️  ATENÇÃO: Esta operação irá renomear arquivos automaticamente!")
+        response = input("Continuar? (s/n): ").lower()
+        
+        if response != 's':
+            print("Operação cancelada.")
+            return
     
-    renamed_count = 0
+    mapping = []
     
     for target_name, source_images in suggestions.items():
         # Usar apenas a primeira sugestão para cada alvo
@@ -272,17 +360,17 @@ def auto_rename_by_suggestions():
             old_name = source_images[0]
             
             # Manter a extensão da imagem de origem
-            old_path = IMAGES_DIR / old_name
-            if old_path.exists():
-                target_ext = Path(target_name).suffix
-                source_ext = old_path.suffix
-                
-                # Se o alvo não tem extensão ou é diferente, usar a da origem
-                if not target_ext or target_ext != source_ext:
-                    target_name = Path(target_name).stem + source_ext
-                
-                if rename_image(old_name, target_name, backup=True):
-                    renamed_count += 1
+            target_ext = Path(target_name).suffix
+            source_ext = Path(old_name).suffix
+            
+            # Se o alvo não tem extensão ou é diferente, usar a da origem
+            if not target_ext or target_ext != source_ext:
+                target_name = Path(target_name).stem + source_ext
+            
+            mapping.append((old_name, target_name))
+    
+    # Um único lote; sem confirmação, destinos existentes nunca são sobrescritos
+    renamed_count = rename_batch(mapping, ask_overwrite=confirm)
     
     print(f"\n✅ Total de imagens renomeadas: {renamed_count}")
     print("=" * 70)
@@ -305,7 +393,7 @@ def create_mapping_file():
         mapping_template["mappings"][img.name] = ""
     
     # Adicionar nomes esperados do HTML
-    mapping_template["html_targets"] = HTML_IMAGE_NAMES
+    mapping_template["html_targets"] = html_image_names()
     
     with open(mapping_file, 'w', encoding='utf-8') as f:
         json.dump(mapping_template, f, indent=2, ensure_ascii=False)
@@ -327,15 +415,14 @@ def apply_mapping_file():
         data = json.load(f)
     
     mappings = data.get("mappings", {})
-    renamed_count = 0
     
     print("\n🔄 Aplicando mapeamentos do arquivo JSON...")
     print("=" * 70)
     
-    for old_name, new_name in mappings.items():
-        if new_name and new_name.strip():
-            if rename_image(old_name, new_name):
-                renamed_count += 1
+    renamed_count = rename_batch(
+        {old_name: new_name for old_name, new_name in mappings.items() if new_name and new_name.strip()},
+        ask_overwrite=True
+    )
     
     print(f"\n✅ Total de imagens renomeadas: {renamed_count}")
     print("=" * 70)
@@ -355,6 +442,7 @@ def main_menu():
         print("4. Renomeação automática (baseada em sugestões)")
         print("5. Criar arquivo de mapeamento JSON")
         print("6. Aplicar mapeamentos do arquivo JSON")
+        print("7. Desfazer a última renomeação em lote")
         print("0. Sair")
         print("=" * 70)
         
@@ -373,6 +461,8 @@ def main_menu():
             create_mapping_file()
         elif choice == '6':
             apply_mapping_file()
+        elif choice == '7':
+            batch_rename.rollback_batch()
         elif choice == '0':
             print("\n✅ Encerrando. Até logo!")
             break
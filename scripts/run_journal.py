@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Diário de Execução (Checkpoints Retomáveis)
+Projeto: Origem das Aves em Theropoda
+
+Os lotes longos (processamento de imagens, extração dos PDFs) gravam cada
+resultado num diário JSONL (.cache/checkpoints/<nome>.jsonl) assim que ele
+fica pronto, em vez de juntar tudo na memória até o fim:
+
+- a primeira linha guarda os parâmetros da execução;
+- cada linha seguinte é {'key', 'fingerprint', 'result'} de uma unidade de
+  trabalho (uma imagem, uma página de PDF);
+- com resume=True, unidades já registradas com a mesma impressão digital
+  (tamanho/mtime da fonte) são puladas; sem resume, o diário recomeça;
+- o relatório final é compactado a partir do diário (a última linha de
+  cada chave vale), então um Ctrl-C na imagem 9.000 de 10.000 não perde o
+  que já foi feito.
+
+Uma última linha cortada pela queda do processo é simplesmente ignorada.
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+
+# ================== CONFIGURAÇÃO ==================
+
+PROJECT_ROOT = Path(__file__).parent.parent
+CHECKPOINT_DIR = PROJECT_ROOT / ".cache" / "checkpoints"
+
+# ================== DIÁRIO ==================
+
+def journal_path(name):
+    return CHECKPOINT_DIR / f"{name}.jsonl"
+
+
+def file_fingerprint(path):
+    """Impressão digital barata de uma fonte: [tamanho, mtime_ns]"""
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def read_journal(name):
+    """
+    Lê um diário.
+
+    Returns:
+        tuple: (cabeçalho ou None, {chave: entrada} na ordem de gravação)
+    """
+    header = None
+    entries = {}
+    try:
+        with open(journal_path(name), "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # linha incompleta (processo interrompido)
+                if "params" in record:
+                    header = record
+                elif "key" in record:
+                    entries.pop(record["key"], None)
+                    entries[record["key"]] = record
+    except FileNotFoundError:
+        pass
+    return header, entries
+
+
+def _ends_with_newline(path):
+    """O arquivo está vazio ou termina numa linha completa"""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() == 0:
+            return True
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+class RunJournal:
+    """
+    Diário de uma execução em lote.
+
+    Uso:
+        with RunJournal("processing", params, resume=True) as journal:
+            cached = journal.lookup(key, fingerprint)
+            ...
+            journal.record(key, fingerprint, result)
+        results = journal.results(keys)
+    """
+
+    def __init__(self, name, params, resume=False):
+        self.name = name
+        self.path = journal_path(name)
+        self.params = params
+        self.entries = {}
+        self.resumed = False
+
+        header, entries = read_journal(name) if resume else (None, {})
+        if header is not None and header["params"] == params:
+            self.entries = entries
+            self.resumed = True
+        elif header is not None:
+            print(f"⚠️  Parâmetros diferentes da execução interrompida; recomeçando ({name})")
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.resumed:
+            self._file = open(self.path, "a", encoding="utf-8")
+            if not _ends_with_newline(self.path):
+                # Última linha cortada pela interrupção: fecha a linha, senão o
+                # próximo registro seria colado ao fragmento e perdido na leitura
+                self._file.write("\n")
+        else:
+            self._file = open(self.path, "w", encoding="utf-8")
+            self._write({"params": params, "started_at": time.time()})
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def lookup(self, key, fingerprint=None):
+        """Resultado já registrado para a chave (None se mudou ou não existe)"""
+        entry = self.entries.get(key)
+        if entry is None or entry.get("fingerprint") != fingerprint:
+            return None
+        return entry["result"]
+
+    def record(self, key, fingerprint, result):
+        """Grava (e descarrega) o resultado de uma unidade de trabalho"""
+        entry = {"key": key, "fingerprint": fingerprint, "result": result}
+        self.entries.pop(key, None)
+        self.entries[key] = entry
+        self._write(entry)
+
+    def results(self, keys=None):
+        """
+        Resultados compactados (um por chave).
+
+        Args:
+            keys (list): Restringir e ordenar por estas chaves (padrão: todas,
+                na ordem de gravação)
+        """
+        if keys is None:
+            return [entry["result"] for entry in self.entries.values()]
+        return [self.entries[key]["result"] for key in keys if key in self.entries]
+
+    def close(self):
+        if not self._file.closed:
+            os.fsync(self._file.fileno())
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
@@ -13,25 +13,30 @@ Uso:
 
 import sys
 import os
+import importlib
 from pathlib import Path
 
 # Adicionar pasta scripts ao path
 SCRIPT_DIR = Path(__file__).parent
 sys.path.insert(0, str(SCRIPT_DIR))
 
-# Importar módulos dos scripts
-try:
-    import extract_pdf_images
-    import map_pdf_to_html
-    import rename_images
-    import process_images
-except ImportError as e:
-    print(f"❌ Erro ao importar módulos: {e}")
-    print("   Certifique-se de que todos os scripts estão na pasta 'scripts/'")
-    sys.exit(1)
-
 # ================== CONFIGURAÇÃO ==================
 
+def load_stage(module_name):
+    """
+    Importa o módulo de uma etapa só quando ela é executada.
+    
+    Os scripts das etapas carregam PyMuPDF/Pillow/NumPy; o menu e o status
+    do projeto não dependem deles e abrem sem esse custo.
+    """
+    try:
+        return importlib.import_module(module_name)
+    except ImportError as e:
+        print(f"❌ Erro ao importar módulos: {e}")
+        print("   Certifique-se de que todos os scripts estão na pasta 'scripts/'")
+        raise
+
+
 def print_banner():
     """Exibe banner de boas-vindas"""
     print("\n" + "=" * 80)
@@ -79,10 +84,11 @@ def workflow_completo():
    A) Workflow completo automatizado
    B) Workflow passo a passo (com confirmações)
    C) Etapas individuais
+   D) Workflow incremental (só o que mudou, sem perguntas)
     """)
     
     print("=" * 80)
-    choice = input("\nEscolha (A/B/C): ").upper().strip()
+    choice = input("\nEscolha (A/B/C/D): ").upper().strip()
     
     if choice == 'A':
         workflow_automatizado()
@@ -90,6 +96,8 @@ def workflow_completo():
         workflow_passo_a_passo()
     elif choice == 'C':
         menu_etapas_individuais()
+    elif choice == 'D':
+        workflow_incremental()
     else:
         print("⚠️  Opção inválida. Encerrando.")
 
@@ -109,7 +117,7 @@ def workflow_automatizado():
     # Etapa 1: Extração
     print_step(1, "EXTRAÇÃO DE IMAGENS", "Extraindo figuras dos PDFs científicos")
     try:
-        extract_pdf_images.process_all_pdfs()
+        load_stage("extract_pdf_images").process_all_pdfs()
         print("✅ Extração concluída!")
     except Exception as e:
         print(f"❌ Erro na extração: {e}")
@@ -118,7 +126,7 @@ def workflow_automatizado():
     # Etapa 2: Guia Visual
     print_step(2, "GUIA VISUAL", "Gerando guia de mapeamento HTML")
     try:
-        map_pdf_to_html.generate_mapping_guide()
+        load_stage("map_pdf_to_html").generate_mapping_guide()
         print("✅ Guia visual criado!")
     except Exception as e:
         print(f"❌ Erro ao gerar guia: {e}")
@@ -128,7 +136,7 @@ def workflow_automatizado():
     try:
         # Usar função de renomeação automática
         print("🔄 Aplicando renomeação automática...")
-        rename_images.auto_rename_by_suggestions()
+        load_stage("rename_images").auto_rename_by_suggestions()
         print("✅ Renomeação concluída!")
     except Exception as e:
         print(f"❌ Erro na renomeação: {e}")
@@ -137,7 +145,7 @@ def workflow_automatizado():
     print_step(4, "OTIMIZAÇÃO", "Processando imagens para web")
     try:
         print("🎨 Processando com preset 'reveal_slide'...")
-        process_images.process_all_images(
+        load_stage("process_images").process_all_images(
             preset="reveal_slide",
             enhance=True,
             crop=False,
@@ -159,6 +167,12 @@ def workflow_automatizado():
     print("=" * 80)
 
 
+def workflow_incremental(method="mtime", force=False):
+    """Workflow não interativo que pula etapas cujas entradas não mudaram"""
+    import workflow_dag
+    return workflow_dag.run_incremental(workflow_dag.build_stages(), method=method, force=force)
+
+
 def workflow_passo_a_passo():
     """Workflow com confirmações em cada etapa"""
     print("\n👣 MODO PASSO A PASSO")
@@ -168,7 +182,7 @@ def workflow_passo_a_passo():
     if confirm_step("Executar Etapa 1 - Extração de imagens dos PDFs?"):
         print_step(1, "EXTRAÇÃO DE IMAGENS", "Extraindo figuras dos PDFs científicos")
         try:
-            extract_pdf_images.process_all_pdfs()
+            load_stage("extract_pdf_images").process_all_pdfs()
             print("✅ Extração concluída!")
         except Exception as e:
             print(f"❌ Erro na extração: {e}")
@@ -180,7 +194,7 @@ def workflow_passo_a_passo():
     if confirm_step("Executar Etapa 2 - Gerar guia visual de mapeamento?"):
         print_step(2, "GUIA VISUAL", "Gerando guia de mapeamento HTML")
         try:
-            map_pdf_to_html.generate_mapping_guide()
+            load_stage("map_pdf_to_html").generate_mapping_guide()
             print("✅ Guia visual criado!")
             print("\n💡 Abra 'image_mapping_guide.html' no navegador antes de continuar.")
         except Exception as e:
@@ -199,12 +213,12 @@ def workflow_passo_a_passo():
         
         if rename_choice == '1':
             try:
-                rename_images.interactive_rename()
+                load_stage("rename_images").interactive_rename()
             except Exception as e:
                 print(f"❌ Erro na renomeação: {e}")
         elif rename_choice == '2':
             try:
-                rename_images.auto_rename_by_suggestions()
+                load_stage("rename_images").auto_rename_by_suggestions()
             except Exception as e:
                 print(f"❌ Erro na renomeação: {e}")
         else:
@@ -229,7 +243,7 @@ def workflow_passo_a_passo():
         crop = confirm_step("Aplicar recorte inteligente?")
         
         try:
-            process_images.process_all_images(
+            load_stage("process_images").process_all_images(
                 preset=selected_preset,
                 enhance=enhance,
                 crop=crop,
@@ -272,31 +286,31 @@ def menu_etapas_individuais():
         
         if choice == '1':
             try:
-                extract_pdf_images.process_all_pdfs()
+                load_stage("extract_pdf_images").process_all_pdfs()
             except Exception as e:
                 print(f"❌ Erro: {e}")
         
         elif choice == '2':
             try:
-                map_pdf_to_html.generate_mapping_guide()
+                load_stage("map_pdf_to_html").generate_mapping_guide()
             except Exception as e:
                 print(f"❌ Erro: {e}")
         
         elif choice == '3':
             try:
-                rename_images.interactive_rename()
+                load_stage("rename_images").interactive_rename()
             except Exception as e:
                 print(f"❌ Erro: {e}")
         
         elif choice == '4':
             try:
-                rename_images.auto_rename_by_suggestions()
+                load_stage("rename_images").auto_rename_by_suggestions()
             except Exception as e:
                 print(f"❌ Erro: {e}")
         
         elif choice == '5':
             try:
-                process_images.main_menu()
+                load_stage("process_images").main_menu()
             except Exception as e:
                 print(f"❌ Erro: {e}")
         
@@ -310,63 +324,44 @@ def menu_etapas_individuais():
             print("⚠️  Opção inválida.")
 
 
-def show_project_status():
-    """Exibe status atual do projeto"""
-    print("\n" + "=" * 80)
-    print("📊 STATUS DO PROJETO")
-    print("=" * 80)
-    
-    PROJECT_ROOT = Path(__file__).parent.parent
-    IMAGES_DIR = PROJECT_ROOT / "images"
-    
-    # Contar arquivos
-    pdfs = list(PROJECT_ROOT.glob("*.pdf"))
-    images = list(IMAGES_DIR.glob("*.*")) if IMAGES_DIR.exists() else []
-    image_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.bmp']
-    images = [img for img in images if img.suffix.lower() in image_extensions]
-    
-    # Verificar imagens necessárias
-    html_images_needed = [
-        "intro_aves_dinos.jpg", "respiracao_aves.png", "cladograma_theropoda_aves.png",
-        "archosauria_skull.jpg", "theropoda_overview.jpg", "coelophysis.jpg",
-        "deinonychus.jpg", "archaeopteryx.jpg", "confuciusornis.jpg", "neornithes_anatomy.jpg"
-    ]
-    
-    images_found = sum(1 for name in html_images_needed if (IMAGES_DIR / name).exists())
-    
-    # Verificar relatórios
-    extraction_report = PROJECT_ROOT / "extraction_report.json"
-    processing_report = PROJECT_ROOT / "processing_report.json"
-    mapping_guide = PROJECT_ROOT / "image_mapping_guide.html"
-    
-    # Exibir informações
-    print(f"\n📁 Estrutura do Projeto:")
-    print(f"   PDFs encontrados: {len(pdfs)}/5")
-    for pdf in pdfs[:5]:  # Limitar a 5
-        print(f"      • {pdf.name}")
-    
-    print(f"\n🖼️  Imagens:")
-    print(f"   Total extraídas: {len(images)}")
-    print(f"   Necessárias no HTML: {images_found}/10")
-    
-    missing = [name for name in html_images_needed if not (IMAGES_DIR / name).exists()]
-    if missing:
-        print(f"\n   ⚠️  Faltando ({len(missing)}):")
-        for name in missing[:5]:  # Limitar a 5
-            print(f"      • {name}")
-    
-    print(f"\n📄 Relatórios:")
-    print(f"   extraction_report.json: {'✅' if extraction_report.exists() else '❌'}")
-    print(f"   processing_report.json: {'✅' if processing_report.exists() else '❌'}")
-    print(f"   image_mapping_guide.html: {'✅' if mapping_guide.exists() else '❌'}")
-    
-    print("\n" + "=" * 80)
+def show_project_status(as_json=False):
+    """
+    Exibe status atual do projeto (varredura única, com cache)
+
+    Args:
+        as_json (bool): Imprimir o status em JSON (para monitoramento)
+    """
+    import json
+    project_status = load_stage("project_status")
+
+    status = project_status.project_status()
+    if as_json:
+        print(json.dumps(status, indent=2, ensure_ascii=False))
+    else:
+        project_status.print_status(status)
 
 
 # ================== EXECUÇÃO ==================
 
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Workflow de extração de imagens")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Executar só as etapas desatualizadas, sem perguntas")
+    parser.add_argument("--hash", action="store_true", help="Detectar mudanças pelo conteúdo")
+    parser.add_argument("--force", action="store_true", help="Executar todas as etapas")
+    parser.add_argument("--status", action="store_true", help="Exibir o status do projeto e sair")
+    parser.add_argument("--json", action="store_true", help="Com --status: imprimir o status em JSON")
+    args = parser.parse_args()
+    
     try:
+        if args.status:
+            show_project_status(as_json=args.json)
+            sys.exit(0)
+        if args.incremental:
+            status = workflow_incremental(method="hash" if args.hash else "mtime", force=args.force)
+            sys.exit(1 if any(s in ("failed", "blocked") for s in status.values()) else 0)
         workflow_completo()
     except KeyboardInterrupt:
         print("\n\n⚠️  Workflow interrompido pelo usuário.")
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Execução Distribuída por Partes (Shards) e Junção dos Relatórios
+Projeto: Origem das Aves em Theropoda
+
+Divide o trabalho entre várias máquinas sem coordenação: com `--shard i/N`,
+cada máquina fica só com as unidades cujo hash estável (SHA-1 da chave)
+cai na parte i de N:
+
+- extração: páginas de PDF (chave "arquivo.pdf#p3");
+- processamento: imagens (chave = nome do arquivo).
+
+Cada parte grava um relatório parcial em shard_reports/ com o universo de
+unidades que viu e as que concluiu. Depois de reunir os parciais numa
+máquina, `merge` monta os relatórios de sempre (extraction_report.json e
+processing_report.json) e confere que cada unidade foi feita exatamente uma
+vez, por todas as N partes, sobre o mesmo conjunto de entrada.
+
+Uso:
+    python extract_pdf_images.py --shard 1/3        # em cada máquina: 1/3, 2/3, 3/3
+    python process_images.py --preset reveal_slide --shard 2/3
+    python sharding.py merge [pasta]                # junta os parciais
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+# ================== CONFIGURAÇÃO ==================
+
+PROJECT_ROOT = Path(__file__).parent.parent
+SHARD_REPORTS_DIR = PROJECT_ROOT / "shard_reports"
+
+# Relatório do processamento fundido à extração quando também há parciais de
+# processamento (que ficam com o processing_report.json)
+FUSED_PROCESSING_REPORT = PROJECT_ROOT / "processing_report.extraction.json"
+
+# ================== PARTIÇÃO ==================
+
+def parse_shard(text):
+    """
+    Lê "i/N" (partes numeradas de 1 a N).
+
+    Returns:
+        tuple: (i, N)
+
+    Raises:
+        ValueError: Formato ou intervalo inválido
+    """
+    try:
+        index, total = (int(part) for part in text.split("/"))
+    except ValueError:
+        raise ValueError(f"shard inválido: {text!r} (use i/N, ex.: 2/4)")
+    if total < 1 or not 1 <= index <= total:
+        raise ValueError(f"shard fora do intervalo: {text!r} (1 ≤ i ≤ N)")
+    return index, total
+
+
+def shard_of(key, total):
+    """Parte (1..N) de uma unidade; estável entre máquinas e execuções"""
+    digest = hashlib.sha1(key.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % total + 1
+
+
+def in_shard(key, shard):
+    """A unidade pertence à parte? (shard None = sem divisão)"""
+    return shard is None or shard_of(key, shard[1]) == shard[0]
+
+
+def shard_suffix(shard):
+    """Sufixo de arquivos por parte (ex.: ".shard-2-of-4")"""
+    return f".shard-{shard[0]}-of-{shard[1]}" if shard else ""
+
+
+def page_key(pdf_filename, page_number):
+    return f"{pdf_filename}#p{page_number}"
+
+
+# ================== RELATÓRIOS PARCIAIS ==================
+
+def write_partial(kind, shard, params, universe, completed, output_dir=SHARD_REPORTS_DIR):
+    """
+    Grava o relatório parcial de uma parte.
+
+    Args:
+        kind (str): 'extraction' ou 'processing'
+        shard (tuple): (i, N)
+        params (dict): Parâmetros da execução (precisam coincidir entre partes)
+        universe (list): Todas as chaves vistas (antes de filtrar pela parte)
+        completed (dict): {chave: resultado} das unidades concluídas
+
+    Returns:
+        Path: Arquivo gravado
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    path = output_dir / f"{kind}_report{shard_suffix(shard)}.json"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "kind": kind,
+            "shard": list(shard),
+            "params": params,
+            "universe": universe,
+            "completed": completed,
+        }, f, indent=2, ensure_ascii=False)
+    return path
+
+
+def load_partials(kind, input_dir=SHARD_REPORTS_DIR):
+    partials = []
+    for path in sorted(Path(input_dir).glob(f"{kind}_report.shard-*.json")):
+        with open(path, "r", encoding="utf-8") as f:
+            partials.append(json.load(f))
+    return partials
+
+
+def verify(partials):
+    """
+    Confere um conjunto de parciais do mesmo tipo.
+
+    Returns:
+        tuple: (problemas [str], {chave: resultado} juntos)
+    """
+    problems = []
+    totals = {partial["shard"][1] for partial in partials}
+    if len(totals) != 1:
+        return [f"partes com N diferentes: {sorted(totals)}"], {}
+    total = totals.pop()
+
+    seen = {}
+    for partial in partials:
+        index = partial["shard"][0]
+        if index in seen:
+            problems.append(f"parte {index}/{total} aparece mais de uma vez")
+        seen[index] = partial
+    missing_shards = [i for i in range(1, total + 1) if i not in seen]
+    if missing_shards:
+        problems.append(f"faltam as partes: {', '.join(f'{i}/{total}' for i in missing_shards)}")
+
+    reference = partials[0]
+    for partial in partials[1:]:
+        if partial["params"] != reference["params"]:
+            problems.append(f"parte {partial['shard'][0]}/{total} usou parâmetros diferentes")
+        if partial["universe"] != reference["universe"]:
+            problems.append(f"parte {partial['shard'][0]}/{total} viu outro conjunto de entrada")
+
+    merged = {}
+    owners = {}
+    for partial in partials:
+        for key, result in partial["completed"].items():
+            owners.setdefault(key, []).append(partial["shard"][0])
+            merged[key] = result
+
+    twice = {key: shards for key, shards in owners.items() if len(shards) > 1}
+    not_done = [key for key in reference["universe"] if key not in owners]
+    unknown = [key for key in owners if key not in set(reference["universe"])]
+    for key, shards in twice.items():
+        problems.append(f"feita mais de uma vez ({', '.join(map(str, shards))}): {key}")
+    for key in not_done:
+        problems.append(f"não feita (parte {shard_of(key, total)}/{total}): {key}")
+    for key in unknown:
+        problems.append(f"fora do conjunto de entrada: {key}")
+
+    return problems, merged
+
+
+# ================== JUNÇÃO ==================
+
+def merge_extraction(partials, processing_report_path=None):
+    """
+    Monta o extraction_report.json (e o processing_report.json fundido).
+
+    Args:
+        processing_report_path (Path): Destino do relatório do processamento
+            fundido (padrão: processing_report.json)
+    """
+    from extract_pdf_images import PDF_MAPPING
+    from process_images import write_processing_report
+
+    problems, pages = verify(partials)
+    if problems:
+        return problems
+
+    params = partials[0]["params"]
+    universe = partials[0]["universe"]
+    report = {"total_pdfs_processed": 0, "total_images_extracted": 0, "pdfs_details": {}}
+    processing_results = []
+
+    for pdf_filename, metadata in PDF_MAPPING.items():
+        keys = [key for key in universe if key.rsplit("#p", 1)[0] == pdf_filename]
+        if not keys:
+            report["pdfs_details"][pdf_filename] = {"status": "not_found", "images_extracted": 0}
+            continue
+        files = []
+        trim_stats = {}
+        for key in keys:
+            files += [Path(path).name for path in pages[key]["files"]]
+            for stat, value in pages[key]["trim"].items():
+                trim_stats[stat] = trim_stats.get(stat, 0) + value
+            processing_results += pages[key]["processed"]
+
+        report["total_pdfs_processed"] += 1
+        report["total_images_extracted"] += len(files)
+        report["pdfs_details"][pdf_filename] = {
+            "status": "success",
+            "description": metadata["description"],
+            "images_extracted": len(files),
+            "files": files,
+        }
+        if params["trim"]:
+            report["pdfs_details"][pdf_filename]["trim"] = trim_stats
+
+    if any(page.get("supervision") for page in pages.values()):
+        from extract_pdf_images import supervision_summary
+        report["supervision"] = supervision_summary(pages)
+
+    report_path = PROJECT_ROOT / "extraction_report.json"
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"📄 {report_path.name}: {report['total_images_extracted']} imagens de "
+          f"{len(universe)} páginas ({len(partials)} partes)")
+
+    if params["process_preset"]:
+        path = write_processing_report(params["process_preset"], processing_results, processing_report_path)
+        print(f"📄 {path.name}: {len(processing_results)} imagens processadas em memória")
+    return []
+
+
+def merge_processing(partials):
+    """Monta o processing_report.json"""
+    from process_images import write_processing_report
+
+    problems, results = verify(partials)
+    if problems:
+        return problems
+
+    universe = partials[0]["universe"]
+    path = write_processing_report(partials[0]["params"]["preset"], [results[key] for key in universe])
+    print(f"📄 {path.name}: {len(universe)} imagens ({len(partials)} partes)")
+    return []
+
+
+def merge_all(input_dir=SHARD_REPORTS_DIR):
+    """
+    Junta todos os parciais encontrados.
+
+    Returns:
+        bool: True se tudo conferiu (e os relatórios foram gravados)
+    """
+    ok = True
+    found = False
+    partials_by_kind = {kind: load_partials(kind, input_dir) for kind in ("extraction", "processing")}
+
+    # Extração fundida (process_preset) e processamento gravariam o mesmo
+    # processing_report.json; o da extração vai para outro arquivo
+    fused_report_path = None
+    extraction = partials_by_kind["extraction"]
+    if extraction and extraction[0]["params"].get("process_preset") and partials_by_kind["processing"]:
+        fused_report_path = FUSED_PROCESSING_REPORT
+        print(f"⚠️  Há parciais de processamento e de extração com processamento fundido: "
+              f"o relatório da extração fundida vai para {fused_report_path.name}")
+
+    for kind, merge in (("extraction", lambda partials: merge_extraction(partials, fused_report_path)),
+                        ("processing", merge_processing)):
+        partials = partials_by_kind[kind]
+        if not partials:
+            continue
+        found = True
+        problems = merge(partials)
+        if problems:
+            ok = False
+            print(f"❌ {kind}: {len(problems)} problema(s); relatório não gravado")
+            for problem in problems:
+                print(f"   - {problem}")
+    if not found:
+        print(f"⚠️  Nenhum relatório parcial em {input_dir}")
+        return False
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Relatórios das execuções por partes")
+    sub = parser.add_subparsers(dest="command", required=True)
+    merge_parser = sub.add_parser("merge", help="Juntar os relatórios parciais")
+    merge_parser.add_argument("input_dir", nargs="?", default=str(SHARD_REPORTS_DIR),
+                              help="Pasta com os parciais (padrão: shard_reports/)")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(Path(__file__).parent))
+    sys.exit(0 if merge_all(args.input_dir) else 1)
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Execução Incremental do Workflow (Grafo de Dependências)
+Projeto: Origem das Aves em Theropoda
+
+Modela as quatro etapas do workflow (extração → renomeação → guia visual
+e processamento) como um grafo com entradas e saídas declaradas, no estilo
+do `make`:
+
+- uma etapa só roda se suas entradas (ou parâmetros) mudaram desde a última
+  execução bem-sucedida, ou se alguma saída sumiu ou mudou;
+- etapas independentes rodam em paralelo (guia e processamento, depois da
+  renomeação);
+- nada é perguntado ao usuário (modo não interativo).
+
+Uso:
+    python workflow_dag.py [--hash] [--force] [--preset reveal_slide] [--backup] [--profile]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+import profiling
+
+# ================== CONFIGURAÇÃO ==================
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+
+# Estado da última execução bem-sucedida de cada etapa
+STATE_FILE = PROJECT_ROOT / ".workflow_state.json"
+
+IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff']
+
+# Garantir que os scripts das etapas sejam importáveis
+sys.path.insert(0, str(SCRIPT_DIR))
+
+# ================== ENTRADAS DAS ETAPAS ==================
+
+def pdf_inputs():
+    """PDFs mapeados na extração (existentes ou não)"""
+    import extract_pdf_images
+    return [extract_pdf_images.PDF_DIR / name for name in extract_pdf_images.PDF_MAPPING]
+
+
+def image_inputs():
+    """Imagens no nível principal de images/ (sem processed/ e backup/)"""
+    from project_status import list_images
+    return list_images(IMAGE_EXTENSIONS)
+
+
+def site_page_inputs():
+    """Páginas do site (definem quais imagens são processadas)"""
+    from html_references import site_pages
+    return [PROJECT_ROOT / page for page in site_pages()]
+
+
+def processed_outputs():
+    """Versões processadas em images/processed/ (saídas do processamento)"""
+    import image_layout
+    return image_layout.list_paths("processed")
+
+
+def fingerprint(paths, method="mtime", params=None):
+    """
+    Impressão digital de um conjunto de arquivos.
+
+    Args:
+        paths (list): Arquivos de entrada
+        method (str): 'mtime' (tamanho + mtime, rápido) ou 'hash' (conteúdo)
+        params (dict): Parâmetros da etapa que também invalidam o resultado
+
+    Returns:
+        str: SHA-256 hexadecimal
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps(params or {}, sort_keys=True).encode("utf-8"))
+
+    for path in sorted(Path(p) for p in paths):
+        digest.update(os.path.relpath(path, PROJECT_ROOT).encode("utf-8"))
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            digest.update(b"missing")
+            continue
+
+        if method == "hash":
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(chunk)
+        else:
+            digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8"))
+
+    return digest.hexdigest()
+
+
+# ================== ETAPAS ==================
+
+def run_extract():
+    import extract_pdf_images
+    extract_pdf_images.process_all_pdfs()
+
+
+def run_guide():
+    import map_pdf_to_html
+    map_pdf_to_html.generate_mapping_guide()
+
+
+def run_rename():
+    import rename_images
+    rename_images.auto_rename_by_suggestions(confirm=False)
+
+
+def build_stages(preset="reveal_slide", enhance=True, crop=False, backup=False):
+    """
+    Define o grafo de etapas.
+
+    Cada etapa declara dependências, entradas (função que lista arquivos),
+    saídas (lista ou função), parâmetros e se altera as próprias entradas (a
+    renomeação altera images/, então sua impressão digital é tirada depois
+    de rodar).
+
+    Args:
+        backup (bool): Snapshot do backup_store a cada processamento (fora
+            dos parâmetros: não torna a etapa desatualizada)
+
+    Returns:
+        dict: Etapas por nome, em ordem topológica
+    """
+    def run_process():
+        import process_images
+        process_images.process_all_images(
+            preset=preset, enhance=enhance, crop=crop, backup=backup, confirm=False
+        )
+
+    return {
+        "extract": {
+            "deps": [],
+            "inputs": lambda: pdf_inputs() + [SCRIPT_DIR / "extract_pdf_images.py"],
+            "outputs": [PROJECT_ROOT / "extraction_report.json"],
+            "params": {},
+            "mutates_inputs": False,
+            "run": run_extract,
+        },
+        "rename": {
+            "deps": ["extract"],
+            "inputs": lambda: image_inputs() + [SCRIPT_DIR / "rename_images.py"],
+            "outputs": [],
+            "params": {},
+            "mutates_inputs": True,
+            "run": run_rename,
+        },
+        "guide": {
+            "deps": ["rename"],
+            "inputs": lambda: image_inputs() + [SCRIPT_DIR / "map_pdf_to_html.py"],
+            "outputs": [PROJECT_ROOT / "image_mapping_guide.html"],
+            "params": {},
+            "mutates_inputs": False,
+            "run": run_guide,
+        },
+        "process": {
+            "deps": ["rename"],
+            "inputs": lambda: image_inputs() + site_page_inputs() + [SCRIPT_DIR / "process_images.py"],
+            "outputs": lambda: [PROJECT_ROOT / "processing_report.json"] + processed_outputs(),
+            "params": {"preset": preset, "enhance": enhance, "crop": crop},
+            "mutates_inputs": False,
+            "run": run_process,
+        },
+    }
+
+
+# ================== EXECUÇÃO ==================
+
+def load_state():
+    """Carrega o estado salvo (vazio se não existir ou estiver corrompido)"""
+    try:
+        with open(STATE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_state(state):
+    """Grava o estado de forma atômica"""
+    tmp_path = STATE_FILE.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, ensure_ascii=False)
+    tmp_path.replace(STATE_FILE)
+
+
+def _stage_outputs(stage):
+    """Saídas declaradas de uma etapa (lista fixa ou função que lista arquivos)"""
+    outputs = stage["outputs"]
+    return outputs() if callable(outputs) else outputs
+
+
+def _run_stage(name, stage, state, state_lock, method, force):
+    """
+    Executa uma etapa se estiver desatualizada.
+
+    As saídas também têm impressão digital: uma saída apagada ou alterada
+    depois da última execução torna a etapa desatualizada.
+
+    Returns:
+        tuple: (status, segundos) com status 'ran' ou 'skipped'
+    """
+    start = time.perf_counter()
+    with state_lock:
+        previous = state.get(name, {})
+    with profiling.span("fingerprint", "workflow", stage=name):
+        before = fingerprint(stage["inputs"](), method, stage["params"])
+        outputs = _stage_outputs(stage)
+        outputs_ok = (all(Path(p).exists() for p in outputs)
+                      and previous.get("outputs") == fingerprint(outputs, method))
+
+    if not force and outputs_ok and previous.get("fingerprint") == before and previous.get("method") == method:
+        return "skipped", time.perf_counter() - start
+
+    with profiling.span(name, "workflow"):
+        profiling.profiled_call(stage["run"])
+
+    after = fingerprint(stage["inputs"](), method, stage["params"]) if stage["mutates_inputs"] else before
+    outputs_after = fingerprint(_stage_outputs(stage), method)
+    with state_lock:
+        state[name] = {"fingerprint": after, "outputs": outputs_after, "method": method,
+                       "finished_at": time.time()}
+        save_state(state)
+
+    return "ran", time.perf_counter() - start
+
+
+def run_incremental(stages=None, method="mtime", force=False, max_workers=2):
+    """
+    Executa o grafo, pulando etapas atualizadas e paralelizando as independentes.
+
+    Args:
+        stages (dict): Grafo de etapas (padrão: build_stages())
+        method (str): 'mtime' ou 'hash' para detectar mudanças
+        force (bool): Executar todas as etapas
+        max_workers (int): Etapas simultâneas
+
+    Returns:
+        dict: Status de cada etapa ('ran', 'skipped', 'failed' ou 'blocked')
+    """
+    stages = stages or build_stages()
+    state = load_state()
+    state_lock = threading.Lock()
+    status = {}
+    timings = {}
+    start = time.perf_counter()
+
+    print("=" * 70)
+    print(f"🔁 WORKFLOW INCREMENTAL ({method}{', forçado' if force else ''})")
+    print("=" * 70)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        running = {}
+
+        while len(status) < len(stages):
+            for name, stage in stages.items():
+                if name in status or name in running.values():
+                    continue
+                dep_status = [status.get(dep) for dep in stage["deps"]]
+                if any(s in ("failed", "blocked") for s in dep_status):
+                    status[name] = "blocked"
+                elif all(s in ("ran", "skipped") for s in dep_status):
+                    future = pool.submit(_run_stage, name, stage, state, state_lock, method, force)
+                    running[future] = name
+
+            if not running:
+                # Dependências inexistentes no grafo: nada mais pode rodar
+                for name in stages:
+                    status.setdefault(name, "blocked")
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    status[name], timings[name] = future.result()
+                except Exception as e:
+                    print(f"❌ Erro na etapa {name}: {e}")
+                    status[name] = "failed"
+
+    labels = {"ran": "✅ executada", "skipped": "⏭️  atualizada (pulada)",
+              "failed": "❌ falhou", "blocked": "⛔ bloqueada (dependência falhou)"}
+    print("\n" + "=" * 70)
+    print("📊 RESUMO DO WORKFLOW INCREMENTAL")
+    print("=" * 70)
+    for name in stages:
+        elapsed = f" ({timings[name]:.2f}s)" if name in timings else ""
+        print(f"   {name:<10} {labels[status[name]]}{elapsed}")
+    print(f"\n⏱️  Tempo total: {time.perf_counter() - start:.2f}s")
+    print("=" * 70)
+
+    return status
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Workflow incremental (não interativo)")
+    parser.add_argument("--hash", action="store_true", help="Detectar mudanças pelo conteúdo (SHA-256)")
+    parser.add_argument("--force", action="store_true", help="Executar todas as etapas")
+    parser.add_argument("--preset", default="reveal_slide", help="Preset do processamento")
+    parser.add_argument("--no-enhance", action="store_true", help="Não aplicar melhorias")
+    parser.add_argument("--workers", type=int, default=2, help="Etapas simultâneas")
+    parser.add_argument("--backup", action="store_true",
+                        help="Criar um snapshot (backup_store) a cada processamento")
+    profiling.add_arguments(parser)
+    args = parser.parse_args()
+
+    with profiling.from_arguments(args, "workflow"):
+        result = run_incremental(
+            build_stages(preset=args.preset, enhance=not args.no_enhance, backup=args.backup),
+            method="hash" if args.hash else "mtime",
+            force=args.force,
+            max_workers=args.workers,
+        )
+    sys.exit(1 if any(s in ("failed", "blocked") for s in result.values()) else 0)